@@ -0,0 +1,115 @@
+"""Measures the cleanup at the end of *Annotator.annotate()* on documents with increasing
+numbers of chains, comparing the release of the predicate cache, which is all that is
+left to do once the document context is dropped, with the previous implementation, which stored the intermediate state as *temp_* attributes on the chain
+holders and mentions and then removed them in a sweep over every token, the chains it
+belonged to and their mentions.
+
+The ensemble is untrained, which does not matter here as only the time taken to clean
+up after the chains have been built is measured.
+
+Usage: python benchmarks/annotation_cleanup.py
+"""
+import time
+from coreferee.annotation import Annotator
+from coreferee.rules import RulesAnalyzerFactory
+from coreferee.tendencies import (
+    DocumentPairInfo,
+    TendenciesAnalyzer,
+    create_thinc_model,
+    generate_feature_table,
+)
+from synthetic_docs import get_nlp, make_doc
+
+SENTENCE_LENGTH = 15
+NUMBERS_OF_SENTENCES = (25, 50, 100, 200, 400)
+
+# The attributes the previous implementation left on each chain holder and mention
+TOKEN_ATTRIBUTES = (
+    "temp_sent_index",
+    "temp_dependent_siblings",
+    "temp_governing_sibling",
+    "temp_has_or_coordination",
+    "temp_quote_array",
+    "temp_potentially_referring",
+    "temp_potential_referreds",
+    "temp_vector",
+    "temp_head_vector",
+)
+MENTION_ATTRIBUTES = (
+    "temp_is_uncertain",
+    "temp_score",
+    "temp_compatibility_map",
+    "temp_head_similarity",
+)
+
+
+def get_annotator(nlp):
+    doc = make_doc(nlp, SENTENCE_LENGTH, 5)
+    rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
+    context = rules_analyzer.initialize(doc)
+    feature_table = generate_feature_table([doc], nlp, [context])
+    tendencies_analyzer = TendenciesAnalyzer(rules_analyzer, nlp, feature_table)
+    model = create_thinc_model()
+    model.initialize(
+        X=[DocumentPairInfo.from_doc(doc, context, tendencies_analyzer, 5)]
+    )
+    return Annotator(nlp, nlp, feature_table, model)
+
+
+def add_previous_attributes(doc):
+    for token in doc:
+        for attribute in TOKEN_ATTRIBUTES:
+            setattr(token._.coref_chains, attribute, None)
+        for chain in token._.coref_chains:
+            for mention in chain:
+                for attribute in MENTION_ATTRIBUTES:
+                    setattr(mention, attribute, None)
+
+
+def previous_cleanup(doc):
+    for token in doc:
+        for temp_entry in [
+            t for t in token._.coref_chains.__dict__ if t.startswith("temp_")
+        ][:]:
+            token._.coref_chains.__dict__.pop(temp_entry)
+            for chain in token._.coref_chains:
+                for mention in chain:
+                    for inner_temp_entry in [
+                        t for t in mention.__dict__ if t.startswith("temp_")
+                    ][:]:
+                        mention.__dict__.pop(inner_temp_entry)
+
+
+def current_cleanup(rules_analyzer, doc):
+    rules_analyzer.release_predicate_cache(doc)
+
+
+def main():
+    nlp = get_nlp("en")
+    annotator = get_annotator(nlp)
+    rules_analyzer = annotator.rules_analyzer
+    print("tokens   chains   mentions   ms (previous)   ms (current)")
+    for number_of_sentences in NUMBERS_OF_SENTENCES:
+        doc = make_doc(nlp, SENTENCE_LENGTH, number_of_sentences)
+        context = rules_analyzer.initialize(doc)
+        annotator.annotate(doc, used_in_training=True, context=context)
+        add_previous_attributes(doc)
+        start = time.perf_counter()
+        previous_cleanup(doc)
+        previous_ms = 1000 * (time.perf_counter() - start)
+        start = time.perf_counter()
+        current_cleanup(rules_analyzer, doc)
+        current_ms = 1000 * (time.perf_counter() - start)
+        print(
+            "{:>6}   {:>6}   {:>8}   {:>13.3f}   {:>12.3f}".format(
+                len(doc),
+                len(doc._.coref_chains),
+                sum(len(chain) for chain in doc._.coref_chains),
+                previous_ms,
+                current_ms,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
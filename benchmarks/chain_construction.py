@@ -0,0 +1,210 @@
+"""Measures the bookkeeping with which *Annotator.build_chains()* assigns mentions to
+chains and rewinds the assignments when it retries alternative interpretations, comparing
+*MentionSets*, which merges the smaller of two chains into the larger one wherever this
+cannot change the chains, with a copy of the previous implementation, which always merged
+the chain of the anaphor into the chain of the mention it was linked to. Both
+implementations hold a Python set per chain and rewind by deleting the mentions of each
+token in the rewound range one at a time.
+
+The links and rewinds are generated rather than produced by the rules and the ensemble
+so that documents with frequent rewinds, and documents in which a growing chain is
+repeatedly merged into new chains, can be measured; the chains produced by both
+implementations are checked to be the same.
+
+Usage: python benchmarks/chain_construction.py
+"""
+from typing import Dict, List, Set
+import gc
+import random
+import time
+from spacy.tokens import Token
+from coreferee.annotation import MentionSets
+from coreferee.data_model import Mention
+from synthetic_docs import get_nlp, make_doc
+
+SENTENCE_LENGTH = 20
+NUMBERS_OF_SENTENCES = (25, 50, 100, 200, 400)
+# The maximum distance between an anaphor and the token it is linked to
+LINK_DISTANCE = 30
+# Every so many anaphors, the assignments are rewound to an earlier anaphor and redone
+REWIND_INTERVAL = 10
+REWIND_DEPTH = 4
+REPETITIONS = 5
+
+
+def get_operations(doc, seed=0):
+    """Returns a list of *(anaphor index, preceding index)* links and *(anaphor index,
+    None)* rewinds to the anaphor at *anaphor index*."""
+    rng = random.Random(seed)
+    operations = []
+    anaphor_indexes = []
+    for token in doc[1:]:
+        if rng.random() < 0.5:
+            continue
+        preceding_index = rng.randrange(max(0, token.i - LINK_DISTANCE), token.i)
+        anaphor_indexes.append(token.i)
+        operations.append((token.i, preceding_index))
+        if len(anaphor_indexes) % REWIND_INTERVAL == 0:
+            rewind_position = len(operations) - REWIND_DEPTH
+            operations.append((operations[rewind_position][0], None))
+            operations.extend(
+                operations[rewind_position : rewind_position + REWIND_DEPTH]
+            )
+    return operations
+
+
+def get_merging_operations(doc):
+    """Returns links that form a chain from each pair of tokens and then merge each chain
+    in turn into the chain that contains the first two tokens."""
+    operations = [(index + 1, index) for index in range(0, len(doc) - 1, 2)]
+    operations.extend((1, index) for index in range(2, len(doc) - 1, 2))
+    return operations
+
+
+class PreviousMentionSets:
+    """The previous implementation of *MentionSets*."""
+
+    def __init__(self):
+        self.without_coordination: Dict[int, Set[Mention]] = {}
+        self.with_coordination: Dict[int, Set[Mention]] = {}
+
+    def record_mention(self, preceding_mention: Mention, token: Token) -> None:
+        """Records that *token* belongs to the same chain as *preceding_mention*."""
+        if len(preceding_mention.token_indexes) > 1:
+            if preceding_mention.root_index in self.with_coordination:
+                mention_set = self.with_coordination[preceding_mention.root_index]
+            else:
+                mention_set = {preceding_mention}
+                for token_index in preceding_mention.token_indexes:
+                    self.with_coordination[token_index] = mention_set
+        else:
+            if preceding_mention.root_index in self.without_coordination:
+                mention_set = self.without_coordination[preceding_mention.root_index]
+            else:
+                mention_set = {preceding_mention}
+                self.without_coordination[preceding_mention.root_index] = mention_set
+        mention_set.add(Mention(token, False))
+        if token.i in self.without_coordination:
+            mention_set.update(self.without_coordination[token.i])
+            for mention in self.without_coordination[token.i]:
+                self.without_coordination[mention.root_index] = mention_set
+        else:
+            self.without_coordination[token.i] = mention_set
+
+    def delete_for_rewind(self, previous_token: Token, token: Token) -> None:
+        """Removes the mentions of the tokens from *previous_token* to *token* inclusive
+        before the anaphors between them are processed again."""
+
+        def intern_delete_for_rewind(
+            dictionary: Dict[int, Set[Mention]], working_token: Token
+        ):
+            if working_token.i in dictionary:
+                mention_set = dictionary[working_token.i]
+                working_mention = Mention(working_token, False)
+                if working_mention in mention_set:
+                    mention_set.remove(working_mention)
+                del dictionary[working_token.i]
+                if len(mention_set) == 1:
+                    remaining_mention = list(mention_set)[0]
+                    if remaining_mention.root_index in dictionary:
+                        # is not the case where *remaining_mention* involves coordination
+                        del dictionary[remaining_mention.root_index]
+
+        for working_token in token.doc[previous_token.i : token.i + 1]:
+            intern_delete_for_rewind(self.without_coordination, working_token)
+            intern_delete_for_rewind(self.with_coordination, working_token)
+
+    def get_chains(self) -> List[Set[Mention]]:
+        """Returns each set that is mapped to from *without_coordination*."""
+        visited_token_indexes = set()
+        mention_sets = []
+        for token_index, mention_set in self.without_coordination.items():
+            if token_index in visited_token_indexes:
+                continue
+            mention_sets.append(mention_set)
+            for mention in mention_set:
+                if len(mention.token_indexes) == 1:
+                    visited_token_indexes.add(mention.root_index)
+        return mention_sets
+
+
+def build(mention_sets_class, doc, operations):
+    mention_sets = mention_sets_class()
+    last_index = 0
+    for anaphor_index, preceding_index in operations:
+        if preceding_index is None:
+            mention_sets.delete_for_rewind(doc[anaphor_index], doc[last_index])
+        else:
+            mention_sets.record_mention(
+                Mention(doc[preceding_index], False), doc[anaphor_index]
+            )
+            last_index = max(last_index, anaphor_index)
+    return sorted(
+        sorted(mention.root_index for mention in mention_set)
+        for mention_set in mention_sets.get_chains()
+    )
+
+
+def time_build(mention_sets_class, doc, operations):
+    """Returns the chains and the fastest of *REPETITIONS* runs in milliseconds. Garbage
+    is collected before each run so that it is not charged to whichever implementation
+    happens to run next."""
+    fastest_ms = None
+    for _ in range(REPETITIONS):
+        gc.collect()
+        start = time.perf_counter()
+        chains = build(mention_sets_class, doc, operations)
+        ms = 1000 * (time.perf_counter() - start)
+        if fastest_ms is None or ms < fastest_ms:
+            fastest_ms = ms
+    return chains, fastest_ms
+
+
+def main():
+    nlp = get_nlp("en")
+    print("Random links with rewinds")
+    print(
+        "tokens   links   rewinds   longest chain   ms (previous)   ms (current)   same"
+    )
+    for number_of_sentences in NUMBERS_OF_SENTENCES:
+        doc = make_doc(nlp, SENTENCE_LENGTH, number_of_sentences)
+        operations = get_operations(doc)
+        previous_chains, previous_ms = time_build(PreviousMentionSets, doc, operations)
+        current_chains, current_ms = time_build(MentionSets, doc, operations)
+        print(
+            "{:>6}   {:>5}   {:>7}   {:>13}   {:>13.3f}   {:>12.3f}   {}".format(
+                len(doc),
+                sum(
+                    1
+                    for _, preceding_index in operations
+                    if preceding_index is not None
+                ),
+                sum(1 for _, preceding_index in operations if preceding_index is None),
+                max(len(chain) for chain in current_chains),
+                previous_ms,
+                current_ms,
+                previous_chains == current_chains,
+            )
+        )
+    print()
+    print("Merging chains")
+    print("tokens   links   longest chain   ms (previous)   ms (current)   same")
+    for number_of_sentences in NUMBERS_OF_SENTENCES:
+        doc = make_doc(nlp, SENTENCE_LENGTH, number_of_sentences)
+        operations = get_merging_operations(doc)
+        previous_chains, previous_ms = time_build(PreviousMentionSets, doc, operations)
+        current_chains, current_ms = time_build(MentionSets, doc, operations)
+        print(
+            "{:>6}   {:>5}   {:>13}   {:>13.3f}   {:>12.3f}   {}".format(
+                len(doc),
+                len(operations),
+                max(len(chain) for chain in current_chains),
+                previous_ms,
+                current_ms,
+                previous_chains == current_chains,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Measures the check for potentially coreferring nouns that are closer to an anaphor
+than its potential referent in *language_independent_is_potential_anaphoric_pair()*
+with and without the *CoreferringNounIndex* on documents with increasingly long
+sentences, whose dependency subtrees grow with the sentence length.
+
+Usage: python benchmarks/competing_noun_scan.py
+"""
+import time
+from coreferee.rules import RulesAnalyzerFactory
+from synthetic_docs import get_nlp, make_doc
+
+SENTENCE_LENGTHS = (15, 30, 60, 120, 240)
+NUMBER_OF_TOKENS = 2400
+
+
+def get_pairs(doc, context):
+    return [
+        (referred, token)
+        for token in doc
+        for referred in context.potential_referreds[token.i] or []
+    ]
+
+
+def time_pairs(rules_analyzer, context, pairs):
+    start = time.perf_counter()
+    for referred, referring in pairs:
+        rules_analyzer.language_independent_is_potential_anaphoric_pair(
+            referred, referring, context
+        )
+    return 1000000 * (time.perf_counter() - start) / max(len(pairs), 1)
+
+
+def main():
+    nlp = get_nlp("en")
+    rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
+    print("sentence length   pairs   us per pair (scan)   us per pair (index)")
+    for sentence_length in SENTENCE_LENGTHS:
+        doc = make_doc(nlp, sentence_length, NUMBER_OF_TOKENS // sentence_length)
+        context = rules_analyzer.initialize(doc)
+        pairs = get_pairs(doc, context)
+        rules_analyzer.index_coreferring_nouns = False
+        scan_us = time_pairs(rules_analyzer, context, pairs)
+        rules_analyzer.index_coreferring_nouns = True
+        index_us = time_pairs(rules_analyzer, context, pairs)
+        rules_analyzer.release_predicate_cache(doc)
+        print(
+            "{:>15}   {:>5}   {:>18.1f}   {:>19.1f}".format(
+                sentence_length, len(pairs), scan_us, index_us
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Measures the time taken to build the chains for documents dense with repeated nouns
+with and without the index of preceding nouns that *Annotator* uses when looking for a
+noun with which each noun could corefer, and checks that both produce the same chains.
+
+The ensemble is untrained, which does not matter here as the documents contain no
+anaphors whose pairs would need to be scored.
+
+Usage: python benchmarks/coreferring_noun_search.py
+"""
+import time
+from coreferee.annotation import Annotator
+from coreferee.rules import RulesAnalyzerFactory
+from coreferee.tendencies import (
+    DocumentPairInfo,
+    TendenciesAnalyzer,
+    create_thinc_model,
+    generate_feature_table,
+)
+from synthetic_docs import get_nlp, make_doc
+
+SENTENCE_LENGTH = 20
+NUMBERS_OF_SENTENCES = (25, 50, 100, 200)
+REPETITIONS = 3
+
+
+def get_annotator(nlp):
+    doc = make_doc(nlp, SENTENCE_LENGTH, 5)
+    rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
+    context = rules_analyzer.initialize(doc)
+    feature_table = generate_feature_table([doc], nlp, [context])
+    tendencies_analyzer = TendenciesAnalyzer(rules_analyzer, nlp, feature_table)
+    model = create_thinc_model()
+    model.initialize(
+        X=[DocumentPairInfo.from_doc(doc, context, tendencies_analyzer, 5)]
+    )
+    return Annotator(nlp, nlp, feature_table, model)
+
+
+def time_annotation(annotator, doc):
+    start = time.perf_counter()
+    for _ in range(REPETITIONS):
+        annotator.annotate(doc)
+    return 1000 * (time.perf_counter() - start) / REPETITIONS, str(doc._.coref_chains)
+
+
+def main():
+    nlp = get_nlp("en")
+    annotator = get_annotator(nlp)
+    rules_analyzer = annotator.rules_analyzer
+    print("tokens   ms (scan)   ms (index)   same chains")
+    for number_of_sentences in NUMBERS_OF_SENTENCES:
+        doc = make_doc(nlp, SENTENCE_LENGTH, number_of_sentences, with_pronouns=False)
+        rules_analyzer.index_coreferring_nouns = False
+        scan_ms, scan_chains = time_annotation(annotator, doc)
+        rules_analyzer.index_coreferring_nouns = True
+        index_ms, index_chains = time_annotation(annotator, doc)
+        print(
+            "{:>6}   {:>9.1f}   {:>10.1f}   {}".format(
+                len(doc), scan_ms, index_ms, scan_chains == index_chains
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
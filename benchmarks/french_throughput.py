@@ -0,0 +1,64 @@
+"""Measures the throughput of the French rules on synthetic documents: the analysis of
+the potential anaphoric pairs in *initialize()* and the checks for potential
+coreferring noun pairs that are made while the chains are built.
+
+Usage: python benchmarks/french_throughput.py
+"""
+import time
+from coreferee.rules import RulesAnalyzerFactory
+from synthetic_docs import get_nlp, make_doc
+
+SENTENCE_LENGTH = 15
+NUMBER_OF_SENTENCES = 20
+NUMBER_OF_DOCS = 10
+
+
+def check_coreferring_noun_pairs(rules_analyzer, doc, context):
+    nouns = [token for token in doc if token.pos_ in rules_analyzer.noun_pos]
+    for index, referring in enumerate(nouns):
+        for referred in nouns[max(0, index - 10) : index]:
+            rules_analyzer.is_potential_coreferring_noun_pair(
+                referred, referring, context
+            )
+    return len(nouns)
+
+
+def main():
+    nlp = get_nlp("fr")
+    rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
+    docs = [
+        make_doc(nlp, SENTENCE_LENGTH, NUMBER_OF_SENTENCES, seed=seed)
+        for seed in range(NUMBER_OF_DOCS)
+    ]
+    number_of_tokens = sum(len(doc) for doc in docs)
+    start = time.perf_counter()
+    contexts = [rules_analyzer.initialize(doc) for doc in docs]
+    initialize_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for doc, context in zip(docs, contexts):
+        check_coreferring_noun_pairs(rules_analyzer, doc, context)
+    noun_pair_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    number_of_calls = 0
+    for doc in docs:
+        for token in doc:
+            rules_analyzer.refers_to_person(token)
+            number_of_calls += 1
+    refers_to_person_seconds = time.perf_counter() - start
+    for doc in docs:
+        rules_analyzer.release_predicate_cache(doc)
+    print("initialize: {:.0f} tokens/s".format(number_of_tokens / initialize_seconds))
+    print(
+        "coreferring noun pairs: {:.0f} tokens/s".format(
+            number_of_tokens / noun_pair_seconds
+        )
+    )
+    print(
+        "refers_to_person: {:.1f} us per call".format(
+            1000000 * refers_to_person_seconds / number_of_calls
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Measures the cost per token of building position maps as sentences get longer. The
+time per token should stay roughly flat because the tree statistics are calculated in a
+single pass over each document.
+
+Usage: python benchmarks/position_map_scaling.py
+"""
+import time
+from coreferee.rules import RulesAnalyzerFactory
+from coreferee.tendencies import TendenciesAnalyzer, generate_feature_table
+from synthetic_docs import get_nlp, make_doc
+
+SENTENCE_LENGTHS = (25, 50, 100, 200, 400, 800)
+TOKENS_PER_RUN = 8000
+
+
+def previous_rank_at_depth(token):
+    """The per-token calculation that the tree statistics replaced, for comparison."""
+    depth = len(list(token.ancestors))
+    return len(
+        [
+            1
+            for token_in_sentence in token.sent
+            if token_in_sentence.i < token.i
+            and len(list(token_in_sentence.ancestors)) == depth
+        ]
+    )
+
+
+def main():
+    nlp = get_nlp("en")
+    rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
+    print("sentence length   us/token   us/token (previous rank at depth)")
+    for sentence_length in SENTENCE_LENGTHS:
+        doc = make_doc(
+            nlp,
+            sentence_length,
+            number_of_sentences=TOKENS_PER_RUN // sentence_length,
+            with_pronouns=False,
+        )
+        context = rules_analyzer.initialize(doc)
+        tendencies_analyzer = TendenciesAnalyzer(
+            rules_analyzer, nlp, generate_feature_table([doc], nlp, [context])
+        )
+        start = time.perf_counter()
+        for token in doc:
+            tendencies_analyzer.get_token_position_map(token, context)
+        elapsed = time.perf_counter() - start
+        # the previous calculation is only timed on a sample of tokens to keep the
+        # benchmark short
+        sample = doc[: min(len(doc), 400)]
+        start = time.perf_counter()
+        for token in sample:
+            previous_rank_at_depth(token)
+        previous_elapsed = time.perf_counter() - start
+        print(
+            "{:>15}   {:>8.2f}   {:>8.2f}".format(
+                sentence_length,
+                1_000_000 * elapsed / len(doc),
+                1_000_000 * previous_elapsed / len(sample),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Measures the time taken to initialize documents and generate a feature table from them
+with and without the per-document predicate cache, and reports the proportion of calls
+to each memoized predicate that the cache answered.
+
+Usage: python benchmarks/predicate_cache.py
+"""
+import time
+from coreferee.rules import RulesAnalyzerFactory
+from coreferee.tendencies import generate_feature_table
+from synthetic_docs import get_nlp, make_doc
+
+SENTENCE_LENGTH = 15
+NUMBER_OF_SENTENCES = 20
+NUMBER_OF_DOCS = 20
+
+
+def main():
+    nlp = get_nlp("en")
+    rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
+    docs = [
+        make_doc(nlp, SENTENCE_LENGTH, NUMBER_OF_SENTENCES, seed=seed)
+        for seed in range(NUMBER_OF_DOCS)
+    ]
+    for memoize_predicates in (False, True):
+        rules_analyzer.memoize_predicates = memoize_predicates
+        start = time.perf_counter()
+        contexts = [rules_analyzer.initialize(doc) for doc in docs]
+        generate_feature_table(docs, nlp, contexts)
+        elapsed = time.perf_counter() - start
+        for doc in docs:
+            rules_analyzer.release_predicate_cache(doc)
+        print("memoize_predicates={}: {:.3f} s".format(memoize_predicates, elapsed))
+    for name, hit_rate in rules_analyzer.get_predicate_cache_hit_rates().items():
+        print("{:<36} {:>6.1%}".format(name, hit_rate))
+
+
+if __name__ == "__main__":
+    main()
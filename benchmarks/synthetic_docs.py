@@ -0,0 +1,345 @@
+"""Builds parsed documents with random projective dependency trees so that the benchmarks
+can exercise Coreferee without a trained Spacy model being installed.
+"""
+import random
+from importlib import import_module
+from typing import Dict, List, Tuple
+import numpy
+import spacy
+from spacy.language import Language
+from spacy.tokens import Doc
+
+# (text, lemma, pos, tag, morph, deps the token may have)
+Entry = Tuple[str, str, str, str, str, List[str]]
+
+LEXICONS: Dict[str, Dict[str, List[Entry]]] = {
+    "en": {
+        "nouns": [
+            (
+                "man",
+                "man",
+                "NOUN",
+                "NN",
+                "Number=Sing",
+                ["nsubj", "dobj", "pobj", "conj"],
+            ),
+            ("women", "woman", "NOUN", "NNS", "Number=Plur", ["nsubj", "dobj", "pobj"]),
+            ("house", "house", "NOUN", "NN", "Number=Sing", ["nsubj", "dobj", "pobj"]),
+            ("company", "company", "NOUN", "NN", "Number=Sing", ["nsubj", "dobj"]),
+            (
+                "Peter",
+                "Peter",
+                "PROPN",
+                "NNP",
+                "Number=Sing",
+                ["nsubj", "dobj", "conj"],
+            ),
+            ("Mary", "Mary", "PROPN", "NNP", "Number=Sing", ["nsubj", "dobj", "pobj"]),
+        ],
+        "pronouns": [
+            (
+                "he",
+                "he",
+                "PRON",
+                "PRP",
+                "Case=Nom|Gender=Masc|Number=Sing|Person=3|PronType=Prs",
+                ["nsubj"],
+            ),
+            (
+                "she",
+                "she",
+                "PRON",
+                "PRP",
+                "Case=Nom|Gender=Fem|Number=Sing|Person=3|PronType=Prs",
+                ["nsubj"],
+            ),
+            (
+                "it",
+                "it",
+                "PRON",
+                "PRP",
+                "Gender=Neut|Number=Sing|Person=3|PronType=Prs",
+                ["nsubj", "dobj"],
+            ),
+            (
+                "they",
+                "they",
+                "PRON",
+                "PRP",
+                "Case=Nom|Number=Plur|Person=3|PronType=Prs",
+                ["nsubj"],
+            ),
+            (
+                "his",
+                "his",
+                "PRON",
+                "PRP$",
+                "Gender=Masc|Number=Sing|Person=3|Poss=Yes|PronType=Prs",
+                ["poss"],
+            ),
+        ],
+        "verbs": [
+            (
+                "saw",
+                "see",
+                "VERB",
+                "VBD",
+                "Tense=Past|VerbForm=Fin",
+                ["ccomp", "advcl", "relcl", "conj"],
+            ),
+            (
+                "said",
+                "say",
+                "VERB",
+                "VBD",
+                "Tense=Past|VerbForm=Fin",
+                ["ccomp", "advcl", "conj"],
+            ),
+            (
+                "built",
+                "build",
+                "VERB",
+                "VBD",
+                "Tense=Past|VerbForm=Fin",
+                ["relcl", "advcl"],
+            ),
+        ],
+        "others": [
+            ("the", "the", "DET", "DT", "Definite=Def|PronType=Art", ["det"]),
+            ("a", "a", "DET", "DT", "Definite=Ind|PronType=Art", ["det"]),
+            ("and", "and", "CCONJ", "CC", "ConjType=Cmp", ["cc"]),
+            ("in", "in", "ADP", "IN", "", ["prep"]),
+            ("big", "big", "ADJ", "JJ", "Degree=Pos", ["amod"]),
+            (",", ",", "PUNCT", ",", "PunctType=Comm", ["punct"]),
+        ],
+    },
+    "fr": {
+        "nouns": [
+            (
+                "homme",
+                "homme",
+                "NOUN",
+                "NOUN",
+                "Gender=Masc|Number=Sing",
+                ["nsubj", "obj", "obl:mod", "conj"],
+            ),
+            (
+                "femmes",
+                "femme",
+                "NOUN",
+                "NOUN",
+                "Gender=Fem|Number=Plur",
+                ["nsubj", "obj", "obl:mod"],
+            ),
+            (
+                "maison",
+                "maison",
+                "NOUN",
+                "NOUN",
+                "Gender=Fem|Number=Sing",
+                ["nsubj", "obj", "obl:mod"],
+            ),
+            (
+                "ministre",
+                "ministre",
+                "NOUN",
+                "NOUN",
+                "Number=Sing",
+                ["nsubj", "obj"],
+            ),
+            (
+                "Pierre",
+                "Pierre",
+                "PROPN",
+                "PROPN",
+                "Gender=Masc|Number=Sing",
+                ["nsubj", "obj", "conj"],
+            ),
+            (
+                "Marie",
+                "Marie",
+                "PROPN",
+                "PROPN",
+                "Gender=Fem|Number=Sing",
+                ["nsubj", "obj", "obl:mod"],
+            ),
+        ],
+        "pronouns": [
+            (
+                "il",
+                "il",
+                "PRON",
+                "PRON",
+                "Gender=Masc|Number=Sing|Person=3|PronType=Prs",
+                ["nsubj"],
+            ),
+            (
+                "elle",
+                "elle",
+                "PRON",
+                "PRON",
+                "Gender=Fem|Number=Sing|Person=3|PronType=Prs",
+                ["nsubj"],
+            ),
+            (
+                "ils",
+                "il",
+                "PRON",
+                "PRON",
+                "Gender=Masc|Number=Plur|Person=3|PronType=Prs",
+                ["nsubj"],
+            ),
+            (
+                "la",
+                "le",
+                "PRON",
+                "PRON",
+                "Gender=Fem|Number=Sing|Person=3|PronType=Prs",
+                ["obj"],
+            ),
+        ],
+        "verbs": [
+            (
+                "voyait",
+                "voir",
+                "VERB",
+                "VERB",
+                "Mood=Ind|Number=Sing|Person=3|Tense=Imp|VerbForm=Fin",
+                ["ccomp", "advcl", "acl:relcl", "conj"],
+            ),
+            (
+                "disait",
+                "dire",
+                "VERB",
+                "VERB",
+                "Mood=Ind|Number=Sing|Person=3|Tense=Imp|VerbForm=Fin",
+                ["ccomp", "advcl", "conj"],
+            ),
+            (
+                "construisait",
+                "construire",
+                "VERB",
+                "VERB",
+                "Mood=Ind|Number=Sing|Person=3|Tense=Imp|VerbForm=Fin",
+                ["acl:relcl", "advcl"],
+            ),
+        ],
+        "others": [
+            (
+                "le",
+                "le",
+                "DET",
+                "DET",
+                "Definite=Def|Gender=Masc|Number=Sing|PronType=Art",
+                ["det"],
+            ),
+            (
+                "une",
+                "un",
+                "DET",
+                "DET",
+                "Definite=Ind|Gender=Fem|Number=Sing|PronType=Art",
+                ["det"],
+            ),
+            ("et", "et", "CCONJ", "CCONJ", "", ["cc"]),
+            ("dans", "dans", "ADP", "ADP", "", ["case"]),
+            ("grand", "grand", "ADJ", "ADJ", "Gender=Masc|Number=Sing", ["amod"]),
+            (",", ",", "PUNCT", "PUNCT", "", ["punct"]),
+        ],
+    },
+}
+
+ROOT_DEP = "ROOT"
+
+
+def get_nlp(lang: str = "en", vector_width: int = 50) -> Language:
+    """Returns a blank pipeline whose vocabulary has random vectors for the lexicon."""
+    nlp = spacy.blank(lang)
+    rng = numpy.random.RandomState(0)
+    words = {
+        entry[field]
+        for group in LEXICONS[lang].values()
+        for entry in group
+        for field in (0, 1)
+    }
+    words.add(
+        import_module(
+            ".".join(("coreferee.lang", lang, "language_specific_rules"))
+        ).LanguageSpecificRulesAnalyzer.random_word
+    )
+    for word in sorted(words):
+        nlp.vocab.set_vector(word, rng.uniform(-1, 1, vector_width).astype("float32"))
+    return nlp
+
+
+def _add_sentence(
+    rng: random.Random,
+    lang: str,
+    length: int,
+    with_pronouns: bool,
+    sentence: Dict[str, list],
+):
+    lexicon = LEXICONS[lang]
+    groups = ["nouns"] * 3 + ["verbs"] * 2 + ["others"] * 3
+    if with_pronouns:
+        groups.extend(["pronouns"] * 2)
+    entries = [rng.choice(lexicon[rng.choice(groups)]) for _ in range(length)]
+    heads = [0] * length
+    deps = [""] * length
+
+    def attach(start: int, end: int, parent: int):
+        # choose a root for the span and attach the material either side of it to that
+        # root: this always generates a projective tree
+        while start < end:
+            if parent < 0:
+                verbs = [i for i in range(start, end) if entries[i][2] == "VERB"]
+                root = verbs[len(verbs) // 2] if verbs else (start + end) // 2
+            else:
+                root = rng.randrange(start, end)
+            heads[root] = root if parent < 0 else parent
+            deps[root] = ROOT_DEP if parent < 0 else rng.choice(entries[root][5])
+            if root - start > end - root - 1:
+                attach(root + 1, end, root)
+                end = root
+            else:
+                attach(start, root, root)
+                start = root + 1
+            parent = root
+
+    attach(0, length, -1)
+    offset = len(sentence["words"])
+    for index, entry in enumerate(entries):
+        sentence["words"].append(entry[0])
+        sentence["lemmas"].append(entry[1])
+        sentence["pos"].append(entry[2])
+        sentence["tags"].append(entry[3])
+        sentence["morphs"].append(entry[4])
+        sentence["heads"].append(heads[index] + offset)
+        sentence["deps"].append(deps[index])
+
+
+def make_doc(
+    nlp: Language,
+    sentence_length: int,
+    number_of_sentences: int = 1,
+    *,
+    with_pronouns: bool = True,
+    seed: int = 0
+) -> Doc:
+    """Returns a parsed document made up of *number_of_sentences* random sentences that
+    each contain *sentence_length* tokens. Without pronouns, the rules analysis of the
+    document is quick because there are no anaphors whose antecedents need to be found.
+    """
+    rng = random.Random(seed)
+    fields: Dict[str, list] = {
+        "words": [],
+        "lemmas": [],
+        "pos": [],
+        "tags": [],
+        "morphs": [],
+        "heads": [],
+        "deps": [],
+    }
+    for _ in range(number_of_sentences):
+        _add_sentence(rng, nlp.lang, sentence_length, with_pronouns, fields)
+    return Doc(nlp.vocab, **fields)
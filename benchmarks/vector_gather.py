@@ -0,0 +1,130 @@
+"""Measures the layers that gather the referrer and antecedent vectors for the neural
+ensemble on documents with hundreds of anaphors, comparing them with the previous
+implementations that built the vectors row by row.
+
+Usage: python benchmarks/vector_gather.py
+"""
+import time
+from typing import cast
+import numpy
+from thinc.api import get_current_ops
+from coreferee.rules import RulesAnalyzerFactory
+from coreferee.tendencies import (
+    DocumentPairInfo,
+    TendenciesAnalyzer,
+    antecedent_heads_forward,
+    antecedents_forward,
+    generate_feature_table,
+    get_antecedent_heads,
+    get_antecedents,
+    get_referrer_heads,
+    get_referrers,
+    referrer_heads_forward,
+    referrers_forward,
+)
+from synthetic_docs import get_nlp, make_doc
+
+SENTENCE_LENGTH = 15
+NUMBERS_OF_SENTENCES = (25, 50, 100)
+REPETITIONS = 20
+
+
+def previous_referrers(ops, document_pair_info, context, attribute):
+    return ops.asarray2f(
+        [
+            getattr(context, attribute)[referrer]
+            for referrer in document_pair_info.referrers.tolist()
+        ]
+    )[ops.asarray1i(document_pair_info.referrers2candidates_pointers)]
+
+
+def previous_antecedents(ops, document_pair_info, context):
+    return ops.asarray2f(
+        [
+            ops.asarray1f(
+                [
+                    context.vectors[cast(int, index[0])]
+                    for index in document_pair_info.antecedents[i].dataXd.tolist()
+                ]
+            ).mean(axis=0)
+            for i in range(len(document_pair_info.antecedents))
+        ]
+    )[ops.asarray1i(document_pair_info.candidates.dataXd)]
+
+
+def previous_antecedent_heads(ops, document_pair_info, context):
+    return ops.asarray2f(
+        [
+            context.head_vectors[
+                cast(int, document_pair_info.antecedents[i].dataXd.tolist()[0][0])
+            ]
+            for i in range(len(document_pair_info.antecedents))
+        ]
+    )[ops.asarray1i(document_pair_info.candidates.dataXd)]
+
+
+def time_call(function):
+    start = time.perf_counter()
+    for _ in range(REPETITIONS):
+        result = function()
+    return 1000 * (time.perf_counter() - start) / REPETITIONS, result
+
+
+def main():
+    ops = get_current_ops()
+    nlp = get_nlp("en")
+    rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
+    print(
+        "anaphors   pairs   layer              ms (previous)   ms (current)   max diff"
+    )
+    for number_of_sentences in NUMBERS_OF_SENTENCES:
+        doc = make_doc(nlp, SENTENCE_LENGTH, number_of_sentences)
+        context = rules_analyzer.initialize(doc)
+        tendencies_analyzer = TendenciesAnalyzer(
+            rules_analyzer, nlp, generate_feature_table([doc], nlp, [context])
+        )
+        document_pair_info = DocumentPairInfo.from_doc(
+            doc, context, tendencies_analyzer, 5
+        )
+        X = [document_pair_info]
+        layers = (
+            (
+                "referrers",
+                lambda: previous_referrers(ops, document_pair_info, context, "vectors"),
+                lambda: referrers_forward(get_referrers(), X, False)[0],
+            ),
+            (
+                "referrer heads",
+                lambda: previous_referrers(
+                    ops, document_pair_info, context, "head_vectors"
+                ),
+                lambda: referrer_heads_forward(get_referrer_heads(), X, False)[0],
+            ),
+            (
+                "antecedents",
+                lambda: previous_antecedents(ops, document_pair_info, context),
+                lambda: antecedents_forward(get_antecedents(), X, False)[0],
+            ),
+            (
+                "antecedent heads",
+                lambda: previous_antecedent_heads(ops, document_pair_info, context),
+                lambda: antecedent_heads_forward(get_antecedent_heads(), X, False)[0],
+            ),
+        )
+        for name, previous, current in layers:
+            previous_ms, previous_result = time_call(previous)
+            current_ms, current_result = time_call(current)
+            print(
+                "{:>8}   {:>5}   {:<16}   {:>13.3f}   {:>12.3f}   {:>8.1e}".format(
+                    len(document_pair_info.referrers),
+                    len(document_pair_info.candidates.dataXd),
+                    name,
+                    previous_ms,
+                    current_ms,
+                    float(numpy.abs(previous_result - current_result).max()),
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
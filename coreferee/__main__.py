@@ -4,7 +4,7 @@ import sys
 import pkg_resources
 from spacy.util import run_command
 from .training.train import TrainingManager
-from .manager import COMMON_MODELS_PACKAGE_NAMEPART
+from .manager import COMMON_MODELS_PACKAGE_NAMEPART, export_runtimes
 
 DOWNLOAD_URL = "https://github.com/msg-systems/coreferee/raw/master/models"
 
@@ -81,6 +81,19 @@ install_parser.add_argument(
     help="Forces a reinstall when models are downloaded from Github (when models are being installed from the local filesystem, a reinstall always takes place)",
 )
 install_parser.add_argument("lang", help="The ISO 639-1 code for the language to train")
+export_runtime_parser = subparsers.add_parser(
+    "export-runtime",
+    help="Export the installed models for a language to runtime files that allow documents to be scored without Thinc. Type *python -m coreferee export-runtime -h* for more information.",
+)
+export_runtime_parser.add_argument(
+    "lang", help="The ISO 639-1 code for the language whose models to export"
+)
+export_runtime_parser.add_argument(
+    "--precision",
+    default="float32",
+    choices=["float32", "float16", "int8"],
+    help="The precision with which to store the weights. *int8* stores the dense layers as eight-bit integers and the remaining weights as half-precision floats.",
+)
 
 args = parser.parse_args()
 if args.command == "train":
@@ -126,5 +139,7 @@ elif args.command == "install":
                 )
             )
         )
+elif args.command == "export-runtime":
+    export_runtimes(args.lang, args.precision)
 else:
     parser.print_help()
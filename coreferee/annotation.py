@@ -1,84 +1,220 @@
-from typing import Dict, Set, List, Deque, cast
+from typing import Callable, Dict, Set, List, Deque, Optional, Tuple, Union, cast
+from bisect import bisect_left
 from collections import deque
 from spacy.tokens import Doc, Token, Span
 from spacy.language import Language
 from thinc.model import Model
-from .data_model import Mention, Chain, FeatureTable
-from .rules import RulesAnalyzerFactory
-from .tendencies import TendenciesAnalyzer
+from .data_model import ChainHolder, Chain, DocContext, FeatureTable, Mention
+from .rules import RulesAnalyzer, RulesAnalyzerFactory
+from .tendencies import TendenciesAnalyzer, FusedEnsemble
 
 
-class Annotator:
+class PrecedingNounIndex:
+    """Indexes the potentially referring nouns that *Annotator.build_chains()* has passed
+    by the keys returned by *RulesAnalyzer.get_coreferring_noun_query_keys()*, so that the
+    preceding nouns that could form potential coreferring noun pairs with a noun can be
+    found without testing every preceding token."""
 
-    RETRY_DEPTH = 5
+    def __init__(self, rules_analyzer: RulesAnalyzer, context: DocContext):
+        self.rules_analyzer = rules_analyzer
+        self.context = context
+        self.token_indexes: Dict[Tuple, List[int]] = {}
+        self.last_added_index = -1
 
-    def __init__(
-        self,
-        nlp: Language,
-        vectors_nlp: Language,
-        feature_table: FeatureTable,
-        thinc_ensemble: Model,
-    ):
-        self.thinc_ensemble = thinc_ensemble
-        self.rules_analyzer = RulesAnalyzerFactory().get_rules_analyzer(nlp)
-        self.tendencies_analyzer = TendenciesAnalyzer(
-            self.rules_analyzer, vectors_nlp, feature_table
+    def add(self, token: Token) -> None:
+        """Adds *token* if it is potentially referring. Tokens must be added in document
+        order."""
+        if token.i <= self.last_added_index:
+            return
+        self.last_added_index = token.i
+        if not self.context.potentially_referring[token.i]:
+            return
+        for key in self.rules_analyzer.get_coreferring_noun_query_keys(token):
+            self.token_indexes.setdefault(key, []).append(token.i)
+
+    def is_indexed(self, token_index: int) -> bool:
+        """Returns *True* if the token at *token_index* has been added and is potentially
+        referring, in which case *get_candidate_indexes()* returns it for every following
+        token with which it shares a key."""
+        return (
+            token_index <= self.last_added_index
+            and self.context.potentially_referring[token_index]
         )
 
+    def get_candidate_indexes(self, token: Token, start_index: int) -> Set[int]:
+        """Returns the indexes of the nouns from *start_index* up to but excluding *token*
+        that share a key with *token*. These are the only preceding tokens for which
+        *RulesAnalyzer.is_potential_coreferring_noun_pair(preceding_token, token)* can
+        return *True*."""
+        candidate_indexes = set()
+        for key in self.rules_analyzer.get_coreferring_noun_keys(token):
+            token_indexes = self.token_indexes.get(key)
+            if token_indexes is None:
+                continue
+            for index in token_indexes[bisect_left(token_indexes, start_index) :]:
+                if index >= token.i:
+                    break
+                candidate_indexes.add(index)
+        return candidate_indexes
+
+
+class MentionSets:
+    """The sets of mentions from which *Annotator.build_chains()* generates the chains.
+
+    *without_coordination* maps the index of the root of each mention without coordination
+    to its set and is the main means of generating and tracking chains.
+
+    *with_coordination* maps each index within a mention with coordination to its set and
+    tracks the ends of chains that end in a mention with coordination. It is necessary
+    for the case where two anaphors both refer to a mention with coordination. It has to
+    be kept separate from the main dictionary to cover the case where a mention with
+    coordination itself contains an anaphor that belongs to a separate chain.
+
+    When two chains are merged, the mentions of the smaller set are added to the larger
+    set if both sets are *regular*, meaning that the keys that map to them within
+    *without_coordination* are exactly the root indexes of their members and that no key
+    maps to them within *with_coordination*. Merging the other way round then gives the
+    same mappings and the same chains while moving fewer mentions. Sets that may not be
+    regular are recorded in *irregular_sets*, which maps the identity of each set to the
+    set itself so that the identity cannot be reused by a new set. These sets are always
+    merged in the order the chains were found.
+    """
+
+    def __init__(self):
+        self.without_coordination: Dict[int, Set[Mention]] = {}
+        self.with_coordination: Dict[int, Set[Mention]] = {}
+        self.irregular_sets: Dict[int, Set[Mention]] = {}
+
     @staticmethod
-    def record_mention(
-        preceding_mention: Mention,
-        token: Token,
-        token_indexes_without_coordination_to_mention_sets: Dict[int, Set[Mention]],
-        token_indexes_with_coordination_to_mention_sets: Dict[int, Set[Mention]],
-    ) -> None:
-        """*token_indexes_without_coordination_to_mention_sets* is the main means of
-        generating and tracking chains.
-
-        *token_indexes_with_coordination_to_mention_sets* tracks the ends of chains that
-        end in a mention with coordination. It is necessary for the case where two anaphors
-        both refer to a mention with coordination. It has to be kept separate from the main
-        dictionary to cover the case where a mention with coordination itself contains an
-        anaphor that belongs to a separate chain.
-        """
+    def get_mention_set(
+        dictionary: Dict[int, Set[Mention]], token_index: int
+    ) -> Optional[Set[Mention]]:
+        """Returns the set that *token_index* is mapped to within *dictionary*, which is
+        either *without_coordination* or *with_coordination*, or *None* if it is not
+        mapped to a set. The set must not be changed."""
+        return dictionary.get(token_index)
+
+    def record_mention(self, preceding_mention: Mention, token: Token) -> None:
+        """Records that *token* belongs to the same chain as *preceding_mention*."""
         if len(preceding_mention.token_indexes) > 1:
-            if (
-                preceding_mention.root_index
-                in token_indexes_with_coordination_to_mention_sets
-            ):
-                mention_set = token_indexes_with_coordination_to_mention_sets[
-                    preceding_mention.root_index
-                ]
+            if preceding_mention.root_index in self.with_coordination:
+                mention_set = self.with_coordination[preceding_mention.root_index]
             else:
                 mention_set = {preceding_mention}
                 for token_index in preceding_mention.token_indexes:
-                    token_indexes_with_coordination_to_mention_sets[
-                        token_index
-                    ] = mention_set
+                    self.with_coordination[token_index] = mention_set
+                self.irregular_sets[id(mention_set)] = mention_set
         else:
-            preceding_token = token.doc[preceding_mention.root_index]
-            if preceding_token.i in token_indexes_without_coordination_to_mention_sets:
-                mention_set = token_indexes_without_coordination_to_mention_sets[
-                    preceding_token.i
-                ]
+            if preceding_mention.root_index in self.without_coordination:
+                mention_set = self.without_coordination[preceding_mention.root_index]
             else:
                 mention_set = {preceding_mention}
-                token_indexes_without_coordination_to_mention_sets[
-                    preceding_token.i
-                ] = mention_set
+                self.without_coordination[preceding_mention.root_index] = mention_set
         mention_set.add(Mention(token, False))
-        if token.i in token_indexes_without_coordination_to_mention_sets:
-            mention_set.update(
-                token_indexes_without_coordination_to_mention_sets[token.i]
-            )
-            for mention in token_indexes_without_coordination_to_mention_sets[token.i]:
-                token_indexes_without_coordination_to_mention_sets[
-                    mention.root_index
-                ] = mention_set
+        if token.i in self.without_coordination:
+            self.merge(mention_set, self.without_coordination[token.i])
+        else:
+            self.without_coordination[token.i] = mention_set
+
+    def merge(self, mention_set: Set[Mention], other_mention_set: Set[Mention]) -> None:
+        """Merges *other_mention_set*, which the token just added to *mention_set* is
+        mapped to within *without_coordination*, into *mention_set*."""
+        without_coordination = self.without_coordination
+        irregular_sets = self.irregular_sets
+        mention_set_is_regular = id(mention_set) not in irregular_sets
+        other_mention_set_is_regular = id(other_mention_set) not in irregular_sets
+        if mention_set_is_regular and other_mention_set_is_regular:
+            if other_mention_set is mention_set:
+                return
+            if len(other_mention_set) > len(mention_set):
+                mention_set, other_mention_set = other_mention_set, mention_set
+            mention_set.update(other_mention_set)
+            for mention in other_mention_set:
+                without_coordination[mention.root_index] = mention_set
+            return
+        mention_set.update(other_mention_set)
+        for mention in other_mention_set:
+            replaced_mention_set = without_coordination.get(mention.root_index)
+            if (
+                replaced_mention_set is not None
+                and replaced_mention_set is not mention_set
+            ):
+                # *replaced_mention_set* may still contain *mention*
+                irregular_sets[id(replaced_mention_set)] = replaced_mention_set
+            without_coordination[mention.root_index] = mention_set
+        irregular_sets[id(mention_set)] = mention_set
+
+    def delete_for_rewind(self, previous_token: Token, token: Token) -> None:
+        """Removes the mentions of the tokens from *previous_token* to *token* inclusive
+        before the anaphors between them are processed again."""
+
+        def intern_delete_for_rewind(
+            dictionary: Dict[int, Set[Mention]], working_token: Token
+        ):
+            mention_set = dictionary[working_token.i]
+            working_mention = Mention(working_token, False)
+            if working_mention in mention_set:
+                mention_set.remove(working_mention)
+            del dictionary[working_token.i]
+            if len(mention_set) == 1:
+                remaining_mention = list(mention_set)[0]
+                if remaining_mention.root_index in dictionary:
+                    # is not the case where *remaining_mention* involves coordination
+                    remaining_mention_set = dictionary[remaining_mention.root_index]
+                    self.irregular_sets[
+                        id(remaining_mention_set)
+                    ] = remaining_mention_set
+                    del dictionary[remaining_mention.root_index]
+
+        without_coordination = self.without_coordination
+        with_coordination = self.with_coordination
+        for working_token in token.doc[previous_token.i : token.i + 1]:
+            # most tokens in the range are not mentions
+            if working_token.i in without_coordination:
+                intern_delete_for_rewind(without_coordination, working_token)
+            if working_token.i in with_coordination:
+                intern_delete_for_rewind(with_coordination, working_token)
+
+    def get_chains(self) -> List[Set[Mention]]:
+        """Returns each set that is mapped to from *without_coordination*."""
+        visited_token_indexes = set()
+        mention_sets = []
+        for token_index, mention_set in self.without_coordination.items():
+            if token_index in visited_token_indexes:
+                continue
+            mention_sets.append(mention_set)
+            for mention in mention_set:
+                if len(mention.token_indexes) == 1:
+                    visited_token_indexes.add(mention.root_index)
+        return mention_sets
+
+
+class Annotator:
+
+    RETRY_DEPTH = 5
+
+    def __init__(
+        self,
+        nlp: Language,
+        vectors_nlp: Language,
+        feature_table: FeatureTable,
+        thinc_ensemble: Union[Model, FusedEnsemble],
+    ):
+        """*thinc_ensemble* is either a trained Thinc model or a *FusedEnsemble* that was
+        loaded from a runtime file, in which case Thinc is not used to score documents.
+        """
+        if isinstance(thinc_ensemble, FusedEnsemble):
+            self.fused_ensemble = thinc_ensemble
         else:
-            token_indexes_without_coordination_to_mention_sets[token.i] = mention_set
+            self.fused_ensemble = FusedEnsemble.from_thinc_model(thinc_ensemble)
+        self.rules_analyzer = RulesAnalyzerFactory().get_rules_analyzer(nlp)
+        self.tendencies_analyzer = TendenciesAnalyzer(
+            self.rules_analyzer, vectors_nlp, feature_table
+        )
 
-    def get_compatibility(self, token: Token, mention_set: Set[Mention]) -> int:
+    def get_compatibility(
+        self, token: Token, context: DocContext, mention_set: Set[Mention]
+    ) -> int:
         """Checks the compatibility of *token* with the possible chain represented by *mention_set*
         and expresses it with the semantics of *RuleAnalyzer.is_potential_anaphoric_pair()*.
         """
@@ -89,7 +225,7 @@ class Annotator:
             if self.rules_analyzer.is_independent_noun(token.doc[mention.root_index]):
                 mention_set_contains_referring_mention = True
             working_result = self.rules_analyzer.is_potential_anaphoric_pair(
-                mention, token, False
+                mention, token, context, False
             )
             if working_result < result:
                 result = working_result
@@ -102,116 +238,143 @@ class Annotator:
     def temp_annotate_any_coreferring_noun_link(
         self,
         token: Token,
+        context: DocContext,
         sentence_deque: Deque[Span],
-        token_indexes_without_coordination_to_mention_sets: Dict[int, Set[Mention]],
-        token_indexes_with_coordination_to_mention_sets: Dict[int, Set[Mention]],
+        mention_sets: MentionSets,
+        preceding_noun_index: Optional[PrecedingNounIndex] = None,
     ) -> None:
         doc = token.doc
-        if not token._.coref_chains.temp_potentially_referring:
+        if not context.potentially_referring[token.i]:
             return
-        for sent in sentence_deque:
-            for preceding_token in (
-                doc[index]
+        if preceding_noun_index is None:
+            preceding_indexes = (
+                index
+                for sent in sentence_deque
                 for index in range(sent.end, sent.start - 1, -1)
                 if index < token.i
+            )
+            candidate_indexes = None
+        else:
+            # The same tokens in the same order as above, but only the nouns that share
+            # a key with *token* are tested as potential coreferring noun pairs
+            start_index = sentence_deque[-1].start
+            preceding_indexes = range(token.i - 1, start_index - 1, -1)
+            candidate_indexes = preceding_noun_index.get_candidate_indexes(
+                token, start_index
+            )
+        # Used with the index: the result of checking each existing chain, keyed by the
+        # identity of its set, which does not change until a mention is recorded
+        chain_results: Dict[int, bool] = {}
+        # Used with the index: the indexes of the nouns anywhere before *token* that
+        # share a key with it, retrieved when the first existing chain is checked
+        chain_candidate_indexes: Optional[Set[int]] = None
+        for preceding_index in preceding_indexes:
+            if candidate_indexes is None:
+                is_candidate = context.potentially_referring[preceding_index]
+            else:
+                is_candidate = preceding_index in candidate_indexes
+            if is_candidate and self.rules_analyzer.is_potential_coreferring_noun_pair(
+                doc[preceding_index], token, context
             ):
-                if (
-                    preceding_token._.coref_chains.temp_potentially_referring
-                    and self.rules_analyzer.is_potential_coreferring_noun_pair(
-                        preceding_token, token
+                mention_sets.record_mention(Mention(doc[preceding_index], False), token)
+                return
+            mention_set = mention_sets.get_mention_set(
+                mention_sets.without_coordination, preceding_index
+            )
+            if mention_set is not None and preceding_noun_index is not None:
+                # as below, but each chain is only checked once and only those of its
+                # mentions that share a key with *token* or are not covered by the index
+                # are tested as potential coreferring noun pairs
+                if id(mention_set) not in chain_results:
+                    if chain_candidate_indexes is None:
+                        chain_candidate_indexes = (
+                            preceding_noun_index.get_candidate_indexes(token, 0)
+                        )
+                    chain_results[id(mention_set)] = any(
+                        self.rules_analyzer.is_potential_coreferring_noun_pair(
+                            doc[mention.root_index], token, context
+                        )
+                        for mention in mention_set
+                        if len(mention.token_indexes) == 1
+                        and (
+                            mention.root_index in chain_candidate_indexes
+                            or mention.root_index >= token.i
+                            or not preceding_noun_index.is_indexed(mention.root_index)
+                        )
                     )
-                ):
-                    self.record_mention(
-                        Mention(preceding_token, False),
-                        token,
-                        token_indexes_without_coordination_to_mention_sets,
-                        token_indexes_with_coordination_to_mention_sets,
+                if chain_results[id(mention_set)]:
+                    mention_sets.record_mention(
+                        Mention(doc[preceding_index], False), token
                     )
                     return
-                if (
-                    preceding_token.i
-                    in token_indexes_without_coordination_to_mention_sets
+            elif mention_set is not None:
+                # existing chain; the preceding token may be an anaphor linked to a noun
+                # that can form a noun pair with *token*
+                for mention in (
+                    mention
+                    for mention in mention_set
+                    if len(mention.token_indexes) == 1
                 ):
-                    # existing chain; *preceding_token* may be an anaphor linked to a noun
-                    # that can form a noun pair with *token*
-                    mention_set = token_indexes_without_coordination_to_mention_sets[
-                        preceding_token.i
-                    ]
-                    for mention in (
-                        mention
-                        for mention in mention_set
-                        if len(mention.token_indexes) == 1
+                    if self.rules_analyzer.is_potential_coreferring_noun_pair(
+                        doc[mention.root_index], token, context
                     ):
-                        if self.rules_analyzer.is_potential_coreferring_noun_pair(
-                            token.doc[mention.root_index], token
-                        ):
-                            self.record_mention(
-                                Mention(preceding_token, False),
-                                token,
-                                token_indexes_without_coordination_to_mention_sets,
-                                token_indexes_with_coordination_to_mention_sets,
-                            )
-                            return
+                        mention_sets.record_mention(
+                            Mention(doc[preceding_index], False), token
+                        )
+                        return
 
     def temp_annotate_any_anaphoric_link(
         self,
         token: Token,
-        token_indexes_without_coordination_to_mention_sets: Dict[int, Set[Mention]],
-        token_indexes_with_coordination_to_mention_sets: Dict[int, Set[Mention]],
+        context: DocContext,
+        mention_sets: MentionSets,
         permitted_start_index: int = 0,
     ) -> bool:
         """Returns *True* if an annotation occurred."""
 
         def check_mention_sets_for_reflexive_relationships(
-            mention: Mention, index_to_mention_set_dict: dict
+            mention: Mention, index_to_mention_set_dict: Dict[int, Set[Mention]]
         ) -> bool:
             for token_index in mention.token_indexes:
-                if token_index in index_to_mention_set_dict:
-                    for working_mention in index_to_mention_set_dict[token_index]:
+                mention_set = mention_sets.get_mention_set(
+                    index_to_mention_set_dict, token_index
+                )
+                if mention_set is not None:
+                    for working_mention in mention_set:
                         if self.rules_analyzer.is_potential_reflexive_pair(
-                            working_mention, token
+                            working_mention, token, context
                         ):
                             return True
             return False
 
         def intern_temp_annotate_any_anaphoric_link(allow_uncertainty: bool) -> bool:
             for index, potential_referred in enumerate(
-                token._.coref_chains.temp_potential_referreds
+                cast(List[Mention], context.potential_referreds[token.i])
             ):
                 if index < permitted_start_index or index >= self.RETRY_DEPTH:
                     continue
                 if len(potential_referred.token_indexes) == 1:
-                    if (
-                        potential_referred.root_index
-                        in token_indexes_without_coordination_to_mention_sets
-                    ):
-                        mention_set = (
-                            token_indexes_without_coordination_to_mention_sets[
-                                potential_referred.root_index
-                            ]
+                    mention_set = mention_sets.get_mention_set(
+                        mention_sets.without_coordination, potential_referred.root_index
+                    )
+                    if mention_set is not None:
+                        compatibility = self.get_compatibility(
+                            token, context, mention_set
                         )
-                        compatibility = self.get_compatibility(token, mention_set)
                         if compatibility == 0 or (
                             compatibility == 1 and not allow_uncertainty
                         ):
                             continue
                 if self.rules_analyzer.is_reflexive_anaphor(token) == 0 and (
                     check_mention_sets_for_reflexive_relationships(
-                        potential_referred,
-                        token_indexes_without_coordination_to_mention_sets,
+                        potential_referred, mention_sets.without_coordination
                     )
                     or check_mention_sets_for_reflexive_relationships(
-                        potential_referred,
-                        token_indexes_with_coordination_to_mention_sets,
+                        potential_referred, mention_sets.with_coordination
                     )
                 ):
                     continue
-                self.record_mention(
-                    potential_referred,
-                    token,
-                    token_indexes_without_coordination_to_mention_sets,
-                    token_indexes_with_coordination_to_mention_sets,
-                )
+                mention_sets.record_mention(potential_referred, token)
                 return True
             return False
 
@@ -219,66 +382,37 @@ class Annotator:
             return True
         return intern_temp_annotate_any_anaphoric_link(True)
 
-    def delete_from_collections_for_rewind(
-        self,
-        previous_token: Token,
-        token: Token,
-        token_indexes_without_coordination_to_mention_sets: Dict[int, Set[Mention]],
-        token_indexes_with_coordination_to_mention_sets: Dict[int, Set[Mention]],
-    ) -> None:
-        def intern_delete_from_collections_for_rewind(
-            dictionary: Dict[int, Set[Mention]], working_token: Token
-        ):
-            if working_token.i in dictionary:
-                mention_set = dictionary[working_token.i]
-                working_mention = Mention(working_token, False)
-                if working_mention in mention_set:
-                    mention_set.remove(working_mention)
-                del dictionary[working_token.i]
-                if len(mention_set) == 1:
-                    remaining_mention = list(mention_set)[0]
-                    if remaining_mention.root_index in dictionary:
-                        # is not the case where *remaining_mention* involves coordination
-                        del dictionary[remaining_mention.root_index]
-
-        doc = token.doc
-        for working_token in doc[previous_token.i : token.i + 1]:
-            intern_delete_from_collections_for_rewind(
-                token_indexes_without_coordination_to_mention_sets, working_token
-            )
-            intern_delete_from_collections_for_rewind(
-                token_indexes_with_coordination_to_mention_sets, working_token
-            )
-
     def attempt_rewind_with_previous_token_and_retry_index(
         self,
         retry_index: int,
         previous_token: Token,
         token: Token,
+        context: DocContext,
         sentence_deque: Deque[Span],
-        token_indexes_without_coordination_to_mention_sets: Dict[int, Set[Mention]],
-        token_indexes_with_coordination_to_mention_sets: Dict[int, Set[Mention]],
+        mention_sets: MentionSets,
+        preceding_noun_index: Optional[PrecedingNounIndex] = None,
     ) -> bool:
         """Returns *True* if the rewind attempt succeeded."""
         doc = token.doc
         if self.temp_annotate_any_anaphoric_link(
             previous_token,
-            token_indexes_without_coordination_to_mention_sets,
-            token_indexes_with_coordination_to_mention_sets,
+            context,
+            mention_sets,
             retry_index,
         ):
             for working_token in doc[previous_token.i + 1 : token.i + 1]:
                 self.temp_annotate_any_coreferring_noun_link(
                     working_token,
+                    context,
                     sentence_deque,
-                    token_indexes_without_coordination_to_mention_sets,
-                    token_indexes_with_coordination_to_mention_sets,
+                    mention_sets,
+                    preceding_noun_index,
                 )
-                if hasattr(working_token._.coref_chains, "temp_potential_referreds"):
+                if context.potential_referreds[working_token.i] is not None:
                     if not self.temp_annotate_any_anaphoric_link(
                         working_token,
-                        token_indexes_without_coordination_to_mention_sets,
-                        token_indexes_with_coordination_to_mention_sets,
+                        context,
+                        mention_sets,
                     ):
                         return False
             return True
@@ -287,19 +421,22 @@ class Annotator:
     def attempt_retry(
         self,
         token: Token,
+        context: DocContext,
         coreferring_deque: Deque[Token],
         sentence_deque: Deque[Span],
-        token_indexes_without_coordination_to_mention_sets: Dict[int, Set[Mention]],
-        token_indexes_with_coordination_to_mention_sets: Dict[int, Set[Mention]],
+        mention_sets: MentionSets,
+        preceding_noun_index: Optional[PrecedingNounIndex] = None,
     ) -> bool:
         """Called when an anaphor could not be assigned to a chain; attempts alternative
         interpretations of the preceding anaphors to see whether any allow all anaphors to be
         assigned. Returns *True* if the rewind attempt succeeded."""
         previous_token = None
+        sent_indexes = context.sent_indexes
         for retry_index in range(
             1,
             min(
-                self.RETRY_DEPTH, len(token._.coref_chains.temp_potential_referreds) + 1
+                self.RETRY_DEPTH,
+                len(cast(List[Mention], context.potential_referreds[token.i])) + 1,
             ),
         ):
             # we only need start with *previous_token* because any different interpretations of
@@ -307,40 +444,31 @@ class Annotator:
             for previous_token in (
                 t
                 for t in coreferring_deque
-                if token._.coref_chains.temp_sent_index
-                - t._.coref_chains.temp_sent_index
+                if sent_indexes[token.i] - sent_indexes[t.i]
                 <= self.rules_analyzer.maximum_anaphora_sentence_referential_distance
             ):
-                self.delete_from_collections_for_rewind(
-                    previous_token,
-                    token,
-                    token_indexes_without_coordination_to_mention_sets,
-                    token_indexes_with_coordination_to_mention_sets,
-                )
+                mention_sets.delete_for_rewind(previous_token, token)
                 if self.attempt_rewind_with_previous_token_and_retry_index(
                     retry_index,
                     previous_token,
                     token,
+                    context,
                     sentence_deque,
-                    token_indexes_without_coordination_to_mention_sets,
-                    token_indexes_with_coordination_to_mention_sets,
+                    mention_sets,
+                    preceding_noun_index,
                 ):
                     return True
         if previous_token is not None:
             # All attempts have failed, so return to the original interpretation
-            self.delete_from_collections_for_rewind(
-                previous_token,
-                token,
-                token_indexes_without_coordination_to_mention_sets,
-                token_indexes_with_coordination_to_mention_sets,
-            )
+            mention_sets.delete_for_rewind(previous_token, token)
             self.attempt_rewind_with_previous_token_and_retry_index(
                 0,
                 previous_token,
                 token,
+                context,
                 sentence_deque,
-                token_indexes_without_coordination_to_mention_sets,
-                token_indexes_with_coordination_to_mention_sets,
+                mention_sets,
+                preceding_noun_index,
             )
         return False
 
@@ -372,86 +500,129 @@ class Annotator:
                 stored_mention = mention
         return cast(Mention, stored_mention)
 
-    def annotate(self, doc: Doc, used_in_training=False) -> Doc:
-        if not used_in_training:
-            self.rules_analyzer.initialize(doc)
-        self.tendencies_analyzer.score(doc, self.thinc_ensemble)
-        token_indexes_without_coordination_to_mention_sets: Dict[int, Set[Mention]] = {}
-        token_indexes_with_coordination_to_mention_sets: Dict[int, Set[Mention]] = {}
+    def annotate(
+        self,
+        doc: Doc,
+        used_in_training=False,
+        context: Optional[DocContext] = None,
+    ) -> Doc:
+        """Annotates *doc*. *context* is the context that *RulesAnalyzer.initialize()*
+        returned for *doc* if it has already been initialized, as during training;
+        otherwise *doc* is initialized here."""
+        if context is None:
+            context = self.rules_analyzer.initialize(doc)
+        self.tendencies_analyzer.score(doc, context, self.fused_ensemble)
+        return self.build_chains(doc, context, used_in_training)
+
+    def annotate_batch(
+        self, docs: List[Doc], error_handler: Callable[[Doc], None]
+    ) -> List[Doc]:
+        """Annotates *docs*, scoring the potential pairs from all the documents with a
+        single call to the neural ensemble. If annotating a document raises an exception,
+        *error_handler* is called with that document from within the *except* block and
+        the other documents are annotated as normal. If the joint scoring raises an
+        exception, the documents are scored one at a time to find the document that
+        caused it."""
+        docs_and_contexts = []
+        for doc in docs:
+            try:
+                docs_and_contexts.append((doc, self.rules_analyzer.initialize(doc)))
+            except Exception:
+                error_handler(doc)
+        try:
+            self.tendencies_analyzer.score_batch(
+                [doc for doc, _ in docs_and_contexts],
+                [context for _, context in docs_and_contexts],
+                self.fused_ensemble,
+            )
+        except Exception:
+            scored_docs_and_contexts = []
+            for doc, context in docs_and_contexts:
+                try:
+                    self.tendencies_analyzer.score(doc, context, self.fused_ensemble)
+                    scored_docs_and_contexts.append((doc, context))
+                except Exception:
+                    error_handler(doc)
+            docs_and_contexts = scored_docs_and_contexts
+        for doc, context in docs_and_contexts:
+            try:
+                self.build_chains(doc, context)
+            except Exception:
+                error_handler(doc)
+        return docs
+
+    def build_chains(
+        self, doc: Doc, context: DocContext, used_in_training=False
+    ) -> Doc:
+        """Builds the coreference chains for *doc* once its potential pairs have been
+        scored and writes them to *doc._.coref_chains* and to *token._.coref_chains* for
+        each token in *doc*."""
+        mention_sets = MentionSets()
         sentence_deque: Deque[Span] = deque(
             maxlen=self.rules_analyzer.maximum_coreferring_nouns_sentence_referential_distance
             + 1
         )
         coreferring_deque: Deque[Token] = deque(maxlen=self.RETRY_DEPTH)
+        preceding_noun_index = (
+            PrecedingNounIndex(self.rules_analyzer, context)
+            if self.rules_analyzer.can_index_coreferring_nouns()
+            else None
+        )
         for sent in doc.sents:
             sentence_deque.appendleft(sent)
             for token in sent:
                 self.temp_annotate_any_coreferring_noun_link(
                     token,
+                    context,
                     sentence_deque,
-                    token_indexes_without_coordination_to_mention_sets,
-                    token_indexes_with_coordination_to_mention_sets,
+                    mention_sets,
+                    preceding_noun_index,
                 )
-                if hasattr(token._.coref_chains, "temp_potential_referreds"):
+                if preceding_noun_index is not None:
+                    preceding_noun_index.add(token)
+                if context.potential_referreds[token.i] is not None:
                     if self.temp_annotate_any_anaphoric_link(
                         token,
-                        token_indexes_without_coordination_to_mention_sets,
-                        token_indexes_with_coordination_to_mention_sets,
+                        context,
+                        mention_sets,
                     ) or self.attempt_retry(
                         token,
+                        context,
                         coreferring_deque,
                         sentence_deque,
-                        token_indexes_without_coordination_to_mention_sets,
-                        token_indexes_with_coordination_to_mention_sets,
+                        mention_sets,
+                        preceding_noun_index,
                     ):
                         coreferring_deque.appendleft(token)
 
-        visited_token_indexes = set()
         chains = []
-        for (
-            token_index,
-            mention_set,
-        ) in token_indexes_without_coordination_to_mention_sets.items():
-            if token_index in visited_token_indexes:
-                continue
-            mention_list = sorted(
-                list(mention_set), key=lambda mention: mention.root_index
-            )
+        for mention_set in mention_sets.get_chains():
+            mention_list = sorted(mention_set, key=lambda mention: mention.root_index)
             most_specific_mention = self.get_most_specific_mention(mention_list, doc)
-            chain = Chain(mention_list, mention_list.index(most_specific_mention))
-            chains.append(chain)
-            for mention in chain.mentions:
-                if len(mention.token_indexes) == 1:
-                    visited_token_indexes.add(mention.root_index)
+            chains.append(
+                Chain(mention_list, mention_list.index(most_specific_mention))
+            )
 
         chains.sort(key=lambda chain: chain.mentions[0].root_index)
 
+        # The chain holders are only assigned once they are complete because each
+        # assignment goes through the Spacy extension mechanism
+        token_chain_holders = [ChainHolder() for _ in range(len(doc))]
         for index, chain in enumerate(chains):
             chain.index = index
             for mention in chain.mentions:
-                for token in (
-                    doc[token_index] for token_index in mention.token_indexes
-                ):
-                    token._.coref_chains.chains.append(chain)
-
-        doc._.coref_chains.chains = chains
+                for token_index in mention.token_indexes:
+                    token_chain_holders[token_index].chains.append(chain)
+        doc_chain_holder = ChainHolder()
+        doc_chain_holder.chains = chains
+        doc._.coref_chains = doc_chain_holder
+        for token, token_chain_holder in zip(doc, token_chain_holders):
+            token._.coref_chains = token_chain_holder
 
         if not used_in_training:
-            # get rid of the *temp_* properties on the various objects
-            for temp_entry in [
-                t for t in doc._.coref_chains.__dict__ if t.startswith("temp_")
-            ][:]:
-                doc._.coref_chains.__dict__.pop(temp_entry)
-            for token in doc:
-                for temp_entry in [
-                    t for t in token._.coref_chains.__dict__ if t.startswith("temp_")
-                ][:]:
-                    token._.coref_chains.__dict__.pop(temp_entry)
-                    for chain in token._.coref_chains:
-                        for mention in chain:
-                            for inner_temp_entry in [
-                                t for t in mention.__dict__ if t.startswith("temp_")
-                            ][:]:
-                                mention.__dict__.pop(inner_temp_entry)
+            # the intermediate state is held in the context and the predicate cache rather
+            # than in the chains and mentions, so releasing the cache and dropping the
+            # context is all the cleanup that is required
+            self.rules_analyzer.release_predicate_cache(doc)
 
         return doc
@@ -1,6 +1,7 @@
 from typing import List, Union, Dict, Tuple, Iterator, Set, Optional, cast
 from os import linesep
-from spacy.tokens import Token
+import numpy
+from spacy.tokens import Doc, Token
 from srsly import msgpack_decoders, msgpack_encoders  # type:ignore[import]
 
 
@@ -10,10 +11,6 @@ class ChainHolder:
     def __init__(self):
         self.chains = []
 
-        # 'temp*' properties will be removed before processing ends
-        self.temp_governing_sibling = None
-        self.temp_has_or_coordination = False
-
     def __str__(self) -> str:
         return str(self.chains)
 
@@ -160,14 +157,21 @@ class Chain:
 
 
 class Mention:
-    def __init__(self, root: Token = None, include_dependent_siblings: bool = False):
+    def __init__(
+        self,
+        root: Token = None,
+        include_dependent_siblings: bool = False,
+        context: Optional["DocContext"] = None,
+    ):
+        """*context* is the context of the document, which is required if
+        *include_dependent_siblings==True*."""
         if root is not None:  # root==None during deserialization, never otherwise
             doc = root.doc
             self.root_index = root.i
             self.token_indexes = [root.i]
             if include_dependent_siblings:
                 self.token_indexes.extend(
-                    [t.i for t in root._.coref_chains.temp_dependent_siblings]
+                    cast(DocContext, context).dependent_siblings[root.i]
                 )
             if len(self.token_indexes) > 1:
                 self.pretty_representation = "".join(
@@ -204,18 +208,83 @@ class Mention:
         return self.token_indexes[key]
 
     @staticmethod
-    def number_of_training_mentions_marked_true(token: Token) -> int:
-        if not hasattr(token._.coref_chains, "temp_potential_referreds"):
+    def number_of_training_mentions_marked_true(
+        token: Token, context: "DocContext"
+    ) -> int:
+        potential_referreds = context.potential_referreds[token.i]
+        if potential_referreds is None:
             return 0
         return len(
             [
                 1
-                for mention in token._.coref_chains.temp_potential_referreds
+                for mention in potential_referreds
                 if hasattr(mention, "true_in_training")
             ]
         )
 
 
+class DocContext:
+    """The information about a document that is generated by *RulesAnalyzer.initialize()*
+    and used until its chains have been built, held in lists and arrays indexed by token
+    position. Retrieving the same information from attributes of *token._.coref_chains*
+    would go through the Spacy extension mechanism on every access. Tokens are recorded by
+    their indexes so that the context does not keep the document alive.
+    """
+
+    def __init__(self, doc: Doc):
+        number_of_tokens = len(doc)
+
+        # The index of the first token in each sentence
+        self.sent_starts: List[int] = []
+
+        # The index of the sentence containing each token
+        self.sent_indexes: List[int] = [0] * number_of_tokens
+
+        # The indexes of the dependent siblings of each token
+        self.dependent_siblings: List[List[int]] = [[] for _ in range(number_of_tokens)]
+
+        # The index of the token of which each token is a dependent sibling, or *None*
+        self.governing_siblings: List[Optional[int]] = [None] * number_of_tokens
+
+        # Whether each token with dependent siblings is linked to them by an *or*
+        # relationship
+        self.has_or_coordination: List[bool] = [False] * number_of_tokens
+
+        # Which of the quotations in *RulesAnalyzer.quote_tuples* each token is within
+        self.quote_arrays: List[List[int]] = [[] for _ in range(number_of_tokens)]
+
+        # Whether each token is an independent noun that could refer back to a preceding
+        # noun
+        self.potentially_referring: List[bool] = [False] * number_of_tokens
+
+        # The mentions each potential anaphor could refer to, or *None* for tokens that
+        # are not potential anaphors or that have no potential referreds
+        self.potential_referreds: List[Optional[List[Mention]]] = [
+            None
+        ] * number_of_tokens
+
+        # The pairs of referring token index and potential referred mention that
+        # *RulesAnalyzer.language_independent_is_potential_anaphoric_pair()* found to be
+        # possible but uncertain
+        self.uncertain_pairs: Set[Tuple[int, Mention]] = set()
+
+        # The feature maps and position maps of the referrers and of the tokens within
+        # their potential referreds, one row per token, and the row of each token index
+        # or -1. Set by *TendenciesAnalyzer.compute_document_maps()*.
+        self.map_rows: Optional[numpy.ndarray] = None
+        self.feature_matrix: Optional[numpy.ndarray] = None
+        self.position_matrix: Optional[numpy.ndarray] = None
+
+        # Set by *TendenciesAnalyzer.get_tree_statistics()*
+        self.tree_statistics: Optional[numpy.ndarray] = None
+
+        # The vector and head vector of each token for the neural ensemble and the lemma
+        # each vector was looked up with, or *None* where it depends on context
+        self.vectors: List[Optional[numpy.ndarray]] = [None] * number_of_tokens
+        self.head_vectors: List[Optional[numpy.ndarray]] = [None] * number_of_tokens
+        self.vector_lemmas: List[Optional[str]] = [None] * number_of_tokens
+
+
 class FeatureTable:
     """Captures the possible values of the various Spacy annotations that are observed
     to occur during a training corpus. These are then used as the basis for a oneshot
@@ -2,7 +2,7 @@ from typing import List, Set, Tuple, Optional, cast
 from string import punctuation
 from spacy.tokens import Token
 from ...rules import RulesAnalyzer
-from ...data_model import Mention
+from ...data_model import DocContext, Mention
 
 
 class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
@@ -35,7 +35,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
     clause_root_pos = ("VERB", "AUX")
 
-    def get_dependent_siblings(self, token: Token) -> List[Token]:
+    def get_dependent_siblings(self, token: Token, context: DocContext) -> List[Token]:
         def add_siblings_recursively(
             recursed_token: Token, visited_set: set
         ) -> Tuple[Set[Token], bool]:
@@ -43,7 +43,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             siblings_set = set()
             coordinator = False
             if recursed_token.lemma_ in self.or_lemmas:
-                token._.coref_chains.temp_has_or_coordination = True
+                context.has_or_coordination[token.i] = True
             if recursed_token.dep_ in self.dependent_sibling_deps:
                 siblings_set.add(recursed_token)
             for child in (
@@ -88,11 +88,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             return False
         if token.dep_ == "pnc" and token.head.pos_ == "PROPN":
             return False
-        return not self.is_token_in_one_of_phrases(
-            token, self.blacklisted_phrases  # type:ignore[attr-defined]
-        )
+        return not self.is_token_in_blacklisted_phrase(token)
 
-    def is_potential_anaphor(self, token: Token) -> bool:
+    def is_potential_anaphor(self, token: Token, context: DocContext) -> bool:
         if not (
             (token.pos_ == "PRON" and token.tag_ in ("PPER", "PDS", "PRF", "ART"))
             or (token.pos_ == "DET" and token.tag_ == "PPOSAT")
@@ -121,12 +119,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
         if token.tag_ == "PROAV":
             # 'damit' etc. in sentence-initial position refers to the preceding clause
-            if (
-                token.i
-                == token.doc._.coref_chains.temp_sent_starts[
-                    token._.coref_chains.temp_sent_index
-                ]
-            ):
+            if token.i == context.sent_starts[context.sent_indexes[token.i]]:
                 return False
             if not token.lemma_.lower().startswith("da"):
                 return False
@@ -154,7 +147,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             # 'wir haben es darauf angelegt'
             # 'wir haben es angeregt'
             for verb_ancestor in (
-                v for v in token.ancestors if v.pos_ in ("AUX", "VERB")
+                v for v in self.get_ancestors(token) if v.pos_ in ("AUX", "VERB")
             ):
                 if (
                     len(
@@ -163,7 +156,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                             for c in verb_ancestor.children
                             if c.pos_ in ("AUX" "VERB")
                             and c.dep_ in ("mo", "oc", "re")
-                            and c not in token.ancestors
+                            and not self.is_ancestor(c, token)
                             and "," in [t.text for t in token.doc[token.i : c.i]]
                         ]
                     )
@@ -182,7 +175,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                     len(
                         [
                             child
-                            for child in token.head.subtree
+                            for child in self.get_subtree(token.head)
                             if child.lemma_.startswith(avalent_verb_stem)
                         ]
                     )
@@ -191,15 +184,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                     return False
         return True
 
-    def is_potential_anaphoric_pair(
-        self, referred: Mention, referring: Token, directly: bool
-    ) -> int:
-        def get_governing_verb(token: Token) -> Optional[Token]:
-            for ancestor in token.ancestors:
-                if ancestor.pos_ in ("VERB", "AUX"):
-                    return ancestor
-            return None
-
+    def get_gender_number_info(
+        self, token: Token, context: DocContext, directly: bool
+    ) -> Tuple[bool, bool, bool, bool]:
         def lemma_ends_with_word_in_list(token, word_list):
             lower_lemma = token.lemma_.lower()
             for word in word_list:
@@ -207,102 +194,106 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                     return True
             return False
 
-        def get_gender_number_info(token):
-            masc = fem = neut = plur = False
-            if token.tag_ != "PPOSAT":
-                if self.has_morph(token, "Number", "Sing"):
-                    if self.has_morph(token, "Gender", "Masc"):
-                        masc = True
-                    if self.has_morph(token, "Gender", "Fem"):
-                        fem = True
-                    if self.has_morph(token, "Gender", "Neut"):
-                        neut = True
-                        if lemma_ends_with_word_in_list(
-                            token, self.neuter_person_words
-                        ):
-                            masc = True
-                            fem = True
-                        if lemma_ends_with_word_in_list(token, self.neuter_male_words):
-                            masc = True
-                        if lemma_ends_with_word_in_list(
-                            token, self.neuter_female_words
-                        ):
-                            fem = True
-                        if (
-                            not masc
-                            and not fem
-                            and (
-                                token.lemma_.lower().endswith("chen")
-                                or token.lemma_.lower().endswith("lein")
-                                and len(token.lemma_) > 6
-                            )
-                        ):
-                            masc = True
-                            fem = True
-                    if token.pos_ == "PROPN":
-                        if token.lemma_ in self.male_names:
-                            masc = True
-                        if token.lemma_ in self.female_names:
-                            fem = True
-                        if (
-                            token.lemma_ not in self.male_names
-                            and token.lemma_ not in self.female_names
-                        ):
-                            masc = fem = neut = True
-                if self.has_morph(token, "Number", "Plur"):
-                    plur = True
-            if token.pos_ == "PROPN" and not directly:
-                # common noun and proper noun in same chain may have different genders
-                masc = fem = neut = plur = True
-            if self.is_potential_anaphor(token):
-                if token.tag_ in ("PROAV", "PRF"):
+        masc = fem = neut = plur = False
+        if token.tag_ != "PPOSAT":
+            if self.has_morph(token, "Number", "Sing"):
+                if self.has_morph(token, "Gender", "Masc"):
                     masc = True
+                if self.has_morph(token, "Gender", "Fem"):
                     fem = True
+                if self.has_morph(token, "Gender", "Neut"):
                     neut = True
-                    plur = True
-                elif token.tag_ == "PPOSAT":
-                    if token.text.lower().startswith("sein"):
+                    if lemma_ends_with_word_in_list(token, self.neuter_person_words):
                         masc = True
-                        neut = True
-                    elif token.text.lower().startswith("ihr"):
                         fem = True
-                        plur = True
-                else:
+                    if lemma_ends_with_word_in_list(token, self.neuter_male_words):
+                        masc = True
+                    if lemma_ends_with_word_in_list(token, self.neuter_female_words):
+                        fem = True
                     if (
-                        self.has_morph(token, "Number", "Sing")
-                        and self.has_morph(token, "Gender", "Masc")
+                        not masc
+                        and not fem
                         and (
-                            self.has_morph(token, "Case", "Dat")
-                            or self.has_morph(token, "Case", "Gen")
+                            token.lemma_.lower().endswith("chen")
+                            or token.lemma_.lower().endswith("lein")
+                            and len(token.lemma_) > 6
                         )
                     ):
-                        neut = True
-                    elif (
-                        self.has_morph(token, "Number", "Sing")
-                        and self.has_morph(token, "Gender", "Fem")
-                        and (
-                            self.has_morph(token, "Case", "Acc")
-                            or self.has_morph(token, "Case", "Gen")
-                        )
-                    ):
-                        plur = True
-                    elif self.has_morph(token, "Number", "Plur") and (
-                        self.has_morph(token, "Case", "Acc")
-                        or self.has_morph(token, "Case", "Gen")
-                    ):
+                        masc = True
+                        fem = True
+                if token.pos_ == "PROPN":
+                    if token.lemma_ in self.male_names:
+                        masc = True
+                    if token.lemma_ in self.female_names:
                         fem = True
+                    if (
+                        token.lemma_ not in self.male_names
+                        and token.lemma_ not in self.female_names
+                    ):
+                        masc = fem = neut = True
+            if self.has_morph(token, "Number", "Plur"):
+                plur = True
+        if token.pos_ == "PROPN" and not directly:
+            # common noun and proper noun in same chain may have different genders
+            masc = fem = neut = plur = True
+        if self.is_potential_anaphor(token, context):
+            if token.tag_ in ("PROAV", "PRF"):
+                masc = True
+                fem = True
+                neut = True
+                plur = True
+            elif token.tag_ == "PPOSAT":
+                if token.text.lower().startswith("sein"):
+                    masc = True
+                    neut = True
+                elif token.text.lower().startswith("ihr"):
+                    fem = True
+                    plur = True
+            else:
                 if (
                     self.has_morph(token, "Number", "Sing")
-                    and not masc
-                    and not fem
-                    and not neut
+                    and self.has_morph(token, "Gender", "Masc")
+                    and (
+                        self.has_morph(token, "Case", "Dat")
+                        or self.has_morph(token, "Case", "Gen")
+                    )
                 ):
-                    masc = True
                     neut = True
-                if token.text.lower() == "sie" and not fem and not plur:
-                    fem = True
+                elif (
+                    self.has_morph(token, "Number", "Sing")
+                    and self.has_morph(token, "Gender", "Fem")
+                    and (
+                        self.has_morph(token, "Case", "Acc")
+                        or self.has_morph(token, "Case", "Gen")
+                    )
+                ):
                     plur = True
-            return masc, fem, neut, plur
+                elif self.has_morph(token, "Number", "Plur") and (
+                    self.has_morph(token, "Case", "Acc")
+                    or self.has_morph(token, "Case", "Gen")
+                ):
+                    fem = True
+            if (
+                self.has_morph(token, "Number", "Sing")
+                and not masc
+                and not fem
+                and not neut
+            ):
+                masc = True
+                neut = True
+            if token.text.lower() == "sie" and not fem and not plur:
+                fem = True
+                plur = True
+        return masc, fem, neut, plur
+
+    def is_potential_anaphoric_pair(
+        self, referred: Mention, referring: Token, context: DocContext, directly: bool
+    ) -> int:
+        def get_governing_verb(token: Token) -> Optional[Token]:
+            for ancestor in self.get_ancestors(token):
+                if ancestor.pos_ in ("VERB", "AUX"):
+                    return ancestor
+            return None
 
         doc = referring.doc
         referred_root = doc[referred.root_index]
@@ -312,19 +303,18 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             referring_fem,
             referring_neut,
             referring_plur,
-        ) = get_gender_number_info(referring)
+        ) = self.get_gender_number_info(referring, context, directly)
 
         # e.g. 'die Männer und die Frauen' ... 'sie': 'sie' cannot refer only to
         # 'die Männer' or 'die Frauen'
         if (
             len(referred.token_indexes) == 1
             and referring_plur
-            and self.is_involved_in_non_or_conjunction(referred_root)
+            and self.is_involved_in_non_or_conjunction(referred_root, context)
             and not (
-                len(referred_root._.coref_chains.temp_dependent_siblings) > 0
+                len(context.dependent_siblings[referred_root.i]) > 0
                 and referring.i > referred.root_index
-                and referring.i
-                < referred_root._.coref_chains.temp_dependent_siblings[-1].i
+                and referring.i < context.dependent_siblings[referred_root.i][-1]
             )
         ):
             return 0
@@ -332,7 +322,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         referred_masc = referred_fem = referred_neut = referred_plur = False
 
         if len(referred.token_indexes) > 1 and self.is_involved_in_non_or_conjunction(
-            referred_root
+            referred_root, context
         ):
             referred_plur = True
             if not referring_plur:
@@ -344,7 +334,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                 working_fem,
                 working_neut,
                 working_plur,
-            ) = get_gender_number_info(working_token)
+            ) = self.get_gender_number_info(working_token, context, directly)
             referred_masc = referred_masc or working_masc
             referred_fem = referred_fem or working_fem
             referred_neut = referred_neut or working_neut
@@ -363,8 +353,8 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
             # 'damit' etc. does not refer to nouns over several sentences
             if (
-                referring._.coref_chains.temp_sent_index
-                - referred_root._.coref_chains.temp_sent_index
+                context.sent_indexes[referring.i]
+                - context.sent_indexes[referred_root.i]
                 > 1
             ):
                 return 0
@@ -379,7 +369,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                     or working_token.ent_type_ in ("PER", "LOC", "ORG")
                 ):
                     return 0
-                if self.is_potential_anaphor(working_token) and (
+                if self.is_potential_anaphor(working_token, context) and (
                     referred_masc or referred_fem
                 ):
                     return 0
@@ -393,7 +383,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                 return 0
 
         if directly:
-            if self.is_potential_reflexive_pair(referred, referring) != (
+            if self.is_potential_reflexive_pair(referred, referring, context) != (
                 self.is_reflexive_anaphor(referring) == 2
             ):
                 return 0
@@ -431,11 +421,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                         break
                     working_token = working_token.head
 
-        referring_governing_sibling = referring
-        if referring._.coref_chains.temp_governing_sibling is not None:
-            referring_governing_sibling = (
-                referring._.coref_chains.temp_governing_sibling
-            )
+        referring_governing_sibling = self.get_governing_sibling(referring, context)
+        if referring_governing_sibling is None:
+            referring_governing_sibling = referring
         if (
             referring_governing_sibling.dep_ == "sb"
             and referring_governing_sibling.head.lemma_
@@ -487,21 +475,25 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             head = head.head
         return head
 
-    def is_potential_reflexive_pair(self, referred: Mention, referring: Token) -> bool:
+    def is_potential_reflexive_pair(
+        self, referred: Mention, referring: Token, context: DocContext
+    ) -> bool:
 
         if referring.pos_ != "PRON":
             return False
 
         referred_root = referring.doc[referred.root_index]
 
-        if referred_root._.coref_chains.temp_governing_sibling is not None:
-            referred_root = referred_root._.coref_chains.temp_governing_sibling
+        referred_governing_sibling = self.get_governing_sibling(referred_root, context)
+        if referred_governing_sibling is not None:
+            referred_root = referred_governing_sibling
 
-        if referring._.coref_chains.temp_governing_sibling is not None:
-            referring = referring._.coref_chains.temp_governing_sibling
+        referring_governing_sibling = self.get_governing_sibling(referring, context)
+        if referring_governing_sibling is not None:
+            referring = referring_governing_sibling
 
         if referred_root.dep_ == "sb":
-            for referring_ancestor in referring.ancestors:
+            for referring_ancestor in self.get_ancestors(referring):
                 # Loop up through the verb ancestors of the pronoun
 
                 if referred_root in referring_ancestor.children:
@@ -1,7 +1,7 @@
 from typing import List, Set, Tuple, Optional
 from spacy.tokens import Token
 from ...rules import RulesAnalyzer
-from ...data_model import Mention
+from ...data_model import DocContext, Mention
 
 
 class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
@@ -33,7 +33,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
     clause_root_pos = ("VERB", "AUX")
 
-    def get_dependent_siblings(self, token: Token) -> List[Token]:
+    def get_dependent_siblings(self, token: Token, context: DocContext) -> List[Token]:
         def add_siblings_recursively(
             recursed_token: Token, visited_set: set
         ) -> Tuple[Set[Token], bool]:
@@ -41,7 +41,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             siblings_set = set()
             coordinator = False
             if recursed_token.lemma_ in self.or_lemmas:
-                token._.coref_chains.temp_has_or_coordination = True
+                context.has_or_coordination[token.i] = True
             if recursed_token.dep_ in self.dependent_sibling_deps:
                 siblings_set.add(recursed_token)
             for child in (
@@ -80,11 +80,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             or (token.pos_ == "PRON" and token.tag_ == "NN")
         ):
             return False
-        return not self.is_token_in_one_of_phrases(
-            token, self.blacklisted_phrases  # type:ignore[attr-defined]
-        )
+        return not self.is_token_in_blacklisted_phrase(token)
 
-    def is_potential_anaphor(self, token: Token) -> bool:
+    def is_potential_anaphor(self, token: Token, context: DocContext) -> bool:
         """Potentially externally referring tokens in English are third-person pronouns.
         Instances of 'it' have to be investigated further to find out if they are
         pleonastic."""
@@ -100,8 +98,8 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
         # Pleonastic it is out of the question in a conjunction environment
         if (
-            len(token._.coref_chains.temp_dependent_siblings) > 0
-            or token._.coref_chains.temp_governing_sibling is not None
+            len(context.dependent_siblings[token.i]) > 0
+            or context.governing_siblings[token.i] is not None
         ):
             return True
 
@@ -161,7 +159,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             and len(
                 [
                     child
-                    for child in token.head.subtree
+                    for child in self.get_subtree(token.head)
                     if child.lemma_ in self.avalent_verbs  # type:ignore[attr-defined]
                 ]
             )
@@ -171,10 +169,10 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         return True
 
     def is_potential_anaphoric_pair(
-        self, referred: Mention, referring: Token, directly: bool
+        self, referred: Mention, referring: Token, context: DocContext, directly: bool
     ) -> int:
         def get_governing_verb(token: Token) -> Optional[Token]:
-            for ancestor in token.ancestors:
+            for ancestor in self.get_ancestors(token):
                 if ancestor.pos_ in ("VERB", "AUX"):
                     return ancestor
             return None
@@ -188,14 +186,14 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         if (
             len(referred.token_indexes) == 1
             and self.has_morph(referring, "Number", "Plur")
-            and self.is_involved_in_non_or_conjunction(referred_root)
+            and self.is_involved_in_non_or_conjunction(referred_root, context)
         ):
             return 0
 
         # Two pronouns without coordination and differing number or gender
         if (
             len(referred.token_indexes) == 1
-            and self.is_potential_anaphor(referred_root)
+            and self.is_potential_anaphor(referred_root, context)
             and (
                 referred_root.morph.get("Number") != referring.morph.get("Number")
                 or referred_root.morph.get("Gender") != referring.morph.get("Gender")
@@ -210,7 +208,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         ):
             return 0
 
-        if not self.is_potential_anaphor(referred_root):
+        if not self.is_potential_anaphor(referred_root, context):
             # antecedent is a noun
 
             referred_lemma = referred_root.lemma_
@@ -328,14 +326,14 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
         if directly:
             if (
-                self.is_potential_reflexive_pair(referred, referring)
+                self.is_potential_reflexive_pair(referred, referring, context)
                 and self.is_reflexive_anaphor(referring) == 0
             ):
                 return 0
 
             if (
                 not uncertain
-                and not self.is_potential_reflexive_pair(referred, referring)
+                and not self.is_potential_reflexive_pair(referred, referring, context)
                 and self.is_reflexive_anaphor(referring) == 1
             ):
                 uncertain = True
@@ -393,7 +391,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             head = head.head
         return head
 
-    def is_potential_reflexive_pair(self, referred: Mention, referring: Token) -> bool:
+    def is_potential_reflexive_pair(
+        self, referred: Mention, referring: Token, context: DocContext
+    ) -> bool:
 
         if referred.root_index > referring.i:
             # reflexives must follow their referents in English
@@ -403,17 +403,19 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
         syntactic_subject_dep = ("nsubj", "nsubjpass")
 
-        if referred_root._.coref_chains.temp_governing_sibling is not None:
-            referred_root = referred_root._.coref_chains.temp_governing_sibling
+        referred_governing_sibling = self.get_governing_sibling(referred_root, context)
+        if referred_governing_sibling is not None:
+            referred_root = referred_governing_sibling
 
-        if referring._.coref_chains.temp_governing_sibling is not None:
-            referring = referring._.coref_chains.temp_governing_sibling
+        referring_governing_sibling = self.get_governing_sibling(referring, context)
+        if referring_governing_sibling is not None:
+            referring = referring_governing_sibling
 
         if referring.tag_ != "PRP":  # e.g. 'his' rather than 'him' 'himself'
             return False
 
         if referred_root.dep_ in syntactic_subject_dep:
-            for referring_ancestor in referring.ancestors:
+            for referring_ancestor in self.get_ancestors(referring):
                 # Loop up through the verb ancestors of the pronoun
 
                 # Relative clauses
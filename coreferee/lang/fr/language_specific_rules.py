@@ -4,7 +4,7 @@
 from typing import List, Set, Tuple, Optional, cast
 from spacy.tokens import Token
 from ...rules import RulesAnalyzer
-from ...data_model import Mention
+from ...data_model import DocContext, Mention
 import sys
 import re
 
@@ -144,7 +144,30 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
     french_word = re.compile("[\\-\\w][\\-\\w'&\\.]*$")
 
-    def get_dependent_siblings(self, token: Token) -> List[Token]:
+    # First names that are also the names of places or organisations
+    ambiguous_person_names = frozenset(
+        ("Caroline", "Virginie", "Salvador", "Maurice", "Washington")
+    )
+
+    def prepare_lookups(self) -> None:
+        # Combined lookups and part-of-speech tuples that would otherwise be rebuilt on
+        # every check
+        self.person_names = (
+            self.male_names | self.female_names  # type:ignore[attr-defined]
+        )
+        self.person_nouns = (
+            frozenset(self.entity_noun_dictionary["PER"])
+            | self.person_roles  # type:ignore[attr-defined]
+        )
+        self.reverse_entity_noun_dictionary_with_person_roles = {
+            noun: "PER" for noun in self.person_roles  # type:ignore[attr-defined]
+        } | self.reverse_entity_noun_dictionary
+        self.noun_adj_pron_pos = self.noun_pos + ("ADJ", "PRON")
+        self.noun_adj_pos = self.noun_pos + ("ADJ",)
+        self.term_operator_adp_pos = self.term_operator_pos + ("ADP",)
+        self.clause_root_noun_adj_pos = self.clause_root_pos + self.noun_pos + ("ADJ",)
+
+    def get_dependent_siblings(self, token: Token, context: DocContext) -> List[Token]:
         def add_siblings_recursively(
             recursed_token: Token, visited_set: set
         ) -> Tuple[Set[Token], bool]:
@@ -152,7 +175,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             siblings_set = set()
             coordinator = False
             if recursed_token.lemma_ in self.or_lemmas:
-                token._.coref_chains.temp_has_or_coordination = True
+                context.has_or_coordination[token.i] = True
             if recursed_token.dep_ in self.dependent_sibling_deps:
                 siblings_set.add(recursed_token)
             for child in (
@@ -209,7 +232,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         elif self.is_quelqun_head(token):
             pass
         elif (
-            token.pos_ not in self.noun_pos + ("ADJ", "PRON")
+            token.pos_ not in self.noun_adj_pron_pos
             or token.dep_ in ("fixed", "flat:name", "flat:foreign", "amod")
             or (token.pos_ in ("ADJ", "PRON") and not self.has_det(token))
         ):
@@ -226,7 +249,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             token.i > 0
             and token.ent_type_ != ""
             and token.doc[token.i - 1].ent_type_ == token.ent_type_
-            and token.doc[token.i - 1] not in token.subtree
+            and not self.get_tree_index(token.doc).is_in_subtree(token.i - 1, token.i)
         ):
             return False
 
@@ -235,11 +258,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             and token.lemma_ in self.blacklisted_nouns  # type:ignore[attr-defined]
         ):
             return False
-        return not self.is_token_in_one_of_phrases(
-            token, self.blacklisted_phrases  # type:ignore[attr-defined]
-        )
+        return not self.is_token_in_blacklisted_phrase(token)
 
-    def is_potential_anaphor(self, token: Token) -> bool:
+    def is_potential_anaphor(self, token: Token, context: DocContext) -> bool:
         if not self.french_word.match(token.text):
             return False
         # Ce dernier, cette dernière...
@@ -396,13 +417,13 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         return any(det for det in token.children if det.dep_ == "det")
 
     def get_gender_number_info(
-        self, token: Token, directly=False, det_infos=False
+        self, token: Token, context: DocContext, directly=False, det_infos=False
     ) -> Tuple[bool, bool, bool, bool]:
         masc = fem = sing = plur = False
         if self.is_quelqun_head(token):
             sing = masc = fem = True
         elif self.has_morph(token, "Poss", "Yes") and not det_infos:
-            if self.is_potential_anaphor(token):
+            if self.is_potential_anaphor(token, context):
                 # the plural morphs of poss determiner don't mark the owner but the owned
                 if token.lemma_ == "leur":
                     plur = True
@@ -422,7 +443,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             if token.lemma_ in {"ici", "là", "y", "en"}:
                 masc = fem = sing = plur = True
 
-            elif self.is_potential_anaphor(token):
+            elif self.is_potential_anaphor(token, context):
                 # object pronouns are not well recognized by the  models
                 if token.lower_.startswith("lui"):
                     masc = True
@@ -452,11 +473,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                     masc = True
                 if token.lemma_ in self.female_names:  # type:ignore[attr-defined]
                     fem = True
-                if (
-                    token.lemma_
-                    not in self.male_names  # type:ignore[attr-defined]
-                    + self.female_names  # type:ignore[attr-defined]
-                ):
+                if token.lemma_ not in self.person_names:
                     masc = fem = True
                 if not plur:
                     # proper nouns without plur mark are typically singular
@@ -468,7 +485,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             # Je les vois
             masc = fem = True
         # get grammatical info from det
-        if token.pos_ in self.noun_pos + ("ADJ",) and not det_infos:
+        if token.pos_ in self.noun_adj_pos and not det_infos:
             for det in token.children:
                 # prevent recurs for single det phrase
                 if det == token:
@@ -480,7 +497,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                     det_fem,
                     det_sing,
                     det_plur,
-                ) = self.get_gender_number_info(det, directly=directly, det_infos=True)
+                ) = self.get_gender_number_info(
+                    det, context, directly=directly, det_infos=True
+                )
                 # If determiner has a decisive information it trumps that of noun
                 # " Especially in case of epicene nouns : e.g "la ministre"
                 if any([det_sing, det_plur]):
@@ -502,19 +521,15 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         if (
             token.ent_type_ == "PER"
             or self.is_quelqun_head(token)
-            or token.lemma_.lower()
-            in self.entity_noun_dictionary["PER"]
-            + self.person_roles  # type:ignore[attr-defined]
+            or token.lemma_.lower() in self.person_nouns
         ):
             return True
         if (
             token.pos_ == self.propn_pos
-            and token.lemma_
-            in self.male_names + self.female_names  # type:ignore[attr-defined]
+            and token.lemma_ in self.person_names
             and (
                 token.ent_type_ not in ["LOC", "ORG"]
-                or token.lemma_
-                in ["Caroline", "Virginie", "Salvador", "Maurice", "Washington"]
+                or token.lemma_ in self.ambiguous_person_names
             )
         ):
             return True
@@ -532,7 +547,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         return False
 
     def is_potential_anaphoric_pair(
-        self, referred: Mention, referring: Token, directly: bool
+        self, referred: Mention, referring: Token, context: DocContext, directly: bool
     ) -> int:
 
         doc = referring.doc
@@ -555,19 +570,21 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             referring_fem,
             referring_sing,
             referring_plur,
-        ) = self.get_gender_number_info(referring, directly=directly)
+        ) = self.get_gender_number_info(referring, context, directly=directly)
         # e.g. 'les hommes et les femmes' ... 'ils': 'ils' cannot refer only to
         # 'les hommes' or 'les femmes'
+        referred_root_dependent_siblings = context.dependent_siblings[
+            referred_root.i
+        ]
         if (
             len(referred.token_indexes) == 1
             and referring_plur
             and not referring_sing
-            and self.is_involved_in_non_or_conjunction(referred_root)
+            and self.is_involved_in_non_or_conjunction(referred_root, context)
             and not (
-                len(referred_root._.coref_chains.temp_dependent_siblings) > 0
+                len(referred_root_dependent_siblings) > 0
                 and referring.i > referred.root_index
-                and referring.i
-                < referred_root._.coref_chains.temp_dependent_siblings[-1].i
+                and referring.i < referred_root_dependent_siblings[-1]
             )
             and referring.lemma_ not in ("dernier", "celui", "celui-ci", "celui-là")
         ):
@@ -577,7 +594,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
         # e.g. 'l'homme et la femme... 'il' : 'il' cannot refer to both
         if len(referred.token_indexes) > 1 and self.is_involved_in_non_or_conjunction(
-            referred_root
+            referred_root, context
         ):
             referred_plur = True
             referred_sing = False
@@ -590,7 +607,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                 working_fem,
                 working_sing,
                 working_plur,
-            ) = self.get_gender_number_info(working_token, directly=directly)
+            ) = self.get_gender_number_info(working_token, context, directly=directly)
             referred_masc = referred_masc or working_masc
             referred_fem = referred_fem or working_fem
             referred_sing = referred_sing or working_sing
@@ -616,7 +633,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
         #'ici , là... cannot refer to person. only loc and  possibly orgs
         # y needs more conditions
-        if self.is_potential_anaphor(referring) and referring.lemma_ in (
+        if self.is_potential_anaphor(referring, context) and referring.lemma_ in (
             "ici",
             "là",
             "y",
@@ -637,7 +654,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             # possessive det can't be referred to directly
             if self.has_morph(referred_root, "Poss") and referred_root.pos_ == "DET":
                 return False
-            if self.is_potential_anaphor(referring) > 0:
+            if self.is_potential_anaphor(referring, context) > 0:
                 try:
                     if (
                         referring.lemma_ == "celui-ci"
@@ -661,7 +678,10 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                             if self.is_independent_noun(
                                 previous_token
                             ) and self.is_potential_anaphoric_pair(
-                                Mention(previous_token), referring, directly=False
+                                Mention(previous_token),
+                                referring,
+                                context,
+                                directly=False,
                             ):
                                 if previous_token_index != referred.root_index:
                                     if previous_token.dep_ in ("nmod", "appos"):
@@ -731,7 +751,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                     uncertain = True
 
             if (
-                self.is_potential_reflexive_pair(referred, referring)
+                self.is_potential_reflexive_pair(referred, referring, context)
                 and self.is_reflexive_anaphor(referring) == 0
                 and not self.has_morph(referred_root, "Poss", "Yes")
                 and referred_root.dep_ != "obl:mod"
@@ -739,7 +759,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                 # * Les hommes le voyaient. "le" can't refer to "hommes"
                 return 0
 
-            if self.is_potential_reflexive_pair(referred, referring) == 0 and (
+            if self.is_potential_reflexive_pair(referred, referring, context) == 0 and (
                 self.is_reflexive_anaphor(referring) == 2
             ):
                 # * Les hommes étaient sûrs qu'ils se trompaient. "se" can't directly refer to "hommes"
@@ -755,11 +775,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             if referred_root.pos_ == "NOUN":
                 uncertain = True
 
-        referring_governing_sibling = referring
-        if referring._.coref_chains.temp_governing_sibling is not None:
-            referring_governing_sibling = (
-                referring._.coref_chains.temp_governing_sibling
-            )
+        referring_governing_sibling = self.get_governing_sibling(referring, context)
+        if referring_governing_sibling is None:
+            referring_governing_sibling = referring
         if (
             referring_governing_sibling.dep_ in ("nsubj:pass", "nsubj")
             and referring_governing_sibling.head.lemma_
@@ -777,7 +795,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         for child in (
             child
             for child in token.children
-            if child.pos_ in self.term_operator_pos + ("ADP",)
+            if child.pos_ in self.term_operator_adp_pos
         ):
             for morph in morphs:
                 if self.has_morph(child, morph, morphs.get(morph)):
@@ -826,7 +844,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         head = token.head
         return head
 
-    def is_potential_reflexive_pair(self, referred: Mention, referring: Token) -> bool:
+    def is_potential_reflexive_pair(
+        self, referred: Mention, referring: Token, context: DocContext
+    ) -> bool:
         if (
             referring.pos_ != "PRON"
             and not self.is_emphatic_reflexive_anaphor(referring)
@@ -844,11 +864,13 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
         referred_root = referring.doc[referred.root_index]
 
-        if referred_root._.coref_chains.temp_governing_sibling is not None:
-            referred_root = referred_root._.coref_chains.temp_governing_sibling
+        referred_governing_sibling = self.get_governing_sibling(referred_root, context)
+        if referred_governing_sibling is not None:
+            referred_root = referred_governing_sibling
 
-        if referring._.coref_chains.temp_governing_sibling is not None:
-            referring = referring._.coref_chains.temp_governing_sibling
+        referring_governing_sibling = self.get_governing_sibling(referring, context)
+        if referring_governing_sibling is not None:
+            referring = referring_governing_sibling
 
         if referred_root.dep_ in ("nsubj", "nsubj:pass") and not any(
             selon
@@ -856,7 +878,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             if selon.lemma_ == "selon" and selon.dep_ == "case"
         ):
 
-            for referring_ancestor in referring.ancestors:
+            for referring_ancestor in self.get_ancestors(referring):
                 # Loop up through the verb ancestors of the pronoun
                 if referring_ancestor.dep_ in self.disjointed_dep:
                     return False
@@ -897,7 +919,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
     # Methods from the parent class that need to be overridden because
     # some cases are not suitable for the french parse tree
-    def is_potential_cataphoric_pair(self, referred: Mention, referring: Token) -> bool:
+    def is_potential_cataphoric_pair(
+        self, referred: Mention, referring: Token, context: DocContext
+    ) -> bool:
         """Checks whether *referring* can refer cataphorically to *referred*, i.e.
         where *referring* precedes *referred* in the text. That *referring* precedes
         *referred* is not itself checked by the method.
@@ -910,13 +934,13 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
         if referred_root.sent != referring.sent:
             return False
-        if self.is_potential_anaphor(referred_root):
+        if self.is_potential_anaphor(referred_root, context):
             return False
 
         referred_verb_ancestors = []
         # Find the ancestors of the referent that are verbs, stopping anywhere where there
         # is conjunction between verbs
-        for ancestor in referred_root.ancestors:
+        for ancestor in self.get_ancestors(referred_root):
             if ancestor.pos_ in self.clause_root_pos or any(
                 child for child in ancestor.children if child.dep_ == "cop"
             ):
@@ -927,7 +951,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         # Loop through the ancestors of the referring pronoun that are verbs,  that are not
         # within the first list and that have an adverbial clause dependency label
         referring_inclusive_ancestors = [referring]
-        referring_inclusive_ancestors.extend(referring.ancestors)
+        referring_inclusive_ancestors.extend(self.get_ancestors(referring))
         if (
             len(
                 [
@@ -944,19 +968,13 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             for t in referring_inclusive_ancestors
             if t not in referred_verb_ancestors
             and t.dep_ in self.adverbial_clause_deps
-            and t.pos_ in self.clause_root_pos + self.noun_pos + ("ADJ",)
+            and t.pos_ in self.clause_root_noun_adj_pos
         ):
             # If one of the elements of the second list has one of the elements of the first list
             # within its ancestors, we have subordination and cataphora is permissible
-            if (
-                len(
-                    [
-                        t
-                        for t in referring_verb_ancestor.ancestors
-                        if t in referred_verb_ancestors
-                    ]
-                )
-                > 0
+            if any(
+                self.is_ancestor(t, referring_verb_ancestor)
+                for t in referred_verb_ancestors
             ):
                 return True
         return False
@@ -991,7 +1009,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             and is_propn_part(token.head)
         ):
             return []
-        subtree = list(token.subtree)
+        subtree = self.get_subtree(token)
         before_start_index = -1
         after_end_index = sys.maxsize
         for subtoken in subtree:
@@ -1011,7 +1029,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             t for t in subtree if t.i > before_start_index and t.i < after_end_index
         ]
 
-    def is_potentially_referring_back_noun(self, token: Token) -> bool:
+    def is_potentially_referring_back_noun(
+        self, token: Token, context: DocContext
+    ) -> bool:
 
         if (
             self.is_potentially_definite(token)
@@ -1029,8 +1049,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         ):
             return True
 
+        governing_sibling = self.get_governing_sibling(token, context)
         return (
-            token._.coref_chains.temp_governing_sibling is not None
+            governing_sibling is not None
             and len(
                 [
                     1
@@ -1040,28 +1061,28 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                 ]
             )
             == 0
-            and self.is_potentially_referring_back_noun(
-                token._.coref_chains.temp_governing_sibling
-            )
+            and self.is_potentially_referring_back_noun(governing_sibling, context)
         )
 
     def get_noun_core_lemma(self, token):
         prefix = re.compile("^((vice)|(^ex)|(^co))-")
         return prefix.sub("", token.lemma_).lower()
 
-    def is_grammatically_compatible_noun_pair(self, referred: Token, referring: Token):
+    def is_grammatically_compatible_noun_pair(
+        self, referred: Token, referring: Token, context: DocContext
+    ):
         (
             referred_masc,
             referred_fem,
             referred_sing,
             referred_plur,
-        ) = self.get_gender_number_info(referred, directly=True)
+        ) = self.get_gender_number_info(referred, context, directly=True)
         (
             referring_masc,
             referring_fem,
             referring_sing,
             referring_plur,
-        ) = self.get_gender_number_info(referring, directly=True)
+        ) = self.get_gender_number_info(referring, context, directly=True)
 
         if not (
             (referred_plur and referring_plur) or (referred_sing and referring_sing)
@@ -1109,12 +1130,12 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         # Nouns can't corefer in same predication
         verb_referred_ancestors = [
             t
-            for t in referred.ancestors
+            for t in self.get_ancestors(referred)
             if t.dep_ == "ROOT" or t.pos_ in self.clause_root_pos
         ]
         verb_referring_ancestors = [
             t
-            for t in referring.ancestors
+            for t in self.get_ancestors(referring)
             if t.dep_ == "ROOT" or t.pos_ in self.clause_root_pos
         ]
         referred_verb_parent = (
@@ -1154,7 +1175,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         return True
 
     def language_dependent_is_coreferring_noun_pair(
-        self, referred: Token, referring: Token
+        self, referred: Token, referring: Token, context: DocContext
     ) -> bool:
         """
         Return True if language rules make it necessary
@@ -1174,12 +1195,14 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         if (
             referred == referring.head
             and referring.dep_ == "conj"
-            and self.is_involved_in_non_or_conjunction(referring)
+            and self.is_involved_in_non_or_conjunction(referring, context)
             and referred.dep_ in ("nsubj", "nsubj:pass")
             and referred.head.pos_ in ("VERB", "AUX")
         ):
 
-            *_, referred_sing, referred_plur = self.get_gender_number_info(referred)
+            *_, referred_sing, referred_plur = self.get_gender_number_info(
+                referred, context
+            )
             if (
                 referred_sing
                 and not referred_plur
@@ -1187,9 +1210,14 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             ):
                 return True
         # Other cases of apposition
-        if referring not in referred._.coref_chains.temp_dependent_siblings:
-            referred_right_in_subtree = list(referred.subtree)[-1]
-            referring_left_in_subtree = list(referring.subtree)[0]
+        if referring.i not in context.dependent_siblings[referred.i]:
+            tree_index = self.get_tree_index(referred.doc)
+            referred_right_in_subtree = referred.doc[
+                tree_index.get_subtree(referred.i)[-1]
+            ]
+            referring_left_in_subtree = referring.doc[
+                tree_index.get_subtree(referring.i)[0]
+            ]
             if (
                 referring_left_in_subtree.i - referred_right_in_subtree.i == 2
                 and referred.doc[referred_right_in_subtree.i + 1].text == ","
@@ -1219,7 +1247,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         return False
 
     def is_potential_coreferring_noun_pair(
-        self, referred: Token, referring: Token
+        self, referred: Token, referring: Token, context: DocContext
     ) -> bool:
         """Returns *True* if *referred* and *referring* are potentially coreferring nouns.
         The method presumes that *is_independent_noun(token)* has
@@ -1234,48 +1262,42 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         ):
             return False
         grammatically_compatible = self.is_grammatically_compatible_noun_pair(
-            referred, referring
+            referred, referring, context
         )
         # Needs to be here as it covers cases of incorrect parsing
         if (
-            self.language_dependent_is_coreferring_noun_pair(referred, referring)
+            self.language_dependent_is_coreferring_noun_pair(
+                referred, referring, context
+            )
             and grammatically_compatible
         ):
             return True
 
-        if referring in referred._.coref_chains.temp_dependent_siblings:
+        if referring.i in context.dependent_siblings[referred.i]:
             return False
 
+        referring_governing_sibling_index = context.governing_siblings[referring.i]
         if (
-            referring._.coref_chains.temp_governing_sibling is not None
-            and referring._.coref_chains.temp_governing_sibling
-            == referred._.coref_chains.temp_governing_sibling
+            referring_governing_sibling_index is not None
+            and referring_governing_sibling_index
+            == context.governing_siblings[referred.i]
         ):
             return False
 
         # If *referred* and *referring* are names that potentially consist of several words,
         # the text of *referring* must correspond to the end of the text of *referred*
         # e.g. 'Richard Paul Hudson' -> 'Hudson'
-        referred_propn_subtree = self.get_propn_subtree(referred)
-        if referring in referred_propn_subtree:
+        if referring in self.get_propn_subtree(referred):
             return False
-        if len(referred_propn_subtree) > 0:
-            referring_propn_subtree = self.get_propn_subtree(referring)
-            if len(referring_propn_subtree) > 0 and " ".join(
-                t.text for t in referred_propn_subtree
-            ).endswith(" ".join(t.text for t in referring_propn_subtree)):
-                return True
-            if len(referring_propn_subtree) > 0 and " ".join(
-                t.lemma_.lower() for t in referred_propn_subtree
-            ).endswith(" ".join(t.lemma_.lower() for t in referring_propn_subtree)):
-                return True
+        if self.ends_with_propn_subtree(referred, referring):
+            return True
 
         if not self.is_potential_coreferring_pair_with_substantive(referred, referring):
             return False
         # e.g. 'Peugeot' -> 'l'entreprise'
-        new_reverse_entity_noun_dictionary = {
-            noun: "PER" for noun in self.person_roles  # type:ignore[attr-defined]
-        } | self.reverse_entity_noun_dictionary
+        new_reverse_entity_noun_dictionary = (
+            self.reverse_entity_noun_dictionary_with_person_roles
+        )
 
         if (
             self.get_noun_core_lemma(referring) in new_reverse_entity_noun_dictionary
@@ -1301,11 +1323,11 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         ):
             return True
 
-        if not self.is_potentially_referring_back_noun(referring):
+        if not self.is_potentially_referring_back_noun(referring, context):
             return False
         if not self.is_potentially_introducing_noun(
-            referred
-        ) and not self.is_potentially_referring_back_noun(referred):
+            referred, context
+        ) and not self.is_potentially_referring_back_noun(referred, context):
             return False
         if self.get_noun_core_lemma(referred) == self.get_noun_core_lemma(
             referring
@@ -1,8 +1,8 @@
-from typing import Set
+from typing import Set, Tuple
 from string import punctuation
 from spacy.tokens import Token
 from ...rules import RulesAnalyzer
-from ...data_model import Mention
+from ...data_model import DocContext, Mention
 
 
 class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
@@ -49,7 +49,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             and token.lemma_[:4].lower() in ("swój", "swoj", "swoi")
         )
 
-    def get_dependent_siblings(self, token: Token) -> list:
+    def get_dependent_siblings(self, token: Token, context: DocContext) -> list:
 
         # As well as the standard conjunction found in other languages we also capture
         # comitative phrases where coordination is expressed using the pronoun 'z' and
@@ -60,17 +60,17 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             visited_set.add(recursed_token)
             siblings_set = set()
             if recursed_token.lemma_.lower() in self.or_lemmas:
-                token._.coref_chains.temp_has_or_coordination = True
+                context.has_or_coordination[token.i] = True
             if (
                 token != recursed_token
                 and token.pos_ in ("VERB", "AUX")
-                and self.is_potential_anaphor(token)
+                and self.is_potential_anaphor(token, context)
                 and recursed_token.pos_ in ("VERB", "AUX")
-                and self.is_potential_anaphor(recursed_token)
+                and self.is_potential_anaphor(recursed_token, context)
             ):
                 # we treat two verb anaphors as having or coordination because two
                 # singular anaphors do not give rise to a plural phrase
-                token._.coref_chains.temp_has_or_coordination = True
+                context.has_or_coordination[token.i] = True
             if (
                 recursed_token.dep_ in self.dependent_sibling_deps
                 or self.has_morph(recursed_token, "Case", "Ins")
@@ -105,7 +105,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                 child
                 for child in recursed_token.children
                 if recursed_token.pos_ in ("VERB", "AUX")
-                and self.is_potential_anaphor(recursed_token)
+                and self.is_potential_anaphor(recursed_token, context)
                 and child.pos_ in self.noun_pos
                 and self.has_morph(child, "Case", "Ins")
                 and len(
@@ -164,11 +164,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
     def is_independent_noun(self, token: Token) -> bool:
         if not token.pos_ in self.noun_pos or token.text in punctuation:
             return False
-        return not self.is_token_in_one_of_phrases(
-            token, self.blacklisted_phrases  # type:ignore[attr-defined]
-        )
+        return not self.is_token_in_blacklisted_phrase(token)
 
-    def is_potential_anaphor(self, token: Token) -> bool:
+    def is_potential_anaphor(self, token: Token, context: DocContext) -> bool:
         # third-person pronoun
         if token.tag_ in ("PPRON3"):
             return True
@@ -200,12 +198,13 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             and not self.has_morph(token, "VerbForm", "Inf")
         ):
 
+            governing_sibling = self.get_governing_sibling(token, context)
             if (
-                token._.coref_chains.temp_governing_sibling is not None
+                governing_sibling is not None
                 and len(
                     [
                         child
-                        for child in token._.coref_chains.temp_governing_sibling.children
+                        for child in governing_sibling.children
                         if self._is_subject_noun(child)
                     ]
                 )
@@ -243,85 +242,85 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             )
         return False
 
-    def is_potential_anaphoric_pair(
-        self, referred: Mention, referring: Token, directly: bool
-    ) -> int:
-
+    def get_gender_number_info(
+        self, token: Token, context: DocContext, directly: bool
+    ) -> Tuple[bool, bool, bool, bool, bool]:
         # masc:     'rodzaj męski'
         # fem:      'rodzaj żeński'
         # neut:     'rodzaj nijaki'
         # nonvirile:'rodzaj niemęskoosobowy'
         # virile:   'rodzaj męskoosobowy'
 
-        def get_gender_number_info(token):
-            masc = fem = neut = nonvirile = virile = False
-            if self.has_morph(token, "Number", "Sing"):
-                if self.has_morph(token, "Gender", "Masc"):
+        masc = fem = neut = nonvirile = virile = False
+        if self.has_morph(token, "Number", "Sing"):
+            if self.has_morph(token, "Gender", "Masc"):
+                masc = True
+                if token.tag_ == "PPRON3" and not self.has_morph(token, "Case", "Nom"):
+                    neut = True
+            if self.has_morph(token, "Gender", "Fem"):
+                fem = True
+            if self.has_morph(token, "Gender", "Neut"):
+                neut = True
+                if token.tag_ == "PPRON3" and not self.has_morph(token, "Case", "Nom"):
                     masc = True
-                    if token.tag_ == "PPRON3" and not self.has_morph(
-                        token, "Case", "Nom"
-                    ):
-                        neut = True
-                if self.has_morph(token, "Gender", "Fem"):
+            if token.pos_ == "PROPN":
+                if token.lemma_ in self.male_names:
+                    masc = True
+                if token.lemma_ in self.female_names:
                     fem = True
-                if self.has_morph(token, "Gender", "Neut"):
-                    neut = True
-                    if token.tag_ == "PPRON3" and not self.has_morph(
-                        token, "Case", "Nom"
-                    ):
-                        masc = True
-                if token.pos_ == "PROPN":
-                    if token.lemma_ in self.male_names:
-                        masc = True
-                    if token.lemma_ in self.female_names:
-                        fem = True
-            if self.has_morph(token, "Number", "Plur"):
-                if (
+        if self.has_morph(token, "Number", "Plur"):
+            if (
+                self.has_morph(token, "Gender", "Masc")
+                and self.has_morph(token, "Animacy", "Hum")
+                and token.dep_ != "nmod"
+            ):  # 'ich'
+                virile = True
+            elif (
+                (
                     self.has_morph(token, "Gender", "Masc")
-                    and self.has_morph(token, "Animacy", "Hum")
-                    and token.dep_ != "nmod"
-                ):  # 'ich'
-                    virile = True
-                elif (
-                    (
-                        self.has_morph(token, "Gender", "Masc")
-                        and self.has_morph(token, "Animacy", "Nhum")
-                    )
-                    or (
-                        self.has_morph(token, "Gender", "Masc")
-                        and self.has_morph(token, "Animacy", "Inan")
-                    )
-                    or self.has_morph(token, "Gender", "Fem")
-                    or self.has_morph(token, "Gender", "Neut")
-                ):
-                    nonvirile = True
-            if token.pos_ == "PROPN" and not directly:
-                # common noun and proper noun in same chain may have different genders
-                masc = fem = neut = nonvirile = virile = True
-            return masc, fem, neut, nonvirile, virile
-
-        def get_gender_number_info_for_single_token(token):
-
-            masc = fem = neut = nonvirile = virile = False
-            if not self.is_reflexive_possessive_pronoun(token):
-                masc, fem, neut, nonvirile, virile = get_gender_number_info(token)
-                if (
-                    not (masc or fem or neut or nonvirile or virile)
-                    and self._is_subject_noun(token)
-                    and token.head.pos_ in ("VERB", "AUX")
-                ):
-                    masc, fem, neut, nonvirile, virile = get_gender_number_info(
-                        token.head
-                    )
-                if not (masc or fem or neut or nonvirile or virile):
-                    if self.has_morph(token, "Number", "Sing"):
-                        masc = fem = neut = True
-                    if self.has_morph(token, "Number", "Plur"):
-                        nonvirile = virile = True
+                    and self.has_morph(token, "Animacy", "Nhum")
+                )
+                or (
+                    self.has_morph(token, "Gender", "Masc")
+                    and self.has_morph(token, "Animacy", "Inan")
+                )
+                or self.has_morph(token, "Gender", "Fem")
+                or self.has_morph(token, "Gender", "Neut")
+            ):
+                nonvirile = True
+        if token.pos_ == "PROPN" and not directly:
+            # common noun and proper noun in same chain may have different genders
+            masc = fem = neut = nonvirile = virile = True
+        return masc, fem, neut, nonvirile, virile
+
+    def get_gender_number_info_for_single_token(
+        self, token: Token, context: DocContext, directly: bool
+    ) -> Tuple[bool, bool, bool, bool, bool]:
+        masc = fem = neut = nonvirile = virile = False
+        if not self.is_reflexive_possessive_pronoun(token):
+            masc, fem, neut, nonvirile, virile = self.get_gender_number_info(
+                token, context, directly
+            )
+            if (
+                not (masc or fem or neut or nonvirile or virile)
+                and self._is_subject_noun(token)
+                and token.head.pos_ in ("VERB", "AUX")
+            ):
+                masc, fem, neut, nonvirile, virile = self.get_gender_number_info(
+                    token.head, context, directly
+                )
             if not (masc or fem or neut or nonvirile or virile):
-                masc = fem = neut = nonvirile = virile = True
-            return masc, fem, neut, nonvirile, virile
+                if self.has_morph(token, "Number", "Sing"):
+                    masc = fem = neut = True
+                if self.has_morph(token, "Number", "Plur"):
+                    nonvirile = virile = True
+        if not (masc or fem or neut or nonvirile or virile):
+            masc = fem = neut = nonvirile = virile = True
+        return masc, fem, neut, nonvirile, virile
 
+    def is_potential_anaphoric_pair(
+        self, referred: Mention, referring: Token, context: DocContext, directly: bool
+    ) -> int:
         def are_coordinated_tokens_possibly_virile(tokens: list) -> int:
             masc = fem = neut = False
             for token in tokens:
@@ -346,8 +345,8 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                     "VERB",
                     "AUX",
                 ):
-                    _, _, _, head_nonvirile, head_virile = get_gender_number_info(
-                        tokens[0].head
+                    _, _, _, head_nonvirile, head_virile = self.get_gender_number_info(
+                        tokens[0].head, context, directly
                     )
                     if head_nonvirile and not head_virile:
                         return 0  # only nonvirile
@@ -371,13 +370,13 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
         if directly:
             if (
-                self.is_potential_reflexive_pair(referred, referring)
+                self.is_potential_reflexive_pair(referred, referring, context)
                 and self.is_reflexive_anaphor(referring) == 0
             ):
                 return 0
 
             if (
-                not self.is_potential_reflexive_pair(referred, referring)
+                not self.is_potential_reflexive_pair(referred, referring, context)
                 and self.is_reflexive_anaphor(referring) == 2
             ):
                 return 0
@@ -404,11 +403,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                 working_token = working_token.head
 
         # Some verbs like 'mówić' require a personal subject
-        referring_governing_sibling = referring
-        if referring._.coref_chains.temp_governing_sibling is not None:
-            referring_governing_sibling = (
-                referring._.coref_chains.temp_governing_sibling
-            )
+        referring_governing_sibling = self.get_governing_sibling(referring, context)
+        if referring_governing_sibling is None:
+            referring_governing_sibling = referring
         if (
             self._is_subject_noun(referring_governing_sibling)
             and referring_governing_sibling.head.lemma_
@@ -428,17 +425,19 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             referring_neut,
             referring_nonvirile,
             referring_virile,
-        ) = get_gender_number_info_for_single_token(referring)
+        ) = self.get_gender_number_info_for_single_token(referring, context, directly)
 
-        if self.is_involved_in_non_or_conjunction(referred_root):
-            if referred_root._.coref_chains.temp_governing_sibling is not None:
-                all_involved_referreds = [
-                    referred_root._.coref_chains.temp_governing_sibling
-                ]
+        if self.is_involved_in_non_or_conjunction(referred_root, context):
+            referred_governing_sibling = self.get_governing_sibling(
+                referred_root, context
+            )
+            if referred_governing_sibling is not None:
+                all_involved_referreds = [referred_governing_sibling]
             else:
                 all_involved_referreds = [referred_root]
             all_involved_referreds.extend(
-                all_involved_referreds[0]._.coref_chains.temp_dependent_siblings
+                doc[index]
+                for index in context.dependent_siblings[all_involved_referreds[0].i]
             )
         else:
             all_involved_referreds = [referred_root]
@@ -446,7 +445,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         # e.g. 'Janek był w domu. Zadzwonili z żoną ...'
         comitative_siblings = [
             c
-            for c in referring._.coref_chains.temp_dependent_siblings
+            for c in (doc[index] for index in context.dependent_siblings[referring.i])
             if referring.pos_ in ("VERB", "AUX")
             and self.has_morph(referring, "Number", "Plur")
             and self.has_morph(c, "Case", "Ins")
@@ -501,11 +500,15 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                 referred_neut,
                 referred_nonvirile,
                 referred_virile,
-            ) = get_gender_number_info_for_single_token(referred_root)
+            ) = self.get_gender_number_info_for_single_token(
+                referred_root, context, directly
+            )
 
             referred_comitative_siblings = [
                 c
-                for c in referred_root._.coref_chains.temp_dependent_siblings
+                for c in (
+                    doc[index] for index in context.dependent_siblings[referred_root.i]
+                )
                 if referred_root.pos_ in ("VERB", "AUX")
                 and self.has_morph(referred_root, "Number", "Plur")
                 and self.has_morph(c, "Case", "Ins")
@@ -541,7 +544,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                 working_neut,
                 working_nonvirile,
                 working_virile,
-            ) = get_gender_number_info_for_single_token(working_token)
+            ) = self.get_gender_number_info_for_single_token(
+                working_token, context, directly
+            )
             referred_masc = referred_masc or working_masc
             referred_fem = referred_fem or working_fem
             referred_neut = referred_neut or working_neut
@@ -642,7 +647,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             return 1
         return 0
 
-    def is_potential_reflexive_pair(self, referred: Mention, referring: Token) -> bool:
+    def is_potential_reflexive_pair(
+        self, referred: Mention, referring: Token, context: DocContext
+    ) -> bool:
 
         if (
             referring.pos_ != "PRON"
@@ -653,18 +660,22 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
         referred_root = referring.doc[referred.root_index]
 
-        if referred_root._.coref_chains.temp_governing_sibling is not None:
-            referred_root = referred_root._.coref_chains.temp_governing_sibling
+        referred_governing_sibling = self.get_governing_sibling(
+            referred_root, context
+        )
+        if referred_governing_sibling is not None:
+            referred_root = referred_governing_sibling
 
-        if referring._.coref_chains.temp_governing_sibling is not None:
-            referring = referring._.coref_chains.temp_governing_sibling
+        referring_governing_sibling = self.get_governing_sibling(referring, context)
+        if referring_governing_sibling is not None:
+            referring = referring_governing_sibling
 
         if (self._is_subject_noun(referred_root)) or (
             referred_root.pos_ in ("VERB", "AUX")
-            and self.is_potential_anaphor(referred_root)
+            and self.is_potential_anaphor(referred_root, context)
         ):
             referring_and_ancestors = [referring]
-            referring_and_ancestors.extend(list(referring.ancestors))
+            referring_and_ancestors.extend(self.get_ancestors(referring))
             for referring_or_ancestor in referring_and_ancestors:
 
                 # Loop up through the ancestors of the pronoun
@@ -700,7 +711,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                     return False
 
                 if (
-                    referring_or_ancestor._.coref_chains.temp_governing_sibling
+                    self.get_governing_sibling(referring_or_ancestor, context)
                     == referred_root
                 ):
                     return False
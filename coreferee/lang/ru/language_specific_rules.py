@@ -12,10 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from typing import Tuple
 from string import punctuation
 from spacy.tokens import Token
 from ...rules import RulesAnalyzer
-from ...data_model import Mention
+from ...data_model import DocContext, Mention
 
 
 class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
@@ -61,22 +62,22 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             token.pos_ == "DET" and token.tag_ == "DET" and token.lemma_ == "свой"
         ) or (token.pos_ == "PRON" and token.tag_ == "PRON" and token.lemma_ == "себя")
 
-    def get_dependent_siblings(self, token: Token) -> list:
+    def get_dependent_siblings(self, token: Token, context: DocContext) -> list:
         def add_siblings_recursively(recursed_token: Token, visited_set: set) -> None:
             visited_set.add(recursed_token)
             siblings_set = set()
             if recursed_token.lemma_ in self.or_lemmas:
-                token._.coref_chains.temp_has_or_coordination = True
+                context.has_or_coordination[token.i] = True
             if (
                 token != recursed_token
                 and token.pos_ in ("VERB", "AUX")
                 and recursed_token.pos_ in ("VERB", "AUX")
-                and self.is_potential_anaphor(recursed_token)
-                and self.is_potential_anaphor(token)
+                and self.is_potential_anaphor(recursed_token, context)
+                and self.is_potential_anaphor(token, context)
             ):
                 # we treat two verb anaphors as having or coordination because two
                 # singular anaphors do not give rise to a plural phrase
-                token._.coref_chains.temp_has_or_coordination = True
+                context.has_or_coordination[token.i] = True
             if (
                 recursed_token.dep_ in self.dependent_sibling_deps
                 or self.has_morph(recursed_token, "Case", "Ins")
@@ -107,7 +108,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                 child
                 for child in recursed_token.children
                 if recursed_token.pos_ in ("VERB", "AUX")
-                and self.is_potential_anaphor(recursed_token)
+                and self.is_potential_anaphor(recursed_token, context)
                 and child.pos_ in self.noun_pos
                 and self.has_morph(child, "Case", "Ins")
                 and child not in visited_set
@@ -141,9 +142,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             return False
         # if token.lemma_ in ['мы', 'вы'] and self.has_morph(token, 'Case', 'Nom'):
         #    return True
-        return not self.is_token_in_one_of_phrases(token, self.blacklisted_phrases)
+        return not self.is_token_in_blacklisted_phrase(token)
 
-    def is_potential_anaphor(self, token: Token) -> bool:
+    def is_potential_anaphor(self, token: Token, context: DocContext) -> bool:
         # third-person pronoun
         if token.tag_ in ("PRON", "DET"):
             return True
@@ -152,12 +153,13 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         if self.is_reflexive_possessive_pronoun(token):
             return True
 
+        governing_sibling = self.get_governing_sibling(token, context)
         if (
-            token._.coref_chains.temp_governing_sibling is not None
+            governing_sibling is not None
             and len(
                 [
                     child
-                    for child in token._.coref_chains.temp_governing_sibling.children
+                    for child in governing_sibling.children
                     if child.dep_.startswith("nsubj")
                 ]
             )
@@ -181,40 +183,42 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
         return False
 
-    def is_potential_anaphoric_pair(
-        self, referred: Mention, referring: Token, directly: bool
-    ) -> int:
-
+    def get_gender_number_info(
+        self, token: Token, context: DocContext, directly: bool
+    ) -> Tuple[bool, bool, bool]:
         # masc:     'мужской род'
         # fem:      'женский род'
         # neut:     'средний род'
 
-        def get_gender_number_info(token):
-            masc = fem = neut = False
-            if token.lemma_.capitalize() in self.female_names:
-                fem = True
-            elif token.lemma_.capitalize() in self.male_names:
-                masc = True
+        masc = fem = neut = False
+        if token.lemma_.capitalize() in self.female_names:
+            fem = True
+        elif token.lemma_.capitalize() in self.male_names:
+            masc = True
+        else:
+            # spacy has some problems identifying people names lemmas
+            if token.dep_ == "flat:name" and token.lemma_.endswith("у"):
+                if (token.lemma_[:-1] + "a").capitalize() in self.female_names:
+                    fem = True
             else:
-                # spacy has some problems identifying people names lemmas
-                if token.dep_ == "flat:name" and token.lemma_.endswith("у"):
-                    if (token.lemma_[:-1] + "a").capitalize() in self.female_names:
+                if self.has_morph(token, "Number", "Sing"):
+                    if self.has_morph(token, "Gender", "Masc"):
+                        masc = True
+                    elif self.has_morph(token, "Gender", "Fem"):
                         fem = True
+                    elif self.has_morph(token, "Gender", "Neut"):
+                        neut = True
                 else:
-                    if self.has_morph(token, "Number", "Sing"):
-                        if self.has_morph(token, "Gender", "Masc"):
-                            masc = True
-                        elif self.has_morph(token, "Gender", "Fem"):
-                            fem = True
-                        elif self.has_morph(token, "Gender", "Neut"):
-                            neut = True
-                    else:
-                        # plural form doesn't have gender, so suppose that it can reffer to anything
-                        masc = fem = neut = True
-                    if token.pos_ == "PROPN" and not directly:
-                        # common noun and proper noun in same chain may have different genders
-                        masc = fem = neut = True
-            return masc, fem, neut
+                    # plural form doesn't have gender, so suppose that it can reffer to anything
+                    masc = fem = neut = True
+                if token.pos_ == "PROPN" and not directly:
+                    # common noun and proper noun in same chain may have different genders
+                    masc = fem = neut = True
+        return masc, fem, neut
+
+    def is_potential_anaphoric_pair(
+        self, referred: Mention, referring: Token, context: DocContext, directly: bool
+    ) -> int:
 
         doc = referring.doc
         referred_root = doc[referred.root_index]
@@ -222,13 +226,13 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
         if directly:
             if (
-                self.is_potential_reflexive_pair(referred, referring)
+                self.is_potential_reflexive_pair(referred, referring, context)
                 and self.is_reflexive_anaphor(referring) == 0
             ):
                 return False
 
             if (
-                not self.is_potential_reflexive_pair(referred, referring)
+                not self.is_potential_reflexive_pair(referred, referring, context)
                 and self.is_reflexive_anaphor(referring) == 2
             ):
                 return False
@@ -255,11 +259,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                     break
                 working_token = working_token.head
 
-        referring_governing_sibling = referring
-        if referring._.coref_chains.temp_governing_sibling is not None:
-            referring_governing_sibling = (
-                referring._.coref_chains.temp_governing_sibling
-            )
+        referring_governing_sibling = self.get_governing_sibling(referring, context)
+        if referring_governing_sibling is None:
+            referring_governing_sibling = referring
         if (
             referring_governing_sibling.dep_.startswith("nsubj")
             and referring_governing_sibling.head.lemma_
@@ -273,19 +275,21 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                 ):
                     uncertain = False
 
-        referring_masc, referring_fem, referring_neut = get_gender_number_info(
-            referring
+        referring_masc, referring_fem, referring_neut = self.get_gender_number_info(
+            referring, context, directly
         )
 
-        if self.is_involved_in_non_or_conjunction(referred_root):
-            if referred_root._.coref_chains.temp_governing_sibling is not None:
-                all_involved_referreds = [
-                    referred_root._.coref_chains.temp_governing_sibling
-                ]
+        if self.is_involved_in_non_or_conjunction(referred_root, context):
+            referred_governing_sibling = self.get_governing_sibling(
+                referred_root, context
+            )
+            if referred_governing_sibling is not None:
+                all_involved_referreds = [referred_governing_sibling]
             else:
                 all_involved_referreds = [referred_root]
             all_involved_referreds.extend(
-                all_involved_referreds[0]._.coref_chains.temp_dependent_siblings
+                doc[index]
+                for index in context.dependent_siblings[all_involved_referreds[0].i]
             )
         else:
             all_involved_referreds = [referred_root]
@@ -293,7 +297,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
         # e.g. 'Муж и жена... Они...'
         comitative_siblings = [
             c
-            for c in referring._.coref_chains.temp_dependent_siblings
+            for c in (doc[index] for index in context.dependent_siblings[referring.i])
             if referring.pos_ in ("VERB", "AUX")
             and self.has_morph(referring, "Number", "Plur")
         ]
@@ -326,13 +330,15 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                 if not self.has_morph(referring, "Gender", "Fem"):
                     return 1 if uncertain else 2
 
-            referred_masc, referred_fem, referred_neut = get_gender_number_info(
-                referred_root
+            referred_masc, referred_fem, referred_neut = self.get_gender_number_info(
+                referred_root, context, directly
             )
 
             referred_comitative_siblings = [
                 child
-                for child in referred_root._.coref_chains.temp_dependent_siblings
+                for child in (
+                    doc[index] for index in context.dependent_siblings[referred_root.i]
+                )
                 if child.i != referring.i
                 and referred_root.pos_ in ("VERB", "AUX")
                 and self.has_morph(referring, "Number", "Plur")
@@ -345,8 +351,8 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                 return 1 if uncertain else 2
 
         for working_token in (doc[index] for index in referred.token_indexes):
-            working_masc, working_fem, working_neut = get_gender_number_info(
-                working_token
+            working_masc, working_fem, working_neut = self.get_gender_number_info(
+                working_token, context, directly
             )
             referred_masc = referred_masc or working_masc
             referred_fem = referred_fem or working_fem
@@ -368,7 +374,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
 
             if referred_root.dep_ not in self.dependent_sibling_deps:
                 if sum(
-                    get_gender_number_info(referring)
+                    self.get_gender_number_info(referring, context, directly)
                 ) > 2 or self.is_reflexive_possessive_pronoun(referring):
                     if (
                         not self.has_morph(referred_root, "Case", "Ins")
@@ -407,8 +413,8 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                 child
                 for child in referred_root.children
                 if child.dep_ in self.dependent_sibling_deps
-                and get_gender_number_info(child)
-                == get_gender_number_info(referred_root)
+                and self.get_gender_number_info(child, context, directly)
+                == self.get_gender_number_info(referred_root, context, directly)
             ]:
                 if self.has_morph(referring, "Number", "Sing"):
                     # spacy models have a bug where they
@@ -440,8 +446,8 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                     child
                     for child in referred_root.head.children
                     if child.dep_ in ("obj", "obl")
-                    and get_gender_number_info(child)
-                    == get_gender_number_info(referred_root)
+                    and self.get_gender_number_info(child, context, directly)
+                    == self.get_gender_number_info(referred_root, context, directly)
                     and child.i < referring.i
                 ]:
                     return 0
@@ -613,9 +619,13 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             ):
                 return 0
 
-            if self.has_morph(referred_root, "Case", "Loc") and get_gender_number_info(
-                referred_root.head
-            ) == get_gender_number_info(referring):
+            if self.has_morph(
+                referred_root, "Case", "Loc"
+            ) and self.get_gender_number_info(
+                referred_root.head, context, directly
+            ) == self.get_gender_number_info(
+                referring, context, directly
+            ):
                 return 0
 
         if self.has_morph(referred_root, "Case", "Nom"):
@@ -665,7 +675,10 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                         continue
                     if self.is_independent_noun(temp_token):
                         if self.is_potential_anaphoric_pair(
-                            Mention(doc[temp_token.i], False), referring, directly
+                            Mention(doc[temp_token.i], False),
+                            referring,
+                            context,
+                            directly,
                         ):
                             return 0
 
@@ -732,7 +745,9 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                 return 1
         return 0
 
-    def is_potential_reflexive_pair(self, referred: Mention, referring: Token) -> bool:
+    def is_potential_reflexive_pair(
+        self, referred: Mention, referring: Token, context: DocContext
+    ) -> bool:
 
         if referring.pos_ != "PRON" and not self.is_reflexive_possessive_pronoun(
             referring
@@ -742,18 +757,20 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
             return False
         referred_root = referring.doc[referred.root_index]
 
-        if referred_root._.coref_chains.temp_governing_sibling is not None:
-            referred_root = referred_root._.coref_chains.temp_governing_sibling
+        referred_governing_sibling = self.get_governing_sibling(referred_root, context)
+        if referred_governing_sibling is not None:
+            referred_root = referred_governing_sibling
 
-        if referring._.coref_chains.temp_governing_sibling is not None:
-            referring = referring._.coref_chains.temp_governing_sibling
+        referring_governing_sibling = self.get_governing_sibling(referring, context)
+        if referring_governing_sibling is not None:
+            referring = referring_governing_sibling
 
         if referred_root.dep_.startswith("nsubj") or (
             referred_root.pos_ in ("VERB", "AUX")
-            and self.is_potential_anaphor(referred_root)
+            and self.is_potential_anaphor(referred_root, context)
         ):
             referring_and_ancestors = [referring]
-            referring_and_ancestors.extend(list(referring.ancestors))
+            referring_and_ancestors.extend(self.get_ancestors(referring))
             for referring_or_ancestor in referring_and_ancestors:
 
                 # Loop up through the ancestors of the pronoun
@@ -784,7 +801,7 @@ class LanguageSpecificRulesAnalyzer(RulesAnalyzer):
                     return False
 
                 if (
-                    referring_or_ancestor._.coref_chains.temp_governing_sibling
+                    self.get_governing_sibling(referring_or_ancestor, context)
                     == referred_root
                 ):
                     return False
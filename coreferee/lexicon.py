@@ -0,0 +1,48 @@
+from typing import Dict, FrozenSet
+import os
+
+
+class Lexicon:
+    """The word lists read from the *.dat* files in one or more language data directories,
+    held as frozensets keyed by the file names without their extensions so that membership
+    checks do not require linear scans."""
+
+    def __init__(self, word_lists: Dict[str, FrozenSet[str]]):
+        self.word_lists = word_lists
+
+    def __getitem__(self, name: str) -> FrozenSet[str]:
+        return self.word_lists[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.word_lists
+
+    def contains(self, name: str, word: str) -> bool:
+        """Returns *True* if *word* is a member of the word list *name*."""
+        return word in self.word_lists[name]
+
+    def update(self, other: "Lexicon") -> None:
+        """Adds the word lists from *other* to this lexicon."""
+        self.word_lists.update(other.word_lists)
+
+
+def read_word_list(filename: str) -> FrozenSet[str]:
+    """Reads a *.dat* file, skipping comment lines and lines with fewer than two
+    characters."""
+    with open(filename, "r", encoding="utf-8") as file:
+        stripped_lines = (line.strip() for line in file.read().splitlines())
+        return frozenset(
+            line
+            for line in stripped_lines
+            if len(line) > 1 and not line.startswith("#")
+        )
+
+
+def load_lexicon(directory: str) -> Lexicon:
+    """Returns a *Lexicon* containing the word lists in the *.dat* files in *directory*."""
+    return Lexicon(
+        {
+            filename[:-4]: read_word_list(os.path.join(directory, filename))
+            for filename in sorted(os.listdir(directory))
+            if filename.endswith(".dat")
+        }
+    )
@@ -1,4 +1,5 @@
-from typing import Dict, Tuple
+from typing import Dict, Tuple, Iterable, Iterator, Optional
+import hashlib
 import importlib
 import os
 import pickle
@@ -12,10 +13,11 @@ import pkg_resources
 from wasabi import Printer # type: ignore[import]
 from spacy.language import Language
 from spacy.tokens import Doc, Token
+from spacy.util import minibatch
 from thinc.api import Config
 from thinc.model import Model
 from .annotation import Annotator
-from .data_model import FeatureTable
+from .data_model import ChainHolder, FeatureTable
 from .errors import (
     LanguageNotSupportedError,
     ModelNotSupportedError,
@@ -23,6 +25,7 @@ from .errors import (
 )
 from .errors import VectorsModelNotInstalledError, VectorsModelHasWrongVersionError
 from .tendencies import create_thinc_model, ENSEMBLE_SIZE
+from .tendencies import FusedEnsemble, export_runtime, load_runtime
 
 COMMON_MODELS_PACKAGE_NAMEPART = "coreferee_model_"
 
@@ -30,10 +33,16 @@ FEATURE_TABLE_FILENAME = "feature_table.bin"
 
 THINC_MODEL_FILENAME = "model"
 
+RUNTIME_FILENAME = "runtime.npz"
+
 
 class CorefereeManager:
     @staticmethod
-    def get_annotator(nlp: Language) -> Annotator:
+    def get_annotator(nlp: Language, precision: Optional[str] = None) -> Annotator:
+        """*precision* is one of *'float32'*, *'float16'* and *'int8'* and determines the
+        precision to which the weights of the neural ensemble are rounded and with which
+        they are held in memory. If *precision* is *None*, the precision with which a
+        runtime file was exported is used, or *'float32'* if there is no runtime file."""
         model_name = "_".join((nlp.meta["lang"], nlp.meta["name"]))
         relative_config_filename = os.sep.join(("lang", nlp.meta["lang"], "config.cfg"))
         if not pkg_resources.resource_exists(__name__, relative_config_filename):
@@ -113,6 +122,7 @@ class CorefereeManager:
                     nlp=nlp,
                     vectors_nlp=vectors_nlp,
                     config_entry_name=config_entry_name,
+                    precision=precision,
                 )
         msg = Printer()
         error_msg = "".join(
@@ -132,32 +142,52 @@ class CorefereeManager:
         raise ModelNotSupportedError(error_msg)
 
 
-@Language.factory("coreferee")
+@Language.factory("coreferee", default_config={"precision": None})
 class CorefereeBroker:
-    def __init__(self, nlp: Language, name: str):
+    def __init__(self, nlp: Language, name: str, precision: Optional[str]):
         self.nlp = nlp
         self.pid = os.getpid()
-        self.annotator = CorefereeManager().get_annotator(nlp)
+        self.precision = precision
+        self.annotator = CorefereeManager().get_annotator(nlp, precision)
 
     def __call__(self, doc: Doc) -> Doc:
         try:
             self.annotator.annotate(doc)
-        except:
-            msg = Printer()
-            msg.warn("Unexpected error in Coreferee annotating document, skipping ....")
-            exception_info_parts = exc_info()
-            msg.warn(exception_info_parts[0])
-            msg.warn(exception_info_parts[1])
-            traceback.print_tb(exception_info_parts[2])
+        except Exception:
+            self.skip_document(doc)
         return doc
 
-    def __getstate__(self) -> Dict[str, str]:
-        return self.nlp.meta
+    def pipe(self, stream: Iterable[Doc], *, batch_size: int = 128) -> Iterator[Doc]:
+        """Annotates the documents from *stream* in batches of *batch_size*, scoring each
+        batch with a single call to the neural ensemble. A document that causes an error
+        is skipped without affecting the rest of its batch."""
+        for docs in minibatch(stream, size=batch_size):
+            self.annotator.annotate_batch(docs, self.skip_document)
+            yield from docs
 
-    def __setstate__(self, meta: Dict[str, str]):
+    @staticmethod
+    def skip_document(doc: Doc) -> None:
+        """Reports the exception being handled and gives *doc* and its tokens empty chain
+        holders. Called from within an *except* block."""
+        msg = Printer()
+        msg.warn("Unexpected error in Coreferee annotating document, skipping ....")
+        exception_info_parts = exc_info()
+        msg.warn(exception_info_parts[0])
+        msg.warn(exception_info_parts[1])
+        traceback.print_tb(exception_info_parts[2])
+        # the chain holders are only written once the chains are complete
+        doc._.coref_chains = ChainHolder()
+        for token in doc:
+            token._.coref_chains = ChainHolder()
+
+    def __getstate__(self) -> Tuple[Dict[str, str], Optional[str]]:
+        return self.nlp.meta, self.precision
+
+    def __setstate__(self, state: Tuple[Dict[str, str], Optional[str]]):
+        meta, self.precision = state
         nlp_name = "_".join((meta["lang"], meta["name"]))
         self.nlp = spacy.load(nlp_name)
-        self.annotator = CorefereeManager().get_annotator(self.nlp)
+        self.annotator = CorefereeManager().get_annotator(self.nlp, self.precision)
         self.pid = os.getpid()
         CorefereeBroker.set_extensions()
 
@@ -170,8 +200,16 @@ class CorefereeBroker:
 
 
 def get_annotator(
-    *, nlp: Language, vectors_nlp: Language, config_entry_name: str
+    *,
+    nlp: Language,
+    vectors_nlp: Language,
+    config_entry_name: str,
+    precision: Optional[str] = None,
+    use_runtime_file: bool = True,
 ) -> Annotator:
+    """*precision* is as for *CorefereeManager.get_annotator()*. If
+    *use_runtime_file==False*, the Thinc model is loaded even if a runtime file has been
+    exported from it."""
     model_package_name = "".join(
         (
             COMMON_MODELS_PACKAGE_NAMEPART,
@@ -195,11 +233,6 @@ def get_annotator(
         )
         msg.fail(error_msg)
         raise ModelNotSupportedError(error_msg)
-    this_feature_table_filename = pkg_resources.resource_filename(
-        model_package_name, FEATURE_TABLE_FILENAME
-    )
-    with open(this_feature_table_filename, "rb") as feature_table_file:
-        feature_table = pickle.load(feature_table_file)
     absolute_thinc_model_filename = pkg_resources.resource_filename(
         model_package_name, THINC_MODEL_FILENAME
     )
@@ -216,6 +249,145 @@ def get_annotator(
         )
         msg.fail(error_msg)
         raise OutdatedCorefereeModelError(error_msg)
+    absolute_runtime_filename = pkg_resources.resource_filename(
+        model_package_name, RUNTIME_FILENAME
+    )
+    if use_runtime_file and os.path.isfile(absolute_runtime_filename):
+        # A runtime file written by 'python -m coreferee export-runtime' allows documents
+        # to be scored without Thinc. The file is not part of the model package and so
+        # survives the installation of a newer model, so it is only used if it was
+        # exported from the model that is currently installed.
+        try:
+            feature_table, fused_ensemble = load_runtime(
+                absolute_runtime_filename, get_model_digest(model_package_name)
+            )
+        except OutdatedCorefereeModelError as error:
+            msg = Printer()
+            msg.warn("".join((str(error), " Loading the Thinc model instead ...")))
+        else:
+            if precision is not None and fused_ensemble.precision != precision:
+                fused_ensemble = fused_ensemble.quantize(precision)
+            return Annotator(nlp, vectors_nlp, feature_table, fused_ensemble)
+    this_feature_table_filename = pkg_resources.resource_filename(
+        model_package_name, FEATURE_TABLE_FILENAME
+    )
+    with open(this_feature_table_filename, "rb") as feature_table_file:
+        feature_table = pickle.load(feature_table_file)
     thinc_model = create_thinc_model()
     thinc_model.from_disk(absolute_thinc_model_filename)
+    if precision is not None and precision != "float32":
+        return Annotator(
+            nlp,
+            vectors_nlp,
+            feature_table,
+            FusedEnsemble.from_thinc_model(thinc_model).quantize(precision),
+        )
     return Annotator(nlp, vectors_nlp, feature_table, thinc_model)
+
+
+def get_model_digest(model_package_name: str) -> str:
+    """Returns a digest of the Thinc model weights and the feature table installed in
+    *model_package_name*, which identifies the model from which a runtime file was
+    exported."""
+    digest = hashlib.sha256()
+    for filename in (THINC_MODEL_FILENAME, FEATURE_TABLE_FILENAME):
+        with open(
+            pkg_resources.resource_filename(model_package_name, filename), "rb"
+        ) as model_file:
+            digest.update(model_file.read())
+    return digest.hexdigest()
+
+
+def export_runtimes(lang: str, precision: str = "float32") -> None:
+    """Writes a runtime file containing the weights and feature table of each installed
+    model for *lang* to the directory of that model, from where *get_annotator()* loads
+    it in preference to the Thinc model for as long as that model remains installed.
+    *precision* determines how the weights are
+    stored."""
+    msg = Printer()
+    relative_config_filename = os.sep.join(("lang", lang, "config.cfg"))
+    if not pkg_resources.resource_exists(__name__, relative_config_filename):
+        msg.fail(
+            "".join(
+                ("Unfortunately language '", lang, "' is not yet supported by Coreferee.")
+            )
+        )
+        raise LanguageNotSupportedError(lang)
+    config = Config().from_disk(
+        pkg_resources.resource_filename(__name__, relative_config_filename)
+    )
+    for config_entry_name in config:
+        model_package_name = "".join(
+            (COMMON_MODELS_PACKAGE_NAMEPART, lang, ".", config_entry_name)
+        )
+        try:
+            importlib.import_module(model_package_name)
+        except ModuleNotFoundError:
+            msg.warn(
+                "".join(
+                    (
+                        "No model installed for config entry '",
+                        config_entry_name,
+                        "', skipping ...",
+                    )
+                )
+            )
+            continue
+        absolute_thinc_model_filename = pkg_resources.resource_filename(
+            model_package_name, THINC_MODEL_FILENAME
+        )
+        if not os.path.isfile(absolute_thinc_model_filename):
+            msg.warn(
+                "".join(
+                    (
+                        "The model installed for config entry '",
+                        config_entry_name,
+                        "' is outdated, skipping ...",
+                    )
+                )
+            )
+            continue
+        with open(
+            pkg_resources.resource_filename(model_package_name, FEATURE_TABLE_FILENAME),
+            "rb",
+        ) as feature_table_file:
+            feature_table = pickle.load(feature_table_file)
+        thinc_model = create_thinc_model()
+        thinc_model.from_disk(absolute_thinc_model_filename)
+        absolute_runtime_filename = pkg_resources.resource_filename(
+            model_package_name, RUNTIME_FILENAME
+        )
+        try:
+            export_runtime(
+                absolute_runtime_filename,
+                thinc_model,
+                feature_table,
+                precision,
+                get_model_digest(model_package_name),
+            )
+        except OSError as error:
+            # e.g. the model is installed in a read-only site-packages directory
+            msg.warn(
+                "".join(
+                    (
+                        "Unable to write runtime for config entry '",
+                        config_entry_name,
+                        "' to ",
+                        absolute_runtime_filename,
+                        ": ",
+                        str(error),
+                        ", skipping ...",
+                    )
+                )
+            )
+            continue
+        msg.good(
+            "".join(
+                (
+                    "Exported runtime for config entry '",
+                    config_entry_name,
+                    "' to ",
+                    absolute_runtime_filename,
+                )
+            )
+        )
@@ -1,42 +1,287 @@
-from typing import List, Tuple, Dict
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Dict,
+    FrozenSet,
+)
+from bisect import bisect_left
+from collections import Counter
+from functools import wraps
 import importlib
+import inspect
 import sys
 from os import sep
 from abc import ABC, abstractmethod
 from threading import Lock
+from weakref import WeakKeyDictionary
 import pkg_resources
 from spacy.language import Language
 from spacy.tokens import Token, Doc
-from .data_model import ChainHolder, Mention
+from .data_model import DocContext, Mention
+from .lexicon import Lexicon, load_lexicon
 
 language_to_rules = {}
 lock = Lock()
 
+# The *RulesAnalyzer* methods whose results are memoized per document and per token
+MEMOIZED_PREDICATE_NAMES = (
+    "is_independent_noun",
+    "is_potential_anaphor",
+    "is_reflexive_anaphor",
+    "get_propn_subtree",
+    "is_potentially_referring_back_noun",
+    "get_gender_number_info",
+    "get_gender_number_info_for_single_token",
+    "get_coreferring_noun_query_keys",
+    "get_propn_texts",
+    "get_propn_end_suffixes",
+)
+
+
+class PredicateCache:
+    """Holds the results of the memoized *RulesAnalyzer* methods for the tokens of a
+    document, keyed by method name and token index (and by any further arguments), together
+    with the number of calls that were answered from the cache (hits) and the number that
+    were not (misses)."""
+
+    def __init__(self):
+        self.results: Dict[str, Dict[Any, Any]] = {
+            name: {} for name in MEMOIZED_PREDICATE_NAMES
+        }
+        self.hits: Dict[str, int] = dict.fromkeys(MEMOIZED_PREDICATE_NAMES, 0)
+        self.misses: Dict[str, int] = dict.fromkeys(MEMOIZED_PREDICATE_NAMES, 0)
+
+
+class PhraseTrie:
+    """The phrases in a word list compiled into a trie of their lower-case words, so that
+    the tokens in a document that form part of any of the phrases can be found in a
+    single pass rather than by comparing each token with each phrase."""
+
+    # Marks the nodes at which a phrase ends. It can never be a key for a word because
+    # the phrases are split on whitespace.
+    END = ""
+
+    def __init__(self, phrases: Iterable[str]):
+        self.root: Dict[str, dict] = {}
+        for phrase in phrases:
+            phrase_words = phrase.lower().split()
+            if len(phrase_words) == 0:
+                continue
+            node = self.root
+            for phrase_word in phrase_words:
+                node = node.setdefault(phrase_word, {})
+            node[self.END] = {}
+
+    def get_covered_flags(self, doc: Doc) -> List[bool]:
+        """Returns a list with an entry for each token in *doc* that is *True* where the
+        token forms part of one of the phrases."""
+        flags = [False] * len(doc)
+        token_texts = [token.text.lower() for token in doc]
+        for start_index in range(len(token_texts)):
+            node = self.root
+            for index in range(start_index, len(token_texts)):
+                node = node.get(token_texts[index])
+                if node is None:
+                    break
+                if self.END in node:
+                    flags[start_index : index + 1] = [True] * (index + 1 - start_index)
+        return flags
+
+
+class TreeIndex:
+    """Records the positions of the tokens of a document in a traversal of its dependency
+    trees together with the heads and depths of the tokens, so that ancestor and subtree
+    membership can be checked with integer comparisons rather than by walking the trees.
+
+    The traversal visits the tokens in the order in which Spacy's *Token.subtree* yields
+    them, i.e. the subtrees of the left children, the token itself and then the subtrees
+    of the right children. The subtree of each token therefore occupies the contiguous
+    stretch of *order* from *subtree_starts[i]* up to but excluding *subtree_ends[i]*.
+    """
+
+    # Traversal events
+    START, VISIT, END = range(3)
+
+    def __init__(self, doc: Doc):
+        length = len(doc)
+        self.heads = [token.head.i for token in doc]
+        self.depths = [0] * length
+        self.positions = [0] * length
+        self.subtree_starts = [0] * length
+        self.subtree_ends = [0] * length
+        self.order: List[int] = []
+        children: List[List[int]] = [[] for _ in range(length)]
+        roots = []
+        for index, head_index in enumerate(self.heads):
+            if head_index == index:
+                roots.append(index)
+            else:
+                children[head_index].append(index)
+        # An explicit stack rather than recursion as the trees may be deep
+        stack: List[Tuple[int, int]] = []
+        for root_index in reversed(roots):
+            stack.append((self.START, root_index))
+        while len(stack) > 0:
+            event, index = stack.pop()
+            if event == self.START:
+                self.subtree_starts[index] = len(self.order)
+                stack.append((self.END, index))
+                for child_index in reversed(children[index]):
+                    self.depths[child_index] = self.depths[index] + 1
+                    if child_index > index:
+                        stack.append((self.START, child_index))
+                stack.append((self.VISIT, index))
+                for child_index in reversed(children[index]):
+                    if child_index < index:
+                        stack.append((self.START, child_index))
+            elif event == self.VISIT:
+                self.positions[index] = len(self.order)
+                self.order.append(index)
+            else:
+                self.subtree_ends[index] = len(self.order)
+
+    def is_ancestor(self, ancestor_index: int, index: int) -> bool:
+        """Returns *True* if the token at *ancestor_index* is a proper ancestor of the
+        token at *index*."""
+        return (
+            ancestor_index != index
+            and self.subtree_starts[ancestor_index]
+            <= self.positions[index]
+            < self.subtree_ends[ancestor_index]
+        )
+
+    def is_in_subtree(self, index: int, root_index: int) -> bool:
+        """Returns *True* if the token at *index* is within the subtree of the token at
+        *root_index*, which includes that token itself."""
+        return (
+            self.subtree_starts[root_index]
+            <= self.positions[index]
+            < self.subtree_ends[root_index]
+        )
+
+    def get_subtree(self, root_index: int) -> List[int]:
+        """Returns the indexes of the subtree of the token at *root_index* in the order
+        of *Token.subtree*."""
+        return self.order[
+            self.subtree_starts[root_index] : self.subtree_ends[root_index]
+        ]
+
+    def get_ancestors(self, index: int) -> List[int]:
+        """Returns the indexes of the ancestors of the token at *index*, beginning with its
+        head."""
+        ancestors = []
+        head_index = self.heads[index]
+        while head_index != index:
+            ancestors.append(head_index)
+            index = head_index
+            head_index = self.heads[index]
+        return ancestors
+
+
+class CoreferringNounIndex:
+    """Indexes the nouns in a document by the keys under which they could form the referring
+    member of a potential coreferring noun pair, as generated by
+    *RulesAnalyzer.get_coreferring_noun_keys()*. Each key maps to the positions of the nouns
+    in the *TreeIndex* traversal in ascending order, so that the nouns with a given key
+    within a subtree can be found by binary search."""
+
+    def __init__(self, rules_analyzer: "RulesAnalyzer", doc: Doc, tree_index: TreeIndex):
+        self.tree_index = tree_index
+        self.positions: Dict[Tuple, List[int]] = {}
+        for index in tree_index.order:
+            token = doc[index]
+            if token.pos_ not in rules_analyzer.noun_pos:
+                continue
+            for key in rules_analyzer.get_coreferring_noun_keys(token):
+                self.positions.setdefault(key, []).append(tree_index.positions[index])
+
+    def get_indexes_in_subtree(
+        self, keys: Iterable[Tuple], root_index: int
+    ) -> Iterator[int]:
+        """Yields the indexes of the nouns within the subtree of the token at *root_index*
+        that are indexed under any of *keys*."""
+        start = self.tree_index.subtree_starts[root_index]
+        end = self.tree_index.subtree_ends[root_index]
+        for key in keys:
+            positions = self.positions.get(key)
+            if positions is None:
+                continue
+            for position in positions[bisect_left(positions, start) :]:
+                if position >= end:
+                    break
+                yield self.tree_index.order[position]
+
+
+def memoized_per_document(method: Callable[..., Any]) -> Callable:
+    """Decorates a *RulesAnalyzer* method that takes a token, optionally followed by
+    further hashable arguments, so that its results are served from the *PredicateCache*
+    of the document while one is active. The cache is only activated by
+    *RulesAnalyzer.initialize()* once the information on which the methods depend has
+    been added to the document. The further arguments are bound to the parameters of the
+    method with any defaults applied, so that positional and keyword calls with the same
+    arguments share a cache entry. A *context* argument is not part of the key because
+    there is only one context per document."""
+    name = method.__name__
+    signature = inspect.signature(method)
+    # the names of the parameters after *self* and the token
+    further_parameter_names = list(signature.parameters)[2:]
+    number_of_further_parameters = len(further_parameter_names)
+    context_position = (
+        further_parameter_names.index("context")
+        if "context" in further_parameter_names
+        else None
+    )
+
+    @wraps(method)
+    def wrapper(self, token: Token, *args, **kwargs) -> Any:
+        cache = self.predicate_caches.get(token.doc)
+        if cache is None:
+            return method(self, token, *args, **kwargs)
+        results = cache.results[name]
+        further_arguments = args
+        if kwargs or len(args) != number_of_further_parameters:
+            bound_arguments = signature.bind(self, token, *args, **kwargs)
+            bound_arguments.apply_defaults()
+            further_arguments = tuple(bound_arguments.arguments.values())[2:]
+        if context_position is not None:
+            further_arguments = (
+                further_arguments[:context_position]
+                + further_arguments[context_position + 1 :]
+            )
+        key: Any = (token.i, further_arguments) if further_arguments else token.i
+        if key in results:
+            cache.hits[name] += 1
+            return results[key]
+        cache.misses[name] += 1
+        result = method(self, token, *args, **kwargs)
+        results[key] = result
+        return result
+
+    wrapper.is_memoized_per_document = True  # type: ignore[attr-defined]
+    return wrapper
+
 
 class RulesAnalyzerFactory:
     @staticmethod
     def get_rules_analyzer(nlp: Language) -> "RulesAnalyzer":
         def read_in_data_files(directory: str, rules_analyzer: RulesAnalyzer) -> None:
-            for data_filename in (
-                filename
-                for filename in pkg_resources.resource_listdir(
+            lexicon = load_lexicon(
+                pkg_resources.resource_filename(
                     __name__, sep.join(("lang", directory, "data"))
                 )
-                if filename.endswith(".dat")
-            ):
-                full_data_filename = pkg_resources.resource_filename(
-                    __name__, sep.join(("lang", directory, "data", data_filename))
-                )
-                with open(full_data_filename, "r", encoding="utf-8") as file:
-                    setattr(
-                        rules_analyzer,
-                        data_filename[:-4],
-                        [
-                            v.strip()
-                            for v in file.read().splitlines()
-                            if len(v.strip()) > 1 and not v.strip().startswith("#")
-                        ],
-                    )
+            )
+            if hasattr(rules_analyzer, "lexicon"):
+                rules_analyzer.lexicon.update(lexicon)
+            else:
+                rules_analyzer.lexicon = lexicon
+            for name, word_list in lexicon.word_lists.items():
+                setattr(rules_analyzer, name, word_list)
 
         language = nlp.meta["lang"]
         with lock:
@@ -51,20 +296,34 @@ class RulesAnalyzerFactory:
                 language_to_rules[language] = rules_analyzer
                 read_in_data_files(language, rules_analyzer)
                 read_in_data_files("common", rules_analyzer)
-                rules_analyzer.exclusively_male_names = [
-                    name
-                    for name in rules_analyzer.male_names
-                    if name not in rules_analyzer.female_names
-                ]
-                rules_analyzer.exclusively_female_names = [
-                    name
-                    for name in rules_analyzer.female_names
-                    if name not in rules_analyzer.male_names
-                ]
+                lexicon = rules_analyzer.lexicon
+                for name, word_list in (
+                    (
+                        "exclusively_male_names",
+                        lexicon["male_names"] - lexicon["female_names"],
+                    ),
+                    (
+                        "exclusively_female_names",
+                        lexicon["female_names"] - lexicon["male_names"],
+                    ),
+                ):
+                    lexicon.word_lists[name] = word_list
+                    setattr(rules_analyzer, name, word_list)
+                rules_analyzer.blacklisted_phrase_trie = PhraseTrie(
+                    getattr(rules_analyzer, "blacklisted_phrases", ())
+                )
+                rules_analyzer.prepare_lookups()
             return language_to_rules[language]
 
 
 class RulesAnalyzer(ABC):
+    def __init_subclass__(cls, **kwargs):
+        # Memoize the language-specific implementations of the memoized methods
+        super().__init_subclass__(**kwargs)
+        for name in MEMOIZED_PREDICATE_NAMES:
+            method = cls.__dict__.get(name)
+            if method is not None and not hasattr(method, "is_memoized_per_document"):
+                setattr(cls, name, memoized_per_document(method))
 
     ### MUST BE IMPLEMENTED BY IMPLEMENTING SUBCLASSES:
 
@@ -99,10 +358,10 @@ class RulesAnalyzer(ABC):
     clause_root_pos: Tuple = NotImplemented
 
     @abstractmethod
-    def get_dependent_siblings(self, token: Token) -> List[Token]:
+    def get_dependent_siblings(self, token: Token, context: DocContext) -> List[Token]:
         """Returns a list of tokens that are dependent siblings of *token*. The method must
-        additionally set *token._.coref_chains.temp_has_or_coordination = True* for all
-        tokens with dependent siblings that are linked to those siblings by an *or*
+        additionally set *context.has_or_coordination[token.i] = True* for
+        all tokens with dependent siblings that are linked to those siblings by an *or*
         relationship."""
 
     @abstractmethod
@@ -112,14 +371,14 @@ class RulesAnalyzer(ABC):
         """
 
     @abstractmethod
-    def is_potential_anaphor(self, token: Token) -> bool:
+    def is_potential_anaphor(self, token: Token, context: DocContext) -> bool:
         """Returns *True* if *token* is a potential anaphor, e.g. a pronoun like 'he', 'she'.
         Being an independent noun and being a potential anaphor are mutually exclusive.
         """
 
     @abstractmethod
     def is_potential_anaphoric_pair(
-        self, referred: Mention, referring: Token, directly: bool
+        self, referred: Mention, referring: Token, context: DocContext, directly: bool
     ) -> int:
         """Returns *2* if the rules would permit *referred* and *referring* to co-exist
         within a chain, *0* if they would not and *1* if coexistence is unlikely.
@@ -159,7 +418,9 @@ class RulesAnalyzer(ABC):
         """
 
     @abstractmethod
-    def is_potential_reflexive_pair(self, referred: Mention, referring: Token) -> bool:
+    def is_potential_reflexive_pair(
+        self, referred: Mention, referring: Token, context: DocContext
+    ) -> bool:
         """Returns *True* if *referring* stands in a syntactic relationship to
         *referred* that would require a reflexive anaphor if the two elements belonged to the
         same chain e.g. 'he saw himself', but also 'he saw him' (where the non-reflexive
@@ -197,6 +458,26 @@ class RulesAnalyzer(ABC):
 
     number_morph_key = "Number"
 
+    # The word lists from the *.dat* files for the language, which are also available as
+    # attributes named after the files. Set by *RulesAnalyzerFactory*.
+    lexicon: Lexicon
+
+    # The phrases from *blacklisted_phrases* compiled for matching against documents. Set
+    # by *RulesAnalyzerFactory*.
+    blacklisted_phrase_trie: PhraseTrie
+
+    # Whether the results of the methods in *MEMOIZED_PREDICATE_NAMES* are cached for
+    # each document between *initialize()* and *release_predicate_cache()*.
+    memoize_predicates = True
+
+    # Whether the searches for potentially coreferring nouns use indexes keyed by lemma,
+    # entity type and proper-name text rather than testing every token.
+    index_coreferring_nouns = True
+
+    # The maximum number of characters at the end of a proper-name subtree that are used
+    # as keys for the indexes of potentially coreferring nouns.
+    maximum_propn_key_length = 12
+
     ### COULD BE OVERRIDDEN BY IMPLEMENTING CLASSES, BUT THIS IS NOT EXPECTED
     ### TO BE NECESSARY:
 
@@ -206,37 +487,119 @@ class RulesAnalyzer(ABC):
             for value in values:
                 assert value not in self.reverse_entity_noun_dictionary
                 self.reverse_entity_noun_dictionary[value.lower()] = entity_type
+        # The caches are held in a weak dictionary rather than on the documents' chain
+        # holders because retrieving a Spacy extension attribute would cost more than
+        # many of the memoized methods themselves.
+        self.predicate_caches: WeakKeyDictionary = WeakKeyDictionary()
+        self.predicate_cache_hits: Counter = Counter()
+        self.predicate_cache_misses: Counter = Counter()
+        self.predicate_cache_statistics_lock = Lock()
+        # For the same reason, the flags recording which tokens form part of blacklisted
+        # phrases are held in a weak dictionary keyed by document.
+        self.blacklisted_phrase_flags: WeakKeyDictionary = WeakKeyDictionary()
+        self.tree_indexes: WeakKeyDictionary = WeakKeyDictionary()
+        self.coreferring_noun_indexes: WeakKeyDictionary = WeakKeyDictionary()
+
+    def release_predicate_cache(self, doc: Doc) -> None:
+        """Discards the predicate cache of *doc* together with the other information held
+        for it by this analyzer, adding the hit and miss counts of the cache to the totals
+        for this analyzer."""
+        self.blacklisted_phrase_flags.pop(doc, None)
+        self.tree_indexes.pop(doc, None)
+        self.coreferring_noun_indexes.pop(doc, None)
+        cache = self.predicate_caches.pop(doc, None)
+        if cache is not None:
+            with self.predicate_cache_statistics_lock:
+                self.predicate_cache_hits.update(cache.hits)
+                self.predicate_cache_misses.update(cache.misses)
+
+    def get_predicate_cache_hit_rates(self) -> Dict[str, float]:
+        """Returns the proportion of the calls to each memoized method that were answered
+        from the predicate caches of the documents released so far."""
+        with self.predicate_cache_statistics_lock:
+            return {
+                name: self.predicate_cache_hits[name]
+                / (self.predicate_cache_hits[name] + self.predicate_cache_misses[name])
+                for name in MEMOIZED_PREDICATE_NAMES
+                if self.predicate_cache_hits[name] + self.predicate_cache_misses[name]
+                > 0
+            }
+
+    def get_tree_index(self, doc: Doc) -> TreeIndex:
+        """Returns the *TreeIndex* for *doc*, generating it if it does not yet exist."""
+        tree_index = self.tree_indexes.get(doc)
+        if tree_index is None:
+            tree_index = TreeIndex(doc)
+            self.tree_indexes[doc] = tree_index
+        return tree_index
+
+    def is_ancestor(self, ancestor: Token, token: Token) -> bool:
+        """Returns *True* if *ancestor* is among the ancestors of *token*."""
+        return self.get_tree_index(token.doc).is_ancestor(ancestor.i, token.i)
+
+    def get_ancestors(self, token: Token) -> List[Token]:
+        """Returns the ancestors of *token* in the order of *Token.ancestors*."""
+        doc = token.doc
+        return [doc[index] for index in self.get_tree_index(doc).get_ancestors(token.i)]
 
-    def initialize(self, doc: Doc) -> None:
-        """Adds *ChainHolder* objects to *doc* as well as to each token in *doc*
-        and stores temporary information on the objects that will be required during further
-        processing."""
-
-        doc._.coref_chains = ChainHolder()
-        for token in doc:
-            token._.coref_chains = ChainHolder()
-
-        # Adds to *doc* a list of the start indexes of the sentences it contains.
-        doc._.coref_chains.temp_sent_starts = [s[0].i for s in doc.sents]  # type: ignore[attr-defined]
+    def get_subtree(self, token: Token) -> List[Token]:
+        """Returns the subtree of *token* in the order of *Token.subtree*."""
+        doc = token.doc
+        return [doc[index] for index in self.get_tree_index(doc).get_subtree(token.i)]
 
-        # Adds to each token in *doc* the index of the sentence that contains it.
+    @staticmethod
+    def get_governing_sibling(token: Token, context: DocContext) -> Optional[Token]:
+        """Returns the token of which *token* was recorded as a dependent sibling by
+        *initialize()*, or *None*."""
+        governing_sibling_index = context.governing_siblings[token.i]
+        if governing_sibling_index is None:
+            return None
+        return token.doc[governing_sibling_index]
+
+    def prepare_lookups(self) -> None:
+        """Called by *RulesAnalyzerFactory* once the word lists have been loaded so that
+        implementing subclasses can build any lookup structures derived from them."""
+
+    def initialize(self, doc: Doc) -> DocContext:
+        """Generates a *DocContext* holding the information about *doc* that will be required
+        during further processing and returns it. The context is passed explicitly to
+        the methods that require it and is discarded once the chains have been built."""
+
+        context = DocContext(doc)
+
+        # Indexes the dependency trees of *doc* for ancestor and subtree queries.
+        self.tree_indexes[doc] = TreeIndex(doc)
+
+        # Records which tokens in *doc* form part of blacklisted phrases.
+        self.blacklisted_phrase_flags[
+            doc
+        ] = self.blacklisted_phrase_trie.get_covered_flags(doc)
+
+        # Records the start index of each sentence in *doc* and the index of the sentence
+        # that contains each token.
         for index, sent in enumerate(doc.sents):
-            for token in sent:
-                token._.coref_chains.temp_sent_index = index
+            context.sent_starts.append(sent.start)
+            context.sent_indexes[sent.start : sent.end] = [index] * len(sent)
 
-        # For each token in *doc*, if the token has dependent siblings, adds to the
-        # *CorefChainHolder* instance of the token a list containing them, otherwise an empty list.
-        # Wherever token B is added as a dependent sibling of token A, A is also added to B as a
-        # governing sibling.
+        # For each token in *doc*, records the indexes of its dependent siblings, or an empty
+        # list if it has none. Wherever token B is recorded as a dependent sibling of token A,
+        # A is also recorded as the governing sibling of B.
         for token in doc:
-            siblings_list = self.get_dependent_siblings(token)
-            token._.coref_chains.temp_dependent_siblings = siblings_list
+            siblings_list = self.get_dependent_siblings(token, context)
+            context.dependent_siblings[token.i] = [
+                sibling.i for sibling in siblings_list
+            ]
             for sibling in (
                 sibling for sibling in siblings_list if sibling.i != token.i
             ):
-                if token._.coref_chains.temp_governing_sibling is None:
+                if context.governing_siblings[token.i] is None:
                     # in Polish some nouns can form part of two chains
-                    sibling._.coref_chains.temp_governing_sibling = token
+                    context.governing_siblings[sibling.i] = token.i
+
+        # The information on which the memoized methods depend is now complete.
+        self.predicate_caches.pop(doc, None)
+        if self.memoize_predicates:
+            self.predicate_caches[doc] = PredicateCache()
 
         # Adds an array representing which quotes the word is within. Note that the failure
         # to end a quotation within a document will not cause any problems because the neural
@@ -249,85 +612,83 @@ class RulesAnalyzer(ABC):
                     working_quote_array[index] = 1
                 elif working_quote_array[index] == 1 and token.text == quote_tuple[1]:
                     working_quote_array[index] = 0
-            token._.coref_chains.temp_quote_array = working_quote_array[:]
+            context.quote_arrays[token.i] = working_quote_array[:]
+
+        # Builds an index of the tokens that can form part of potential pairs, i.e. of the
+        # potential anaphors and independent nouns, so that the candidates for each anaphor
+        # can be read off as a slice of the index rather than by rescanning the document.
+        # *candidate_sent_offsets[n]* is the position within *candidate_indexes* of the
+        # first candidate in sentence *n* or in a later sentence.
+        candidate_indexes = []
+        candidate_sent_offsets = []
+        potential_anaphor_flags = [False] * len(doc)
+        for sent in doc.sents:
+            candidate_sent_offsets.append(len(candidate_indexes))
+            for token in sent:
+                is_independent_noun = self.is_independent_noun(token)
+                context.potentially_referring[token.i] = is_independent_noun
+                if self.is_potential_anaphor(token, context):
+                    potential_anaphor_flags[token.i] = True
+                    candidate_indexes.append(token.i)
+                elif is_independent_noun:
+                    candidate_indexes.append(token.i)
+        candidate_sent_offsets.append(len(candidate_indexes))
 
         # Adds to each potential anaphora a list of potential referred mentions.
-        for token in doc:
-            token._.coref_chains.temp_potentially_referring = self.is_independent_noun(
-                token
+        for candidate_position, token_index in enumerate(candidate_indexes):
+            if not potential_anaphor_flags[token_index]:
+                continue
+            token = doc[token_index]
+            potential_referreds = []
+            this_sentence_number = context.sent_indexes[token_index]
+            start_sentence_number = max(
+                this_sentence_number - self.maximum_anaphora_sentence_referential_distance,
+                0,
             )
-            if self.is_potential_anaphor(token):
-                potential_referreds = []
-                this_sentence_start_index = token.sent[0].i
-                this_sentence_number = doc._.coref_chains.temp_sent_starts.index(  # type: ignore[attr-defined]
-                    this_sentence_start_index
-                )
-                start_sentence_number = 0
-                if (
-                    this_sentence_number
-                    > self.maximum_anaphora_sentence_referential_distance
-                ):
-                    start_sentence_number = (
-                        this_sentence_number
-                        - self.maximum_anaphora_sentence_referential_distance
-                    )
-                for preceding_token in (
-                    t
-                    for t in doc[
-                        doc._.coref_chains.temp_sent_starts[  # type: ignore[attr-defined]
-                            start_sentence_number
-                        ] : token.i
-                    ]
-                    if (self.is_potential_anaphor(t) or self.is_independent_noun(t))
+            for preceding_index in candidate_indexes[
+                candidate_sent_offsets[start_sentence_number] : candidate_position
+            ]:
+                preceding_token = doc[preceding_index]
+                simple_referred = Mention(preceding_token, False)
+                if self.language_independent_is_potential_anaphoric_pair(
+                    simple_referred, token, context
+                ) > 0 and not self.is_potential_reflexive_pair(
+                    Mention(token, False), doc[simple_referred.root_index], context
                 ):
-                    simple_referred = Mention(preceding_token, False)
-                    if self.language_independent_is_potential_anaphoric_pair(
-                        simple_referred, token
-                    ) > 0 and not self.is_potential_reflexive_pair(
-                        Mention(token, False), doc[simple_referred.root_index]
+                    potential_referreds.append(simple_referred)
+                if len(context.dependent_siblings[preceding_index]) > 0:
+                    complex_referred = Mention(preceding_token, True, context)
+                    if (
+                        self.language_independent_is_potential_anaphoric_pair(
+                            complex_referred, token, context
+                        )
+                        > 0
                     ):
-                        potential_referreds.append(simple_referred)
-                    if len(preceding_token._.coref_chains.temp_dependent_siblings) > 0:
-                        complex_referred = Mention(preceding_token, True)
-                        if (
-                            self.language_independent_is_potential_anaphoric_pair(
-                                complex_referred, token
-                            )
-                            > 0
-                        ):
-                            potential_referreds.append(complex_referred)
-                if this_sentence_number + 1 == len(doc._.coref_chains.temp_sent_starts):  # type: ignore[attr-defined]
-                    succeeding_tokens = doc[token.i + 1 :]
-                else:
-                    succeeding_tokens = doc[
-                        token.i
-                        + 1 : doc._.coref_chains.temp_sent_starts[  # type: ignore[attr-defined]
-                            this_sentence_number + 1
-                        ]
-                    ]
-                for succeeding_token in (
-                    t
-                    for t in succeeding_tokens
-                    if (self.is_potential_anaphor(t) or self.is_independent_noun(t))
+                        potential_referreds.append(complex_referred)
+            for succeeding_index in candidate_indexes[
+                candidate_position + 1 : candidate_sent_offsets[this_sentence_number + 1]
+            ]:
+                succeeding_token = doc[succeeding_index]
+                simple_referred = Mention(succeeding_token, False)
+                if self.language_independent_is_potential_anaphoric_pair(
+                    simple_referred, token, context
+                ) > 0 and (
+                    self.is_potential_cataphoric_pair(simple_referred, token, context)
+                    or self.is_potential_reflexive_pair(simple_referred, token, context)
                 ):
-                    simple_referred = Mention(succeeding_token, False)
+                    potential_referreds.append(simple_referred)
+                if len(context.dependent_siblings[succeeding_index]) > 0:
+                    complex_referred = Mention(succeeding_token, True, context)
                     if self.language_independent_is_potential_anaphoric_pair(
-                        simple_referred, token
-                    ) > 0 and (
-                        self.is_potential_cataphoric_pair(simple_referred, token)
-                        or self.is_potential_reflexive_pair(simple_referred, token)
+                        complex_referred, token, context
+                    ) > 0 and self.is_potential_cataphoric_pair(
+                        simple_referred, token, context
                     ):
-                        potential_referreds.append(simple_referred)
-                    if len(succeeding_token._.coref_chains.temp_dependent_siblings) > 0:
-                        complex_referred = Mention(succeeding_token, True)
-                        if self.language_independent_is_potential_anaphoric_pair(
-                            complex_referred, token
-                        ) > 0 and self.is_potential_cataphoric_pair(
-                            simple_referred, token
-                        ):
-                            potential_referreds.append(complex_referred)
-                if len(potential_referreds) > 0:
-                    token._.coref_chains.temp_potential_referreds = potential_referreds
+                        potential_referreds.append(complex_referred)
+            if len(potential_referreds) > 0:
+                context.potential_referreds[token_index] = potential_referreds
+
+        return context
 
     def has_non_determiner_non_conjunction_children(self, token: Token) -> bool:
         return any(
@@ -338,7 +699,9 @@ class RulesAnalyzer(ABC):
             and c.dep_ not in self.dependent_sibling_deps
         )
 
-    def is_potentially_introducing_noun(self, token: Token) -> bool:
+    def is_potentially_introducing_noun(
+        self, token: Token, context: DocContext
+    ) -> bool:
         # We are not considering coordination
 
         if self.is_potentially_indefinite(token):
@@ -351,15 +714,17 @@ class RulesAnalyzer(ABC):
         ):
             return True
 
+        governing_sibling = self.get_governing_sibling(token, context)
         return (
-            token._.coref_chains.temp_governing_sibling is not None
+            governing_sibling is not None
             and not self.has_non_determiner_non_conjunction_children(token)
-            and self.is_potentially_introducing_noun(
-                token._.coref_chains.temp_governing_sibling
-            )
+            and self.is_potentially_introducing_noun(governing_sibling, context)
         )
 
-    def is_potentially_referring_back_noun(self, token: Token) -> bool:
+    @memoized_per_document
+    def is_potentially_referring_back_noun(
+        self, token: Token, context: DocContext
+    ) -> bool:
 
         if (
             self.is_potentially_definite(token)
@@ -367,8 +732,9 @@ class RulesAnalyzer(ABC):
         ):
             return True
 
+        governing_sibling = self.get_governing_sibling(token, context)
         return (
-            token._.coref_chains.temp_governing_sibling is not None
+            governing_sibling is not None
             and len(
                 [
                     1
@@ -378,13 +744,11 @@ class RulesAnalyzer(ABC):
                 ]
             )
             == 0
-            and self.is_potentially_referring_back_noun(
-                token._.coref_chains.temp_governing_sibling
-            )
+            and self.is_potentially_referring_back_noun(governing_sibling, context)
         )
 
     def is_potential_coreferring_noun_pair(
-        self, referred: Token, referring: Token
+        self, referred: Token, referring: Token, context: DocContext
     ) -> bool:
         """Returns *True* if *referred* and *referring* are potentially coreferring nouns.
         The method presumes that *is_independent_noun(token)* has
@@ -397,32 +761,24 @@ class RulesAnalyzer(ABC):
         if referred.pos_ not in self.noun_pos or referring.pos_ not in self.noun_pos:
             return False
 
-        if referring in referred._.coref_chains.temp_dependent_siblings:
+        if referring.i in context.dependent_siblings[referred.i]:
             return False
 
+        referring_governing_sibling_index = context.governing_siblings[referring.i]
         if (
-            referring._.coref_chains.temp_governing_sibling is not None
-            and referring._.coref_chains.temp_governing_sibling
-            == referred._.coref_chains.temp_governing_sibling
+            referring_governing_sibling_index is not None
+            and referring_governing_sibling_index
+            == context.governing_siblings[referred.i]
         ):
             return False
 
         # If *referred* and *referring* are names that potentially consist of several words,
         # the text of *referring* must correspond to the end of the text of *referred*
         # e.g. 'Richard Paul Hudson' -> 'Hudson'
-        referred_propn_subtree = self.get_propn_subtree(referred)
-        if referring in referred_propn_subtree:
+        if referring in self.get_propn_subtree(referred):
             return False
-        if len(referred_propn_subtree) > 0:
-            referring_propn_subtree = self.get_propn_subtree(referring)
-            if len(referring_propn_subtree) > 0 and " ".join(
-                t.text for t in referred_propn_subtree
-            ).endswith(" ".join(t.text for t in referring_propn_subtree)):
-                return True
-            if len(referring_propn_subtree) > 0 and " ".join(
-                t.lemma_.lower() for t in referred_propn_subtree
-            ).endswith(" ".join(t.lemma_.lower() for t in referring_propn_subtree)):
-                return True
+        if self.ends_with_propn_subtree(referred, referring):
+            return True
 
         # e.g. 'BMW' -> 'the company'
         if (
@@ -433,11 +789,11 @@ class RulesAnalyzer(ABC):
             and self.is_potentially_definite(referring)
         ):
             return True
-        if not self.is_potentially_referring_back_noun(referring):
+        if not self.is_potentially_referring_back_noun(referring, context):
             return False
         if not self.is_potentially_introducing_noun(
-            referred
-        ) and not self.is_potentially_referring_back_noun(referred):
+            referred, context
+        ) and not self.is_potentially_referring_back_noun(referred, context):
             return False
         if referred.lemma_ == referring.lemma_ and referred.morph.get(
             self.number_morph_key
@@ -445,41 +801,176 @@ class RulesAnalyzer(ABC):
             return True
         return False
 
+    @memoized_per_document
+    def get_propn_texts(self, token: Token) -> Optional[Tuple[str, str]]:
+        """Returns the texts and the lower-case lemmas of the proper-name subtree of *token*,
+        each joined with spaces, or *None* if the proper-name subtree is empty."""
+        propn_subtree = self.get_propn_subtree(token)
+        if len(propn_subtree) == 0:
+            return None
+        return (
+            " ".join(t.text for t in propn_subtree),
+            " ".join(t.lemma_.lower() for t in propn_subtree),
+        )
+
+    def get_propn_end(self, propn_text: str) -> str:
+        """Returns the part of *propn_text* after its last space, shortened to its last
+        *maximum_propn_key_length* characters. Wherever one string returned by
+        *get_propn_texts()* ends with another, the end of the second string is a suffix
+        of the end of the first string."""
+        return propn_text[propn_text.rfind(" ") + 1 :][-self.maximum_propn_key_length :]
+
+    @memoized_per_document
+    def get_propn_end_suffixes(
+        self, token: Token
+    ) -> Optional[Tuple[FrozenSet[str], FrozenSet[str]]]:
+        """Returns the sets of all suffixes of the ends, as returned by *get_propn_end()*,
+        of the two strings returned by *get_propn_texts()*, or *None* if the proper-name
+        subtree of *token* is empty."""
+        propn_texts = self.get_propn_texts(token)
+        if propn_texts is None:
+            return None
+        text_end, lemmas_end = (
+            self.get_propn_end(propn_text) for propn_text in propn_texts
+        )
+        return (
+            frozenset(text_end[index:] for index in range(len(text_end) + 1)),
+            frozenset(lemmas_end[index:] for index in range(len(lemmas_end) + 1)),
+        )
+
+    def ends_with_propn_subtree(self, referred: Token, referring: Token) -> bool:
+        """Returns *True* if *referred* and *referring* both have proper-name subtrees and
+        the text or the lower-case lemmas of the subtree of *referring* form the end of
+        those of the subtree of *referred*, e.g. 'Richard Paul Hudson' -> 'Hudson'."""
+        referred_propn_texts = self.get_propn_texts(referred)
+        if referred_propn_texts is None:
+            return False
+        referring_propn_texts = self.get_propn_texts(referring)
+        if referring_propn_texts is None:
+            return False
+        return referred_propn_texts[0].endswith(
+            referring_propn_texts[0]
+        ) or referred_propn_texts[1].endswith(referring_propn_texts[1])
+
+    def get_coreferring_noun_keys(self, token: Token) -> List[Tuple]:
+        """Returns the keys under which *token* is indexed in a *CoreferringNounIndex*.
+        Wherever *is_potential_coreferring_noun_pair(referred, token)* returns *True*, one
+        of these keys is among those returned by
+        *get_coreferring_noun_query_keys(referred)*."""
+        keys: List[Tuple] = [
+            ("lemma", token.lemma_, tuple(token.morph.get(self.number_morph_key)))
+        ]
+        entity_type = self.reverse_entity_noun_dictionary.get(token.lemma_.lower())
+        if entity_type is not None:
+            keys.append(("entity", entity_type))
+        propn_texts = self.get_propn_texts(token)
+        if propn_texts is not None:
+            keys.append(("propn_text", self.get_propn_end(propn_texts[0])))
+            keys.append(("propn_lemma", self.get_propn_end(propn_texts[1])))
+        return keys
+
+    def get_coreferring_noun_query_keys(self, token: Token) -> List[Tuple]:
+        """Returns the keys under which the nouns that could form potential coreferring
+        noun pairs with *token* as the referred member are indexed in a
+        *CoreferringNounIndex*. Proper-name subtrees match where the text of the
+        referring subtree is a suffix of the text of the referred subtree, so a key is
+        generated for each suffix of the end of the referred text returned by
+        *get_propn_end()*. This keeps the number of keys independent of the length of
+        the subtree; the nouns found with the keys are then tested in full."""
+        keys: List[Tuple] = [
+            ("lemma", token.lemma_, tuple(token.morph.get(self.number_morph_key)))
+        ]
+        if token.pos_ in self.propn_pos:
+            keys.append(("entity", token.ent_type_))
+        propn_suffixes = self.get_propn_end_suffixes(token)
+        if propn_suffixes is not None:
+            keys.extend(("propn_text", suffix) for suffix in propn_suffixes[0])
+            keys.extend(("propn_lemma", suffix) for suffix in propn_suffixes[1])
+        return keys
+
+    def can_index_coreferring_nouns(self) -> bool:
+        """Returns *True* if potential coreferring noun pairs may be looked up using the keys
+        from *get_coreferring_noun_keys()* and *get_coreferring_noun_query_keys()*. This is
+        not the case if *index_coreferring_nouns==False* or if the implementing subclass
+        overrides *is_potential_coreferring_noun_pair()*, as the keys are derived from the
+        rules in this class."""
+        return (
+            self.index_coreferring_nouns
+            and type(self).is_potential_coreferring_noun_pair
+            is RulesAnalyzer.is_potential_coreferring_noun_pair
+        )
+
+    def get_coreferring_noun_index(self, doc: Doc) -> Optional[CoreferringNounIndex]:
+        """Returns the *CoreferringNounIndex* for *doc*, generating it if it does not yet
+        exist, or *None* if *can_index_coreferring_nouns()* returns *False*."""
+        if not self.can_index_coreferring_nouns():
+            return None
+        coreferring_noun_index = self.coreferring_noun_indexes.get(doc)
+        if coreferring_noun_index is None:
+            coreferring_noun_index = CoreferringNounIndex(
+                self, doc, self.get_tree_index(doc)
+            )
+            self.coreferring_noun_indexes[doc] = coreferring_noun_index
+        return coreferring_noun_index
+
+    def has_potential_coreferring_noun_in_subtree(
+        self, referred_tokens: List[Token], root: Token, context: DocContext
+    ) -> bool:
+        """Returns *True* if a token within the subtree of *root* forms a potential
+        coreferring noun pair with any of *referred_tokens* as the referred member."""
+        doc = root.doc
+        coreferring_noun_index = self.get_coreferring_noun_index(doc)
+        if coreferring_noun_index is None:
+            return any(
+                self.is_potential_coreferring_noun_pair(
+                    referred_token, sub_token, context
+                )
+                for sub_token in self.get_subtree(root)
+                for referred_token in referred_tokens
+            )
+        for referred_token in referred_tokens:
+            for index in coreferring_noun_index.get_indexes_in_subtree(
+                self.get_coreferring_noun_query_keys(referred_token), root.i
+            ):
+                if self.is_potential_coreferring_noun_pair(
+                    referred_token, doc[index], context
+                ):
+                    return True
+        return False
+
     def language_independent_is_potential_anaphoric_pair(
-        self, referred: Mention, referring: Token
+        self, referred: Mention, referring: Token, context: DocContext
     ) -> int:
-        """Calls *is_potential_anaphoric_pair*, then sets *referred.temp_is_uncertain* depending
-        on the result and on additional language-independent tests. Because this method
-        is not called from *Annotator*, all language-independent tests are understood to
-        apply to the *directly* situation explained above in *is_potential_anaphoric_pair*."""
+        """Calls *is_potential_anaphoric_pair*, then records in the document context whether
+        the pair is uncertain depending on the result and on additional language-independent
+        tests. Because this method is not called from *Annotator*, all language-independent
+        tests are understood to apply to the *directly* situation explained above in
+        *is_potential_anaphoric_pair*."""
 
         # all common tests are 'directly' tests
         doc = referring.doc
         referred_root = doc[referred.root_index]
-        if referring in referred_root._.coref_chains.temp_dependent_siblings:
+        if referring.i in context.dependent_siblings[referred_root.i]:
             return 0
 
-        result = self.is_potential_anaphoric_pair(referred, referring, True)
+        result = self.is_potential_anaphoric_pair(referred, referring, context, True)
 
         # Checks whether there a token with the same lemma as one of the tokens in *referred* that
         # is closer to *referring* in the structure than *referred* is and the two tokens form
         # a potential coreferring noun pair.
-        if result == 2 and not self.is_potential_anaphor(referred_root):
+        if result == 2 and not self.is_potential_anaphor(referred_root, context):
             doc = referring.doc
+            tree_index = self.get_tree_index(doc)
+            referred_tokens = [doc[i] for i in referred.token_indexes]
             referring_or_governor = referring
             while True:
-                referring_or_governor_subtree = list(referring_or_governor.subtree)
-                if referred_root in referring_or_governor_subtree:
+                if tree_index.is_in_subtree(referred_root.i, referring_or_governor.i):
+                    break
+                if self.has_potential_coreferring_noun_in_subtree(
+                    referred_tokens, referring_or_governor, context
+                ):
+                    result = 1
                     break
-                for referring_sub_token in referring_or_governor_subtree:
-                    for referred_token in (doc[i] for i in referred.token_indexes):
-                        if self.is_potential_coreferring_noun_pair(
-                            referred_token, referring_sub_token
-                        ):
-                            result = 1
-                            break
-                    if result == 1:
-                        break
                 if referring_or_governor == referring_or_governor.head:
                     break
                 referring_or_governor = referring_or_governor.head
@@ -487,19 +978,19 @@ class RulesAnalyzer(ABC):
         # Checks whether the two words have different quote arrays
         if (
             result == 2
-            and referred_root._.coref_chains.temp_quote_array
-            != referring._.coref_chains.temp_quote_array
+            and context.quote_arrays[referred_root.i]
+            != context.quote_arrays[referring.i]
         ):
             result = 1
 
         if result == 1:
-            referred.temp_is_uncertain = True  # type: ignore[attr-defined]
+            context.uncertain_pairs.add((referring.i, referred))
         elif result == 2:
-            referred.temp_is_uncertain = False  # type: ignore[attr-defined]
+            context.uncertain_pairs.discard((referring.i, referred))
         return result
 
     def has_list_member_in_propn_subtree(
-        self, token: Token, word_list: List[str]
+        self, token: Token, word_list: Collection[str]
     ) -> bool:
         """Returns *True* if a member of the proper-name subtree of *Token*
         corresponds to a member of *word_list*.
@@ -509,6 +1000,7 @@ class RulesAnalyzer(ABC):
                 return True
         return False
 
+    @memoized_per_document
     def get_propn_subtree(self, token: Token) -> List[Token]:
         """Returns a list containing each member M of the subtree of *token* that are proper nouns
         and where all the tokens between M and *token* are themselves proper nouns. If *token*
@@ -523,7 +1015,7 @@ class RulesAnalyzer(ABC):
             and token.head.pos_ in self.propn_pos
         ):
             return []
-        subtree = list(token.subtree)
+        subtree = self.get_subtree(token)
         before_start_index = -1
         after_end_index = sys.maxsize
         for subtoken in subtree:
@@ -552,19 +1044,18 @@ class RulesAnalyzer(ABC):
         return value in token.morph.get(key)
 
     @staticmethod
-    def is_involved_in_non_or_conjunction(token: Token) -> bool:
+    def is_involved_in_non_or_conjunction(token: Token, context: DocContext) -> bool:
         """Returns *True* if *token* is part of a conjunction phrase that does not contain an or-
         lemma."""
-        if len(token._.coref_chains.temp_dependent_siblings) > 0:
-            return not token._.coref_chains.temp_has_or_coordination
-        if token._.coref_chains.temp_governing_sibling is not None:
-            return (
-                not token._.coref_chains.temp_governing_sibling._.coref_chains.temp_has_or_coordination
-            )
+        if len(context.dependent_siblings[token.i]) > 0:
+            return not context.has_or_coordination[token.i]
+        governing_sibling_index = context.governing_siblings[token.i]
+        if governing_sibling_index is not None:
+            return not context.has_or_coordination[governing_sibling_index]
         return False
 
     @staticmethod
-    def is_token_in_one_of_phrases(token: Token, phrases: List[str]) -> bool:
+    def is_token_in_one_of_phrases(token: Token, phrases: Iterable[str]) -> bool:
         """Checks whether *token* is part of a phrase that is listed in *phrases*."""
         doc = token.doc
         token_text = token.text.lower()
@@ -581,7 +1072,20 @@ class RulesAnalyzer(ABC):
                 return True
         return False
 
-    def is_potential_cataphoric_pair(self, referred: Mention, referring: Token) -> bool:
+    def is_token_in_blacklisted_phrase(self, token: Token) -> bool:
+        """Checks whether *token* is part of a phrase that is listed in
+        *blacklisted_phrases*. Between *initialize()* and *release_predicate_cache()*,
+        the answer is read from the flags recorded for the document."""
+        flags = self.blacklisted_phrase_flags.get(token.doc)
+        if flags is None:
+            return self.is_token_in_one_of_phrases(
+                token, getattr(self, "blacklisted_phrases", ())
+            )
+        return flags[token.i]
+
+    def is_potential_cataphoric_pair(
+        self, referred: Mention, referring: Token, context: DocContext
+    ) -> bool:
         """Checks whether *referring* can refer cataphorically to *referred*, i.e.
         where *referring* precedes *referred* in the text. That *referring* precedes
         *referred* is not itself checked by the method.
@@ -592,13 +1096,13 @@ class RulesAnalyzer(ABC):
 
         if referred_root.sent != referring.sent:
             return False
-        if self.is_potential_anaphor(referred_root):
+        if self.is_potential_anaphor(referred_root, context):
             return False
 
         referred_verb_ancestors = []
         # Find the ancestors of the referent that are verbs, stopping anywhere where there
         # is conjunction between verbs
-        for ancestor in referred_root.ancestors:
+        for ancestor in self.get_ancestors(referred_root):
             if ancestor.pos_ in self.clause_root_pos:
                 referred_verb_ancestors.append(ancestor)
             if ancestor.dep_ in self.dependent_sibling_deps:
@@ -607,7 +1111,7 @@ class RulesAnalyzer(ABC):
         # Loop through the ancestors of the referring pronoun that are verbs,  that are not
         # within the first list and that have an adverbial clause dependency label
         referring_inclusive_ancestors = [referring]
-        referring_inclusive_ancestors.extend(referring.ancestors)
+        referring_inclusive_ancestors.extend(self.get_ancestors(referring))
         if (
             len(
                 [
@@ -626,15 +1130,9 @@ class RulesAnalyzer(ABC):
         ):
             # If one of the elements of the second list has one of the elements of the first list
             # within its ancestors, we have subordination and cataphora is permissible
-            if (
-                len(
-                    [
-                        t
-                        for t in referring_verb_ancestor.ancestors
-                        if t in referred_verb_ancestors
-                    ]
-                )
-                > 0
+            if any(
+                self.is_ancestor(t, referring_verb_ancestor)
+                for t in referred_verb_ancestors
             ):
                 return True
         return False
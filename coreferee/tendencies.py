@@ -1,17 +1,142 @@
 from typing import List, Tuple, Callable, cast, Union, Dict, Set
-from copy import copy
+from typing import Hashable, Optional, Sequence
+from collections import OrderedDict
 from dataclasses import dataclass
+from threading import Lock
+import os
+import numpy
 from thinc.model import Model
 from thinc.layers import Relu, concatenate, chain, clone
 from thinc.layers import Linear, noop, tuplify
 from thinc.backends import Ops, get_current_ops
-from thinc.types import Floats2d, Ints1d, Ragged
+from thinc.types import Floats1d, Floats2d, Ints1d, Ragged
+from thinc.util import to_numpy
 from spacy.tokens import Token, Doc
 from spacy.language import Language
-from .data_model import FeatureTable, Mention
+from spacy.strings import get_string_id
+from spacy.attrs import HEAD, POS, DEP
+from spacy.parts_of_speech import IDS as POS_IDS
+from .data_model import DocContext, FeatureTable, Mention
+from .errors import OutdatedCorefereeModelError
 from .rules import RulesAnalyzerFactory, RulesAnalyzer
 
 ENSEMBLE_SIZE = 5
+POSITION_MAP_WIDTH = 7
+COMPATIBILITY_MAP_WIDTH = 5
+RUNTIME_FORMAT_VERSION = 2
+PRECISIONS = ("float32", "float16", "int8")
+
+
+class FeatureMapEncoder:
+    """Compiled form of a *FeatureTable* that writes the oneshot feature map for a token
+    directly into a NumPy row. The lookups from annotation values to columns are built once
+    when the encoder is created; tags, entity types and dependency labels are looked up by
+    their Spacy hash IDs so that no strings need to be retrieved from the tokens.
+    """
+
+    def __init__(self, feature_table: FeatureTable, root_dep: str):
+        self.root_dep = get_string_id(root_dep)
+        self.width = 0
+        self.tags = self._compile_block(feature_table.tags, True)
+        self.morphs = self._compile_block(feature_table.morphs, False)
+        self.ent_types = self._compile_block(feature_table.ent_types, True)
+        self.lefthand_deps_to_children = self._compile_block(
+            feature_table.lefthand_deps_to_children, True
+        )
+        self.righthand_deps_to_children = self._compile_block(
+            feature_table.righthand_deps_to_children, True
+        )
+        self.lefthand_deps_to_parents = self._compile_block(
+            feature_table.lefthand_deps_to_parents, True
+        )
+        self.righthand_deps_to_parents = self._compile_block(
+            feature_table.righthand_deps_to_parents, True
+        )
+        self.parent_tags = self._compile_block(feature_table.parent_tags, True)
+        self.parent_morphs = self._compile_block(feature_table.parent_morphs, False)
+        self.parent_lefthand_deps_to_children = self._compile_block(
+            feature_table.parent_lefthand_deps_to_children, True
+        )
+        self.parent_righthand_deps_to_children = self._compile_block(
+            feature_table.parent_righthand_deps_to_children, True
+        )
+        assert self.width == len(feature_table)
+
+        # The columns that are ORed over the siblings within a coordinated mention
+        self.sibling_mask = numpy.zeros(self.width, dtype=numpy.uint8)
+        for block in (
+            self.morphs,
+            self.lefthand_deps_to_children,
+            self.righthand_deps_to_children,
+        ):
+            self.sibling_mask[list(block.values())] = 1
+
+    def _compile_block(self, values: List[str], use_ids: bool) -> Dict[Hashable, int]:
+        """Maps each value in a feature table list to its column within the feature map."""
+        block = {
+            (get_string_id(value) if use_ids else value): self.width + index
+            for index, value in enumerate(values)
+        }
+        self.width += len(values)
+        return block
+
+    def encode(
+        self,
+        token: Token,
+        siblings: Sequence[Token] = (),
+        out: Optional[numpy.ndarray] = None,
+    ) -> numpy.ndarray:
+        """Writes the feature map for *token* into *out*, or into a new row if *out* is *None*.
+        The morphology and children blocks are ORed over *siblings*, which are the further
+        members of a coordinated mention.
+        """
+        if out is None:
+            out = numpy.zeros(self.width, dtype=numpy.uint8)
+        columns = []
+        column = self.tags.get(token.tag)
+        if column is not None:
+            columns.append(column)
+        column = self.ent_types.get(token.ent_type)
+        if column is not None:
+            columns.append(column)
+        for member in (token, *siblings):
+            for morph in member.morph:
+                column = self.morphs.get(morph)
+                if column is not None:
+                    columns.append(column)
+            for child in member.children:
+                if child.i < member.i:
+                    column = self.lefthand_deps_to_children.get(child.dep)
+                else:
+                    column = self.righthand_deps_to_children.get(child.dep)
+                if column is not None:
+                    columns.append(column)
+        if token.dep != self.root_dep:
+            head = token.head
+            # a token that is its own head without the root dependency has neither
+            column = None
+            if token.i < head.i:
+                column = self.lefthand_deps_to_parents.get(token.dep)
+            elif token.i > head.i:
+                column = self.righthand_deps_to_parents.get(token.dep)
+            if column is not None:
+                columns.append(column)
+            column = self.parent_tags.get(head.tag)
+            if column is not None:
+                columns.append(column)
+            for morph in head.morph:
+                column = self.parent_morphs.get(morph)
+                if column is not None:
+                    columns.append(column)
+            for child in head.children:
+                if child.i < head.i:
+                    column = self.parent_lefthand_deps_to_children.get(child.dep)
+                else:
+                    column = self.parent_righthand_deps_to_children.get(child.dep)
+                if column is not None:
+                    columns.append(column)
+        out[columns] = 1
+        return out
 
 
 class TendenciesAnalyzer:
@@ -31,255 +156,290 @@ class TendenciesAnalyzer:
             self.vector_length = len(vectors_nlp(rules_analyzer.random_word)[0].vector)
         assert self.vector_length > 0
         self.feature_table = feature_table
+        self.feature_map_encoder = FeatureMapEncoder(
+            feature_table, rules_analyzer.root_dep
+        )
+        self.verb_pos_ids = [
+            pos_id for pos, pos_id in POS_IDS.items() if pos in rules_analyzer.verb_pos
+        ]
+        self.root_dep_id = get_string_id(rules_analyzer.root_dep)
 
-    def get_feature_map(
-        self, token_or_mention: Union[Token, Mention], doc: Doc
-    ) -> List[Union[int, float]]:
-        """Returns a binary list representing the features from *self.feature_table* that
-        the token or any of the tokens within the mention has. The list is also
-        added as *token._.coref_chains.temp_feature_map* or *mention.temp_feature_map*.
+    def compute_document_maps(self, doc: Doc, context: DocContext) -> None:
+        """Computes the feature maps and position maps of all referrers in *doc* and of all
+        tokens within their potential referreds in a single pass. The maps are stored as the
+        rows of the *feature_matrix* and *position_matrix* of the document context;
+        its *map_rows* holds the row for each token index, or -1 for tokens without maps.
         """
-
-        def convert_to_oneshot(reference_list, actual_list):
-            """
-            Returns a list of the same length as 'reference_list' where positions corresponding to
-            entries in 'reference_list' that are also contained within 'actual_list' have the
-            value '1' and other positions have the value '0'.
-            """
-            return [
-                1 if reference in actual_list else 0 for reference in reference_list
-            ]
-
-        def get_oneshot_for_token_and_siblings(prop, func):
-            """Executes a logical AND between the values for the respective siblings."""
-            oneshot = convert_to_oneshot(prop, func(token))
-            for sibling in siblings:
-                sibling_oneshot = convert_to_oneshot(prop, func(sibling))
-                oneshot = [
-                    1 if (entry == 1 or sibling_oneshot[index] == 1) else 0
-                    for (index, entry) in enumerate(oneshot)
-                ]
-            return oneshot
-
-        siblings = []
-        if isinstance(token_or_mention, Token):
-            if hasattr(token_or_mention._.coref_chains, "temp_feature_map"):
-                return token_or_mention._.coref_chains.temp_feature_map
-            token = token_or_mention
-        else:
-            if hasattr(token_or_mention, "temp_feature_map"):
-                return token_or_mention.temp_feature_map  # type:ignore[attr-defined]
-            token = doc[token_or_mention.root_index]
-            if len(token_or_mention.token_indexes) > 1:
-                siblings = [doc[i] for i in token_or_mention.token_indexes[1:]]
-
-        feature_map = convert_to_oneshot(self.feature_table.tags, [token.tag_])
-
-        feature_map.extend(
-            get_oneshot_for_token_and_siblings(
-                self.feature_table.morphs, lambda token: token.morph
-            )
+        map_rows = numpy.full(len(doc), -1, dtype=numpy.int64)
+        for token_index, potential_referreds in enumerate(context.potential_referreds):
+            if potential_referreds is None:
+                continue
+            map_rows[token_index] = 0
+            for mention in potential_referreds:
+                map_rows[mention.token_indexes] = 0
+        token_indexes = numpy.flatnonzero(map_rows == 0)
+        map_rows[token_indexes] = numpy.arange(len(token_indexes))
+        feature_matrix = numpy.zeros(
+            (len(token_indexes), self.feature_map_encoder.width), dtype=numpy.uint8
         )
-
-        feature_map.extend(
-            convert_to_oneshot(self.feature_table.ent_types, [token.ent_type_])
+        position_matrix = numpy.zeros(
+            (len(token_indexes), POSITION_MAP_WIDTH), dtype=numpy.int32
         )
-
-        feature_map.extend(
-            get_oneshot_for_token_and_siblings(
-                self.feature_table.lefthand_deps_to_children,
-                lambda token: [
-                    child.dep_ for child in token.children if child.i < token.i
-                ],
-            )
+        for row, token_index in enumerate(token_indexes.tolist()):
+            token = doc[token_index]
+            self.feature_map_encoder.encode(token, out=feature_matrix[row])
+            position_matrix[row] = self.get_token_position_map(token, context)
+        context.map_rows = map_rows
+        context.feature_matrix = feature_matrix
+        context.position_matrix = position_matrix
+
+    def compute_head_similarities(
+        self, doc: Doc, referreds: List[Mention], referring_indexes: List[int]
+    ) -> Optional[List[float]]:
+        """Calculates the cosine similarity within the compatibility map for each pair of a
+        mention in *referreds* and the token at the corresponding position in
+        *referring_indexes* at once and returns the similarities in the same order. The
+        vectors are normalized once per lexeme or token and the similarities are obtained
+        as a single row-wise dot product. Returns *None* if *doc* has a custom similarity
+        function, which is then left to *get_compatibility_map()*.
+        """
+        if "similarity" in doc.user_token_hooks:
+            return None
+        if len(referreds) == 0:
+            return []
+        pair_token_indexes = numpy.array(
+            [[mention.root_index for mention in referreds], referring_indexes]
         )
-
-        feature_map.extend(
-            get_oneshot_for_token_and_siblings(
-                self.feature_table.righthand_deps_to_children,
-                lambda token: [
-                    child.dep_ for child in token.children if child.i > token.i
-                ],
-            )
+        has_head = doc.to_array(DEP) != self.root_dep_id
+        similarities = numpy.full(len(referreds), -1.0, dtype=numpy.float32)
+        pairs_with_heads = numpy.flatnonzero(has_head[pair_token_indexes].all(axis=0))
+
+        # The vectors of the heads' lemmas from the vocabulary of the vectors model
+        token_indexes = numpy.unique(pair_token_indexes[:, pairs_with_heads])
+        lexemes = [
+            self.vectors_nlp.vocab[doc[token_index].head.lemma_]
+            for token_index in token_indexes.tolist()
+        ]
+        lexeme_rows = numpy.full(len(doc), -1)
+        lexeme_rows[token_indexes] = numpy.arange(len(token_indexes))
+        lexeme_has_vector = numpy.array(
+            [lexeme.has_vector for lexeme in lexemes], dtype=bool
         )
-
-        if token.dep_ != self.rules_analyzer.root_dep and token.i < token.head.i:
-            feature_map.extend(
-                convert_to_oneshot(
-                    self.feature_table.lefthand_deps_to_parents, [token.dep_]
-                )
-            )
-        else:
-            feature_map.extend(
-                convert_to_oneshot(self.feature_table.lefthand_deps_to_parents, [])
+        head_pairs = pairs_with_heads[
+            lexeme_has_vector[lexeme_rows[pair_token_indexes[:, pairs_with_heads]]].all(
+                axis=0
             )
-
-        if token.dep_ != self.rules_analyzer.root_dep and token.i > token.head.i:
-            feature_map.extend(
-                convert_to_oneshot(
-                    self.feature_table.righthand_deps_to_parents, [token.dep_]
-                )
-            )
-        else:
-            feature_map.extend(
-                convert_to_oneshot(self.feature_table.righthand_deps_to_parents, [])
-            )
-
-        if token.dep_ != self.rules_analyzer.root_dep:
-            feature_map.extend(
-                convert_to_oneshot(self.feature_table.parent_tags, [token.head.tag_])
+        ]
+        if len(head_pairs) > 0:
+            similarities[head_pairs] = self._get_similarities(
+                [lexeme.vector for lexeme in lexemes],
+                [lexeme.orth for lexeme in lexemes],
+                lexeme_rows[pair_token_indexes[:, head_pairs]],
             )
-        else:
-            feature_map.extend(convert_to_oneshot(self.feature_table.parent_tags, []))
 
-        if token.dep_ != self.rules_analyzer.root_dep:
-            feature_map.extend(
-                convert_to_oneshot(self.feature_table.parent_morphs, token.head.morph)
+        # Otherwise the vectors of the tokens themselves, as with _sm models
+        token_pairs = numpy.setdiff1d(pairs_with_heads, head_pairs)
+        token_indexes = numpy.unique(pair_token_indexes[:, token_pairs])
+        tokens = [doc[token_index] for token_index in token_indexes.tolist()]
+        token_rows = numpy.full(len(doc), -1)
+        token_rows[token_indexes] = numpy.arange(len(token_indexes))
+        token_has_vector = numpy.array(
+            [token.has_vector for token in tokens], dtype=bool
+        )
+        token_pairs = token_pairs[
+            token_has_vector[token_rows[pair_token_indexes[:, token_pairs]]].all(axis=0)
+        ]
+        if len(token_pairs) > 0:
+            similarities[token_pairs] = self._get_similarities(
+                [token.vector for token in tokens],
+                [token.orth for token in tokens],
+                token_rows[pair_token_indexes[:, token_pairs]],
             )
-        else:
-            feature_map.extend(convert_to_oneshot(self.feature_table.parent_morphs, []))
 
-        if token.dep_ != self.rules_analyzer.root_dep:
-            feature_map.extend(
-                convert_to_oneshot(
-                    self.feature_table.parent_lefthand_deps_to_children,
-                    [
-                        child.dep_
-                        for child in token.head.children
-                        if child.i < token.head.i
-                    ],
-                )
-            )
-        else:
-            feature_map.extend(
-                convert_to_oneshot(
-                    self.feature_table.parent_lefthand_deps_to_children, []
-                )
-            )
+        return similarities.tolist()
 
-        if token.dep_ != self.rules_analyzer.root_dep:
-            feature_map.extend(
-                convert_to_oneshot(
-                    self.feature_table.parent_righthand_deps_to_children,
-                    [
-                        child.dep_
-                        for child in token.head.children
-                        if child.i > token.head.i
-                    ],
-                )
-            )
-        else:
-            feature_map.extend(
-                convert_to_oneshot(
-                    self.feature_table.parent_righthand_deps_to_children, []
-                )
-            )
+    @staticmethod
+    def _get_similarities(
+        vectors: List[Floats1d], orths: List[int], rows: numpy.ndarray
+    ) -> numpy.ndarray:
+        """Returns the cosine similarities between the pairs of *vectors* whose indexes are
+        the columns of *rows*, following the conventions of the Spacy *similarity()*
+        methods: objects with the same orth have a similarity of 1 and objects without a
+        vector norm a similarity of 0.
+        """
+        matrix = numpy.vstack([to_numpy(vector) for vector in vectors]).astype(
+            numpy.float32
+        )
+        norms = numpy.sqrt((matrix**2).sum(axis=1))
+        has_norm = norms > 0
+        matrix[has_norm] /= norms[has_norm, None]
+        similarities = numpy.einsum("ij,ij->i", matrix[rows[0]], matrix[rows[1]])
+        similarities[~(has_norm[rows[0]] & has_norm[rows[1]])] = 0.0
+        orths_array = numpy.array(orths, dtype=numpy.uint64)
+        similarities[orths_array[rows[0]] == orths_array[rows[1]]] = 1.0
+        return similarities
+
+    @staticmethod
+    def _get_map_rows(
+        context: DocContext, token_indexes: List[int]
+    ) -> Optional[numpy.ndarray]:
+        """Returns the rows within the document maps for *token_indexes*, or *None* if
+        any of the tokens has no row."""
+        if context.map_rows is None:
+            return None
+        map_rows = context.map_rows[token_indexes]
+        if (map_rows < 0).any():
+            return None
+        return map_rows
 
+    def get_feature_map(
+        self, token_or_mention: Union[Token, Mention], doc: Doc, context: DocContext
+    ) -> numpy.ndarray:
+        """Returns a binary array representing the features from *self.feature_table* that
+        the token or any of the tokens within the mention has. The array is read from the
+        document maps if these have been computed for the tokens concerned.
+        """
         if isinstance(token_or_mention, Token):
-            token_or_mention._.coref_chains.temp_feature_map = feature_map
+            token_indexes = [token_or_mention.i]
         else:
-            token_or_mention.temp_feature_map = feature_map  # type:ignore[attr-defined]
-        return feature_map
+            token_indexes = token_or_mention.token_indexes
+        map_rows = self._get_map_rows(context, token_indexes)
+        if map_rows is None:
+            return self.feature_map_encoder.encode(
+                doc[token_indexes[0]], [doc[i] for i in token_indexes[1:]]
+            )
+        feature_matrix = cast(numpy.ndarray, context.feature_matrix)
+        if len(map_rows) == 1:
+            return feature_matrix[map_rows[0]]
+        # The morphology and children blocks are ORed over the sibling rows
+        return feature_matrix[map_rows[0]] | numpy.bitwise_or.reduce(
+            feature_matrix[map_rows[1:]] & self.feature_map_encoder.sibling_mask
+        )
 
     def get_position_map(
-        self, token_or_mention: Union[Token, Mention], doc: Doc
-    ) -> List[Union[int, float]]:
-        """Returns a list of numbers representing the position, depth, etc. of the token or mention
-        within its sentence. The list is also added as *token._.coref_chains.temp_position_map*
-        or *mention.temp_position_map*.
+        self, token_or_mention: Union[Token, Mention], doc: Doc, context: DocContext
+    ) -> numpy.ndarray:
+        """Returns an array of numbers representing the position, depth, etc. of the token or
+        mention within its sentence. The array is read from the document maps if these have
+        been computed for the token or for the root of the mention.
         """
-
         if isinstance(token_or_mention, Token):
-            if hasattr(token_or_mention._.coref_chains, "temp_position_map"):
-                return token_or_mention._.coref_chains.temp_position_map
             token = token_or_mention
         else:
-            if hasattr(token_or_mention, "temp_position_map"):
-                return token_or_mention.temp_position_map  # type:ignore[attr-defined]
             token = doc[token_or_mention.root_index]
+        map_rows = self._get_map_rows(context, [token.i])
+        if map_rows is None:
+            position_map = numpy.array(
+                self.get_token_position_map(token, context), dtype=numpy.int32
+            )
+        else:
+            position_map = cast(numpy.ndarray, context.position_matrix)[map_rows[0]]
 
-        # This token is the nth word within its sentence
-        position_map = [
-            token.i
-            - token.doc._.coref_chains.temp_sent_starts[
-                token._.coref_chains.temp_sent_index
-            ]
-        ]
+        # A mention covering a whole coordination phrase has its number of dependent
+        # siblings in place of the -1 recorded for its root token
+        if (
+            isinstance(token_or_mention, Mention)
+            and len(token_or_mention.token_indexes) > 1
+            and context.governing_siblings[token.i] is None
+        ):
+            position_map = position_map.copy()
+            position_map[5] = len(context.dependent_siblings[token.i])
+        return position_map
 
-        # This token is at depth n from the root
-        position_map.append(len(list(token.ancestors)))
+    def get_tree_statistics(self, doc: Doc, context: DocContext) -> numpy.ndarray:
+        """Returns an array with a row for each token in *doc* holding the depth of the token
+        from the root of its sentence, the number of verbs among its ancestors, the number of
+        preceding tokens at the same depth within its sentence and the position of the token
+        among the children of its head, or -1 for roots. The statistics are calculated in a
+        single pass over the document and are stored in the document context.
+        """
+        if context.tree_statistics is not None:
+            return context.tree_statistics
+        heads = (
+            doc.to_array(HEAD).astype(numpy.int64) + numpy.arange(len(doc))
+        ).tolist()
+        is_verb = numpy.isin(doc.to_array(POS), self.verb_pos_ids).tolist()
+        is_root_dep = (doc.to_array(DEP) == self.root_dep_id).tolist()
+        depths = [-1] * len(doc)
+        verb_ancestor_counts = [0] * len(doc)
+        child_ranks = [-1] * len(doc)
+        children_counts = [0] * len(doc)
+        for index in range(len(doc)):
+            # Climb until a token whose depth is already known, then set the depths on the
+            # way back down so that each token is only visited once
+            path = []
+            working_index = index
+            while depths[working_index] < 0 and heads[working_index] != working_index:
+                path.append(working_index)
+                working_index = heads[working_index]
+            if depths[working_index] < 0:
+                depths[working_index] = 0
+            for path_index in reversed(path):
+                head_index = heads[path_index]
+                depths[path_index] = depths[head_index] + 1
+                verb_ancestor_counts[path_index] = verb_ancestor_counts[head_index] + (
+                    1 if is_verb[head_index] else 0
+                )
+            head_index = heads[index]
+            if head_index != index:
+                if not is_root_dep[index]:
+                    child_ranks[index] = children_counts[head_index]
+                children_counts[head_index] += 1
+        ranks_at_depth = [0] * len(doc)
+        for sent in doc.sents:
+            depth_counts: Dict[int, int] = {}
+            for index in range(sent.start, sent.end):
+                ranks_at_depth[index] = depth_counts.get(depths[index], 0)
+                depth_counts[depths[index]] = ranks_at_depth[index] + 1
+        tree_statistics = numpy.array(
+            [depths, verb_ancestor_counts, ranks_at_depth, child_ranks],
+            dtype=numpy.int32,
+        ).T
+        context.tree_statistics = tree_statistics
+        return tree_statistics
+
+    def get_token_position_map(self, token: Token, context: DocContext) -> List[int]:
+        """Returns a list of numbers representing the position, depth, etc. of *token*
+        within its sentence.
+        """
 
-        # This token is n verbs from the root
-        position_map.append(
-            len(
-                [
-                    ancestor
-                    for ancestor in token.ancestors
-                    if ancestor.pos_ in self.rules_analyzer.verb_pos
-                ]
-            )
-        )
+        # This token is the nth word within its sentence
+        position_map = [token.i - context.sent_starts[context.sent_indexes[token.i]]]
 
-        # This token is the nth token at its depth within its sentence
-        position_map.append(
-            len(
-                [
-                    1
-                    for token_in_sentence in token.sent
-                    if token_in_sentence.i < token.i
-                    and len(list(token_in_sentence.ancestors))
-                    == len(list(token.ancestors))
-                ]
-            )
+        # This token is at depth n from the root; this token is n verbs from the root;
+        # this token is the nth token at its depth within its sentence; this token is
+        # the nth child of its parents
+        position_map.extend(
+            self.get_tree_statistics(token.doc, context)[token.i].tolist()
         )
 
-        # This token is the nth child of its parents
-        if token.dep_ != self.rules_analyzer.root_dep:
-            position_map.append(
-                sorted([child.i for child in token.head.children]).index(token.i)
-            )
-        else:
-            position_map.append(-1)
-
-        # Number of dependent siblings, or -1 if the method was passed a mention that is within
-        # a coordination phrase but only covers one token within that phrase
-        if token._.coref_chains.temp_governing_sibling is not None or (
-            len(token._.coref_chains.temp_dependent_siblings) > 0
-            and not (
-                isinstance(token_or_mention, Mention)
-                and len(token_or_mention.token_indexes) > 1
-            )
-        ):
+        # Number of dependent siblings, or -1 if the token is within a coordination phrase
+        has_governing_sibling = context.governing_siblings[token.i] is not None
+        if has_governing_sibling or len(context.dependent_siblings[token.i]) > 0:
             position_map.append(-1)
         else:
-            position_map.append(len(token._.coref_chains.temp_dependent_siblings))
+            position_map.append(0)
 
-        position_map.append(
-            1 if token._.coref_chains.temp_governing_sibling is not None else 0
-        )
+        position_map.append(1 if has_governing_sibling else 0)
 
-        if isinstance(token_or_mention, Token):
-            token_or_mention._.coref_chains.temp_position_map = position_map
-        else:
-            token_or_mention.temp_position_map = (  # type:ignore[attr-defined]
-                position_map
-            )
         return position_map
 
     def get_compatibility_map(
-        self, referred: Mention, referring: Token
+        self,
+        referred: Mention,
+        referring: Token,
+        context: DocContext,
+        head_similarity: Optional[float] = None,
     ) -> List[Union[int, float]]:
         """Returns a list of numbers representing the interaction between *referred* and
         *referring*. It will already have been established that coreference between the two is
         possible; the compatibility map assists the neural network in ascertaining how likely
-        it is. The list is also added as *referred.temp_compatibility_map*.
+        it is. *head_similarity* is the similarity of the two objects' heads where it has
+        already been calculated by *compute_head_similarities()*.
         """
         doc = referring.doc
         referred_root = doc[referred.root_index]
 
-        if hasattr(referred, "temp_compatibility_map"):
-            return referred.temp_compatibility_map  # type:ignore[attr-defined]
-
         # Referential distance in words (may be negative in the case of cataphora)
         compatibility_map = cast(
             List[Union[int, float]], [referring.i - referred_root.i]
@@ -287,35 +447,39 @@ class TendenciesAnalyzer:
 
         # Referential distance in sentences
         compatibility_map.append(
-            referring._.coref_chains.temp_sent_index
-            - referred_root._.coref_chains.temp_sent_index
+            context.sent_indexes[referring.i] - context.sent_indexes[referred_root.i]
         )
 
         # Whether the referred mention, its lefthand sibling or its head is among the ancestors
         # of the referring element
+        tree_index = self.rules_analyzer.get_tree_index(doc)
+        referred_governing_sibling = self.rules_analyzer.get_governing_sibling(
+            referred_root, context
+        )
         compatibility_map.append(
             1
-            if referred_root in referring.ancestors
+            if tree_index.is_ancestor(referred_root.i, referring.i)
             or (
                 referred_root.dep_ != self.rules_analyzer.root_dep
-                and referred_root.head in referring.ancestors
+                and tree_index.is_ancestor(referred_root.head.i, referring.i)
             )
-            or referred_root._.coref_chains.temp_governing_sibling is not None
+            or referred_governing_sibling is not None
             and (
-                referred_root._.coref_chains.temp_governing_sibling
-                in referring.ancestors
+                tree_index.is_ancestor(referred_governing_sibling.i, referring.i)
                 or (
-                    referred_root._.coref_chains.temp_governing_sibling.dep_
-                    != self.rules_analyzer.root_dep
-                    and referred_root._.coref_chains.temp_governing_sibling.head
-                    in referring.ancestors
+                    referred_governing_sibling.dep_ != self.rules_analyzer.root_dep
+                    and tree_index.is_ancestor(
+                        referred_governing_sibling.head.i, referring.i
+                    )
                 )
             )
             else 0
         )
 
         # The cosine similarity of the two objects' heads' vectors
-        if (
+        if head_similarity is not None:
+            compatibility_map.append(head_similarity)
+        elif (
             referred_root.dep_ != self.rules_analyzer.root_dep
             and referring.dep_ != self.rules_analyzer.root_dep
         ):
@@ -333,40 +497,66 @@ class TendenciesAnalyzer:
             compatibility_map.append(-1)
 
         # The number of common true values in the feature maps of *referred.root* and *referring*.
-        referred_feature_map = self.get_feature_map(referred, referring.doc)
+        referred_feature_map = self.get_feature_map(referred, referring.doc, context)
         referring_feature_map = self.get_feature_map(
-            Mention(referring, False), referring.doc
+            Mention(referring, False), referring.doc, context
         )
         compatibility_map.append(
-            [
-                1 if (entry == 1 and referring_feature_map[index] == 1) else 0
-                for (index, entry) in enumerate(referred_feature_map)
-            ].count(1)
+            int(numpy.count_nonzero(referred_feature_map & referring_feature_map))
         )
 
-        referred.temp_compatibility_map = compatibility_map  # type:ignore[attr-defined]
         return compatibility_map
 
-    def score(self, doc: Doc, thinc_ensemble: Model) -> None:
+    def score(
+        self,
+        doc: Doc,
+        context: DocContext,
+        thinc_ensemble: Union[Model, "FusedEnsemble"],
+    ) -> None:
         """Scores all possible anaphoric pairs in *doc*. The scores are never referenced
         outside this method because the possible pairs on each anaphor are sorted within
         this method with the more likely interpretations at the front of the list.
+        *thinc_ensemble* is either the Thinc model or a *FusedEnsemble* generated from it.
         """
-        document_pair_info = DocumentPairInfo.from_doc(doc, self, ENSEMBLE_SIZE)
-        if len(document_pair_info.candidates.dataXd) > 0:
-            scores = thinc_ensemble.predict([document_pair_info])
-            referring_scores_iterator = iter(scores)
-            for referring in (
-                t for t in doc if hasattr(t._.coref_chains, "temp_potential_referreds")
-            ):
+        self.score_batch([doc], [context], thinc_ensemble)
+
+    def score_batch(
+        self,
+        docs: List[Doc],
+        contexts: List[DocContext],
+        thinc_ensemble: Union[Model, "FusedEnsemble"],
+    ) -> None:
+        """Scores all possible anaphoric pairs in each of *docs*, whose contexts are
+        *contexts*, using a single call to the neural ensemble, then sorts the possible
+        pairs on each anaphor as in *score()*.
+        """
+        document_pair_infos = []
+        scored_contexts = []
+        for doc, context in zip(docs, contexts):
+            document_pair_info = DocumentPairInfo.from_doc(
+                doc, context, self, ENSEMBLE_SIZE
+            )
+            if len(document_pair_info.candidates.dataXd) > 0:
+                document_pair_infos.append(document_pair_info)
+                scored_contexts.append(context)
+        if len(document_pair_infos) == 0:
+            return
+        scores = thinc_ensemble.predict(document_pair_infos)
+        referring_scores_iterator = iter(scores)
+        for document_pair_info, context in zip(document_pair_infos, scored_contexts):
+            for referring_index in document_pair_info.referrers.tolist():
+                potential_referreds = cast(
+                    List[Mention], context.potential_referreds[referring_index]
+                )
                 referring_scores = next(referring_scores_iterator)
                 mention_scores_iterator = iter(referring_scores)
-                for potential_referred in (
-                    p for p in referring._.coref_chains.temp_potential_referreds
-                ):
+                sort_keys: Dict[Mention, Tuple[bool, float]] = {}
+                for potential_referred in potential_referreds:
                     ensemble_scores = next(mention_scores_iterator)
-                    potential_referred.temp_score = sum(ensemble_scores) / len(
-                        ensemble_scores
+                    sort_keys[potential_referred] = (
+                        (referring_index, potential_referred)
+                        in context.uncertain_pairs,
+                        0 - sum(ensemble_scores) / len(ensemble_scores),
                     )
                 is_last = False
                 try:
@@ -376,26 +566,20 @@ class TendenciesAnalyzer:
                 assert (
                     is_last
                 ), "Mismatch between potential referreds and neural network output."
-            is_last = False
-            try:
-                next(referring_scores_iterator)
-            except StopIteration:
-                is_last = True
-            assert (
-                is_last
-            ), "Mismatch between referring anaphors and neural network output."
-            for referring in (
-                t for t in doc if hasattr(t._.coref_chains, "temp_potential_referreds")
-            ):
-                referring._.coref_chains.temp_potential_referreds.sort(
-                    key=lambda potential_referred: (
-                        potential_referred.temp_is_uncertain,
-                        0 - potential_referred.temp_score,
-                    )
-                )
+                potential_referreds.sort(key=sort_keys.__getitem__)
+        is_last = False
+        try:
+            next(referring_scores_iterator)
+        except StopIteration:
+            is_last = True
+        assert is_last, "Mismatch between referring anaphors and neural network output."
 
 
-def generate_feature_table(docs: list, nlp: Language) -> FeatureTable:
+def generate_feature_table(
+    docs: list, nlp: Language, contexts: Optional[List[DocContext]] = None
+) -> FeatureTable:
+    """*contexts* are the contexts of *docs* if these have already been initialized;
+    otherwise each document is initialized here."""
 
     rules_analyzer = RulesAnalyzerFactory().get_rules_analyzer(nlp)
     tags: Set[str] = set()
@@ -410,12 +594,16 @@ def generate_feature_table(docs: list, nlp: Language) -> FeatureTable:
     parent_lefthand_deps_to_children: Set[str] = set()
     parent_righthand_deps_to_children: Set[str] = set()
 
-    for doc in docs:
+    for index, doc in enumerate(docs):
+        if contexts is None:
+            context = rules_analyzer.initialize(doc)
+        else:
+            context = contexts[index]
         for token in (
             token
             for token in doc
             if rules_analyzer.is_independent_noun(token)
-            or rules_analyzer.is_potential_anaphor(token)
+            or rules_analyzer.is_potential_anaphor(token, context)
         ):
             tags.add(token.tag_)
             morphs.update(token.morph)
@@ -499,10 +687,20 @@ class DocumentPairInfo:
     static_infos: Floats2d
     training_outputs: List[Floats2d]
 
+    # The vectors and head vectors of the tokens within the referrers and antecedents
+    # stored contiguously, one row per token. Vector_rows maps each token index within
+    # the document to its row, or to -1 for tokens without vectors. Vector_lemmas holds
+    # the lemma each vector was looked up with, or *None* where it depends on context.
+    vectors: Floats2d
+    head_vectors: Floats2d
+    vector_rows: Ints1d
+    vector_lemmas: List[Optional[str]]
+
     @classmethod
     def from_doc(
         cls,
         doc: Doc,
+        context: DocContext,
         tendencies_analyzer: TendenciesAnalyzer,
         ensemble_size: int,
         ops=None,
@@ -511,25 +709,32 @@ class DocumentPairInfo:
         if ops is None:
             ops = get_current_ops()
 
+        tendencies_analyzer.compute_document_maps(doc, context)
         referrers_list: List[int] = []
         antecedents_list: List[List[int]] = []
+        antecedent_mentions: List[Mention] = []
         candidates_list: List[List[int]] = []
-        static_infos_list: List[List[Union[float, int]]] = []
+        pair_referrers: List[int] = []
+        pair_antecedents: List[int] = []
+        pair_mentions: List[Mention] = []
         training_outputs_list: List[List[float]] = []
         candidates2antecedents: Dict[Tuple[int, ...], int] = {}
-        for token in doc:
-            if not hasattr(token._.coref_chains, "temp_potential_referreds"):
+        vector_token_indexes: Set[int] = set()
+        for token_index, potential_referreds in enumerate(context.potential_referreds):
+            if potential_referreds is None:
                 continue
-            _set_vectors(tendencies_analyzer.vectors_nlp, ops, token)
-            temp_potential_referreds = cast(
-                List[Mention], token._.coref_chains.temp_potential_referreds
-            )
-            if is_train and Mention.number_of_training_mentions_marked_true(token) == 0:
+            token = doc[token_index]
+            _set_vectors(tendencies_analyzer.vectors_nlp, ops, token, context)
+            vector_token_indexes.add(token.i)
+            if (
+                is_train
+                and Mention.number_of_training_mentions_marked_true(token, context) == 0
+            ):
                 continue
             referrers_list.append(token.i)
             candidates_list.append([])
-            temp_potential_referreds.sort(key=lambda m: m.root_index)
-            for mention in temp_potential_referreds:
+            potential_referreds.sort(key=lambda m: m.root_index)
+            for mention in potential_referreds:
                 if is_train and hasattr(mention, "spanned_in_training"):
                     continue
                 # spanned in training - X->Y and Y->Z; we do want to present X->Z
@@ -543,29 +748,87 @@ class DocumentPairInfo:
                     candidates2antecedents[token_indexes] = len(antecedents_list)
                     candidates_list[-1].append(len(antecedents_list))
                     antecedents_list.append(mention.token_indexes)
+                    antecedent_mentions.append(mention)
                     for token_index in token_indexes:
                         _set_vectors(
-                            tendencies_analyzer.vectors_nlp, ops, token.doc[token_index]
+                            tendencies_analyzer.vectors_nlp,
+                            ops,
+                            doc[token_index],
+                            context,
                         )
-                static_info = copy(tendencies_analyzer.get_feature_map(token, doc))
-                static_info.extend(tendencies_analyzer.get_position_map(token, doc))
-                static_info.extend(tendencies_analyzer.get_feature_map(mention, doc))
-                static_info.extend(tendencies_analyzer.get_position_map(mention, doc))
-                static_info.extend(
-                    tendencies_analyzer.get_compatibility_map(mention, token)
-                )
-                static_infos_list.append(static_info)
+                    vector_token_indexes.update(token_indexes)
+                pair_referrers.append(token.i)
+                pair_antecedents.append(candidates_list[-1][-1])
+                pair_mentions.append(mention)
                 if is_train:
                     training_outputs_list.append(
                         [1.0] * ensemble_size
                         if hasattr(mention, "true_in_training")
                         else [0.0] * ensemble_size
                     )
+        if len(pair_referrers) > 0:
+            head_similarities = tendencies_analyzer.compute_head_similarities(
+                doc, pair_mentions, pair_referrers
+            )
+            compatibility_maps = [
+                tendencies_analyzer.get_compatibility_map(
+                    mention,
+                    doc[referrer],
+                    context,
+                    None if head_similarities is None else head_similarities[index],
+                )
+                for index, (mention, referrer) in enumerate(
+                    zip(pair_mentions, pair_referrers)
+                )
+            ]
+            # Gather the static inputs for each pair from the document maps
+            map_rows = cast(numpy.ndarray, context.map_rows)
+            feature_matrix = cast(numpy.ndarray, context.feature_matrix)
+            position_matrix = cast(numpy.ndarray, context.position_matrix)
+            referrer_rows = map_rows[pair_referrers]
+            antecedent_rows = map_rows[
+                [mention.root_index for mention in antecedent_mentions]
+            ]
+            antecedent_feature_maps = feature_matrix[antecedent_rows]
+            antecedent_position_maps = position_matrix[antecedent_rows]
+            for index, mention in enumerate(antecedent_mentions):
+                if len(mention.token_indexes) > 1:
+                    antecedent_feature_maps[
+                        index
+                    ] = tendencies_analyzer.get_feature_map(mention, doc, context)
+                    antecedent_position_maps[
+                        index
+                    ] = tendencies_analyzer.get_position_map(mention, doc, context)
+            static_infos = ops.asarray2f(
+                numpy.hstack(
+                    (
+                        feature_matrix[referrer_rows],
+                        position_matrix[referrer_rows],
+                        antecedent_feature_maps[pair_antecedents],
+                        antecedent_position_maps[pair_antecedents],
+                        numpy.array(compatibility_maps, dtype=numpy.float32),
+                    )
+                )
+            )
+        else:
+            static_infos = ops.asarray2f([])
         candidates = (
             _list2ragged(ops, candidates_list)
             if len(candidates_list) > 0
             else _empty_Ragged(ops, "i")
         )
+        vector_indexes = sorted(vector_token_indexes)
+        vector_rows = numpy.full(len(doc), -1, dtype="int32")
+        vector_rows[vector_indexes] = numpy.arange(len(vector_indexes))
+        if len(vector_indexes) > 0:
+            vectors = ops.asarray2f(
+                [context.vectors[index] for index in vector_indexes]
+            )
+            head_vectors = ops.asarray2f(
+                [context.head_vectors[index] for index in vector_indexes]
+            )
+        else:
+            vectors = head_vectors = ops.alloc2f(0, tendencies_analyzer.vector_length)
         if is_train:
             if len(candidates_list) > 0:
                 cumsums = ops.xp.cumsum(candidates.lengths)[:-1]
@@ -592,8 +855,12 @@ class DocumentPairInfo:
                     for item in sublist
                 ]
             ),
-            static_infos=ops.asarray2f(static_infos_list),
+            static_infos=static_infos,
             training_outputs=training_outputs,
+            vectors=vectors,
+            head_vectors=head_vectors,
+            vector_rows=ops.asarray1i(vector_rows),
+            vector_lemmas=[context.vector_lemmas[index] for index in vector_indexes],
         )
 
 
@@ -642,6 +909,537 @@ def create_thinc_model() -> Model[List["DocumentPairInfo"], Tuple]:
         return chain(noop() & ensemble, apply_softmax_sequences())
 
 
+class FusedEnsemble:
+    """Inference-only version of a trained ensemble generated by *create_thinc_model()*
+    that runs on NumPy alone. The weights of the ensemble members are stacked into block
+    tensors so that each layer is evaluated for all members with a single matrix
+    multiplication. *predict()* accepts and returns the same structures as the
+    *predict()* method of the Thinc model.
+
+    The first dense layer is decomposed along the structure of its input rows, which
+    consist of the squeezed referrer and antecedent vectors followed by
+    *[feature_map(referrer), position_map(referrer), feature_map(mention),
+    position_map(mention), compatibility_map]*. The partial products for the referrer
+    and antecedent halves are calculated once per referrer and once per antecedent and
+    added together for each pair, so that only the compatibility map has to be
+    multiplied for every pair.
+
+    An object is generated from a trained Thinc model with *from_thinc_model()*, which
+    copies the weights, or from a runtime file written by *export_runtime()* with
+    *load_runtime()*.
+
+    *quantize_weights()* rounds the weight matrices to a lower precision for storage in a
+    runtime file. With *float16*, all the weight matrices are stored as half-precision
+    floats. With *int8*, the dense layers are stored as eight-bit integers with one scale
+    factor per output column, while the squeezer layers, which receive the word vectors,
+    are stored as half-precision floats. In both cases the biases remain in single
+    precision. The weight matrices are held in memory with the precision with which
+    they were stored. NumPy has no matrix multiplication kernels for half-precision
+    floats or eight-bit integers, so each matrix is widened to single precision only for
+    the duration of the multiplication in which it is used, and the scale factors of
+    eight-bit matrices are applied to the products. A lower precision therefore reduces
+    the memory that each process uses for the ensemble, at the cost of converting the
+    matrices each time documents are scored; it does not make the multiplications
+    themselves faster. *quantize()* returns a copy whose weights have been rounded as
+    they would be in a runtime file, which allows the accuracy of each precision to be
+    measured.
+    """
+
+    # The arrays that make up a fused ensemble. Index 0 of the squeezer and *dense_W1*
+    # weights relates to the referrers and index 1 to the antecedents.
+    WEIGHT_NAMES = (
+        "squeezer_W1_0",
+        "squeezer_b1_0",
+        "squeezer_W2_0",
+        "squeezer_b2_0",
+        "squeezer_W1_1",
+        "squeezer_b1_1",
+        "squeezer_W2_1",
+        "squeezer_b2_1",
+        "dense_W1_0",
+        "dense_W1_1",
+        "compatibility_W1",
+        "dense_b1",
+        "dense_W2",
+        "dense_b2",
+        "output_W",
+        "output_b",
+    )
+
+    # The weight matrices, as opposed to the biases
+    MATRIX_NAMES = tuple(name for name in WEIGHT_NAMES if "_W" in name)
+
+    # The weight matrices that are stored as eight-bit integers with *int8* precision
+    INT8_MATRIX_NAMES = ("dense_W1_0", "dense_W1_1", "compatibility_W1", "dense_W2")
+
+    def __init__(
+        self, weights: Dict[str, numpy.ndarray], squeezer_cache_size: int = 10000
+    ):
+        """*weights* are either the single-precision weights or weights returned by
+        *quantize_weights()*."""
+        if weights["dense_W1_0"].dtype == numpy.int8:
+            self.precision = "int8"
+        elif weights["dense_W1_0"].dtype == numpy.float16:
+            self.precision = "float16"
+        else:
+            self.precision = "float32"
+        self.weights = {name: weights[name] for name in self.WEIGHT_NAMES}
+        # The scale factors of the matrices stored as eight-bit integers
+        self.scales = {
+            name: weights[name + "_scale"]
+            for name in self.INT8_MATRIX_NAMES
+            if weights[name].dtype == numpy.int8
+        }
+        self.squeezer_b1 = [weights["squeezer_b1_0"], weights["squeezer_b1_1"]]
+        self.squeezer_b2 = [weights["squeezer_b2_0"], weights["squeezer_b2_1"]]
+        self.dense_b1 = weights["dense_b1"]
+        self.dense_b2 = weights["dense_b2"]
+        self.output_b = weights["output_b"]
+        self.ensemble_size = weights["dense_W2"].shape[0]
+        self.squeezed_width = weights["squeezer_W2_0"].shape[2]
+        self.half_width = (
+            weights["dense_W1_0"].shape[0] - self.squeezed_width * self.ensemble_size
+        )
+        self.squeezer_cache_size = squeezer_cache_size
+        self.squeezed_vector_caches: List[OrderedDict] = [OrderedDict(), OrderedDict()]
+        self.lock = Lock()
+
+    @classmethod
+    def from_thinc_model(
+        cls, thinc_ensemble: Model, squeezer_cache_size: int = 10000
+    ) -> "FusedEnsemble":
+        # chain(noop() & concatenate(*members), apply_softmax_sequences())
+        members = thinc_ensemble.layers[0].layers[1].layers
+        ensemble_size = len(members)
+
+        def get_weights(layer: Model) -> Tuple[numpy.ndarray, numpy.ndarray]:
+            # Thinc stores weights as (nO, nI): transpose them to (nI, nO)
+            return (
+                numpy.ascontiguousarray(to_numpy(layer.get_param("W")).T),
+                to_numpy(layer.get_param("b")),
+            )
+
+        def stack_blocks(
+            weights: List[Tuple[numpy.ndarray, numpy.ndarray]]
+        ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+            # (ensemble_size, nI, nO), one block per member
+            return (
+                numpy.stack([W for W, _ in weights]),
+                numpy.stack([b for _, b in weights])[:, None, :],
+            )
+
+        weights = {}
+        for side in range(2):
+            squeezer_weights = [
+                [
+                    get_weights(layer)
+                    for layer in member.layers[0].layers[side].layers[1].layers
+                ]
+                for member in members
+            ]
+            # First layers: (nI, ensemble_size * 24)
+            weights["squeezer_W1_%d" % side] = numpy.hstack(
+                [member_weights[0][0] for member_weights in squeezer_weights]
+            )
+            weights["squeezer_b1_%d" % side] = numpy.concatenate(
+                [member_weights[0][1] for member_weights in squeezer_weights]
+            )
+            # Second layers: (ensemble_size, 24, 3)
+            (
+                weights["squeezer_W2_%d" % side],
+                weights["squeezer_b2_%d" % side],
+            ) = stack_blocks([member_weights[1] for member_weights in squeezer_weights])
+        squeezed_width = weights["squeezer_W2_0"].shape[2]
+
+        # The first dense layer of each member receives its own squeezed vectors followed
+        # by the static inputs it shares with the other members. The rows of each weight
+        # matrix are split between the referrer half, the antecedent half and the
+        # compatibility map; the members are placed side by side, so the parts of the
+        # matrices that multiply the squeezed vectors are block diagonal.
+        dense_weights = [get_weights(member.layers[1]) for member in members]
+        dense_width = dense_weights[0][0].shape[1]
+        half_width = (
+            dense_weights[0][0].shape[0] - 2 * squeezed_width - COMPATIBILITY_MAP_WIDTH
+        ) // 2
+        static_start = 2 * squeezed_width
+        for side in range(2):
+            W1 = numpy.zeros(
+                (
+                    squeezed_width * ensemble_size + half_width,
+                    dense_width * ensemble_size,
+                ),
+                dtype=dense_weights[0][0].dtype,
+            )
+            half_start = static_start + side * half_width
+            for index, (W, _) in enumerate(dense_weights):
+                columns = slice(index * dense_width, (index + 1) * dense_width)
+                W1[index * squeezed_width : (index + 1) * squeezed_width, columns] = W[
+                    side * squeezed_width : (side + 1) * squeezed_width
+                ]
+                W1[squeezed_width * ensemble_size :, columns] = W[
+                    half_start : half_start + half_width
+                ]
+            weights["dense_W1_%d" % side] = W1
+        weights["compatibility_W1"] = numpy.ascontiguousarray(
+            numpy.hstack([W[static_start + 2 * half_width :] for W, _ in dense_weights])
+        )
+        weights["dense_b1"] = numpy.concatenate([b for _, b in dense_weights])
+        weights["dense_W2"], weights["dense_b2"] = stack_blocks(
+            [get_weights(member.layers[2]) for member in members]
+        )
+        weights["output_W"], weights["output_b"] = stack_blocks(
+            [get_weights(member.layers[3]) for member in members]
+        )
+        return cls(weights, squeezer_cache_size)
+
+    def quantize(self, precision: str) -> "FusedEnsemble":
+        """Returns a copy of this ensemble whose weights have been rounded to *precision*,
+        which is one of *PRECISIONS*."""
+        return FusedEnsemble(
+            self.quantize_weights(self.get_float32_weights(), precision),
+            self.squeezer_cache_size,
+        )
+
+    def get_float32_weights(self) -> Dict[str, numpy.ndarray]:
+        """Returns the weights widened to single precision."""
+        return {
+            name: self.weights[name].astype(numpy.float32) * self.scales[name]
+            if name in self.scales
+            else self.weights[name].astype(numpy.float32, copy=False)
+            for name in self.WEIGHT_NAMES
+        }
+
+    @classmethod
+    def quantize_weights(
+        cls, weights: Dict[str, numpy.ndarray], precision: str
+    ) -> Dict[str, numpy.ndarray]:
+        """Returns single-precision *weights* with the weight matrices stored with
+        *precision*, which is one of *PRECISIONS*."""
+        if precision not in PRECISIONS:
+            raise ValueError(
+                "".join(
+                    (
+                        "Unsupported precision '",
+                        precision,
+                        "'; use one of ",
+                        str(PRECISIONS),
+                    )
+                )
+            )
+        quantized_weights = {}
+        for name in cls.WEIGHT_NAMES:
+            W = weights[name]
+            if name not in cls.MATRIX_NAMES or precision == "float32":
+                quantized_weights[name] = W
+            elif precision == "int8" and name in cls.INT8_MATRIX_NAMES:
+                # symmetric quantization with one scale factor per output column
+                scale = numpy.abs(W).max(axis=-2, keepdims=True) / 127
+                scale[scale == 0] = 1
+                quantized_weights[name] = numpy.rint(W / scale).astype(numpy.int8)
+                quantized_weights[name + "_scale"] = scale.astype(numpy.float32)
+            else:
+                quantized_weights[name] = W.astype(numpy.float16)
+        return quantized_weights
+
+    def _matmul(self, X: numpy.ndarray, name: str) -> numpy.ndarray:
+        W = self.weights[name]
+        if W.dtype == numpy.float32:
+            return numpy.matmul(X, W)
+        product = numpy.matmul(X, W.astype(numpy.float32))
+        if name in self.scales:
+            # the scale factors relate to the output columns
+            product *= self.scales[name]
+        return product
+
+    @staticmethod
+    def _relu(X: numpy.ndarray) -> numpy.ndarray:
+        return numpy.maximum(X, 0, out=X)
+
+    def _squeeze(self, side: int, vectors: numpy.ndarray) -> numpy.ndarray:
+        """Applies the vector squeezers of all members to *vectors*, which are referrer
+        vectors if *side==0* and antecedent vectors if *side==1*. Returns an array with
+        the outputs of the members side by side.
+        """
+        # (rows, nI) -> (rows, ensemble_size * 24) -> (ensemble_size, rows, 24)
+        squeezed = self._relu(
+            self._matmul(vectors, "squeezer_W1_%d" % side) + self.squeezer_b1[side]
+        )
+        number_of_rows = squeezed.shape[0]
+        squeezed = squeezed.reshape((number_of_rows, self.ensemble_size, -1)).transpose(
+            (1, 0, 2)
+        )
+        # (ensemble_size, rows, 3) -> (rows, ensemble_size * 3)
+        squeezed = self._relu(
+            self._matmul(squeezed, "squeezer_W2_%d" % side) + self.squeezer_b2[side]
+        )
+        return squeezed.transpose((1, 0, 2)).reshape((number_of_rows, -1))
+
+    def _get_squeezed_vectors(
+        self, side: int, document_pair_infos: List["DocumentPairInfo"]
+    ) -> numpy.ndarray:
+        """Returns the squeezed vectors for the referrers (*side==0*) or antecedents
+        (*side==1*) within *document_pair_infos*. Where all the vectors for a referrer or
+        antecedent came from the vocabulary of the vectors model, the squeezed vector
+        depends only on the lemmas and is served from a least-recently-used cache; the
+        full-width vectors are only gathered for the remaining rows.
+        """
+        cache = self.squeezed_vector_caches[side]
+        # the vector rows of the tokens making up each referrer or antecedent
+        rows_per_document: List[List[numpy.ndarray]] = []
+        for document_pair_info in document_pair_infos:
+            vector_rows = to_numpy(document_pair_info.vector_rows)
+            if side == 0:
+                rows_per_document.append(
+                    list(
+                        vector_rows[to_numpy(document_pair_info.referrers)].reshape(
+                            (-1, 1)
+                        )
+                    )
+                )
+            else:
+                antecedents = document_pair_info.antecedents
+                rows_per_document.append(
+                    numpy.split(
+                        vector_rows[to_numpy(antecedents.dataXd)],
+                        numpy.cumsum(to_numpy(antecedents.lengths))[:-1],
+                    )
+                )
+        keys: List[Optional[Tuple[str, ...]]] = []
+        cached_rows = {}
+        # rows whose key occurs earlier in the same call, mapped to the earlier row
+        repeated_rows: Dict[int, int] = {}
+        first_rows: Dict[Tuple[str, ...], int] = {}
+        with self.lock:
+            for document_pair_info, document_rows in zip(
+                document_pair_infos, rows_per_document
+            ):
+                vector_lemmas = document_pair_info.vector_lemmas
+                for rows in document_rows:
+                    index = len(keys)
+                    key: Optional[Tuple[str, ...]] = tuple(
+                        vector_lemmas[row] for row in rows.tolist()
+                    )
+                    if None in cast(Tuple[str, ...], key):
+                        key = None
+                    elif key in cache:
+                        cache.move_to_end(key)
+                        cached_rows[index] = cache[key]
+                    elif key in first_rows:
+                        repeated_rows[index] = first_rows[key]
+                    else:
+                        first_rows[key] = index
+                    keys.append(key)
+        squeezed = numpy.empty(
+            (len(keys), self.squeezed_width * self.ensemble_size), dtype=numpy.float32
+        )
+        missing_rows = []
+        vectors = []
+        offset = 0
+        for document_pair_info, document_rows in zip(
+            document_pair_infos, rows_per_document
+        ):
+            document_missing_rows = [
+                index
+                for index in range(len(document_rows))
+                if index + offset not in cached_rows
+                and index + offset not in repeated_rows
+            ]
+            if len(document_missing_rows) > 0:
+                document_vectors = to_numpy(document_pair_info.vectors)
+                # antecedents with several tokens are represented by the mean of their
+                # vectors
+                vectors.extend(
+                    document_vectors[document_rows[index][0]]
+                    if len(document_rows[index]) == 1
+                    else document_vectors[document_rows[index]].mean(axis=0)
+                    for index in document_missing_rows
+                )
+                missing_rows.extend(index + offset for index in document_missing_rows)
+            offset += len(document_rows)
+        if len(missing_rows) > 0:
+            squeezed[missing_rows] = self._squeeze(
+                side, numpy.vstack(vectors).astype(numpy.float32, copy=False)
+            )
+            with self.lock:
+                for index in missing_rows:
+                    if keys[index] is not None:
+                        cache[keys[index]] = squeezed[index].copy()
+                while len(cache) > self.squeezer_cache_size:
+                    cache.popitem(last=False)
+        for index, row in cached_rows.items():
+            squeezed[index] = row
+        for index, first_index in repeated_rows.items():
+            squeezed[index] = squeezed[first_index]
+        return squeezed
+
+    def _get_partial_products(
+        self, side: int, squeezed: numpy.ndarray, static_inputs: numpy.ndarray
+    ) -> numpy.ndarray:
+        """Returns the contribution of the referrer (*side==0*) or antecedent (*side==1*)
+        half of the input to the first dense layer of each member. *squeezed* and
+        *static_inputs* have one row per referrer or antecedent.
+        """
+        return self._matmul(
+            numpy.hstack((squeezed, static_inputs)), "dense_W1_%d" % side
+        )
+
+    def predict(
+        self, document_pair_infos: List["DocumentPairInfo"]
+    ) -> List[numpy.ndarray]:
+        ensemble_size = self.ensemble_size
+        # Find the first pair belonging to each referrer and to each antecedent, and
+        # express the pointers and candidates relative to the whole batch
+        referrer_pairs = []
+        antecedent_pairs = []
+        pointers = []
+        candidates = []
+        lengths = []
+        number_of_pairs = number_of_referrers = number_of_antecedents = 0
+        for document_pair_info in document_pair_infos:
+            document_lengths = to_numpy(document_pair_info.candidates.lengths)
+            document_candidates = to_numpy(document_pair_info.candidates.dataXd)
+            referrer_pairs.append(
+                number_of_pairs + numpy.cumsum(document_lengths) - document_lengths
+            )
+            first_pairs = numpy.zeros(
+                len(document_pair_info.antecedents), dtype=numpy.int64
+            )
+            unique_candidates, unique_pairs = numpy.unique(
+                document_candidates, return_index=True
+            )
+            first_pairs[unique_candidates] = unique_pairs
+            antecedent_pairs.append(number_of_pairs + first_pairs)
+            pointers.append(
+                number_of_referrers
+                + to_numpy(document_pair_info.referrers2candidates_pointers)
+            )
+            candidates.append(number_of_antecedents + document_candidates)
+            lengths.append(document_lengths)
+            number_of_pairs += len(document_candidates)
+            number_of_referrers += len(document_lengths)
+            number_of_antecedents += len(first_pairs)
+
+        static_inputs = numpy.vstack(
+            [to_numpy(d.static_infos) for d in document_pair_infos]
+        ).astype(numpy.float32, copy=False)
+        half_width = self.half_width
+        referrer_products = self._get_partial_products(
+            0,
+            self._get_squeezed_vectors(0, document_pair_infos),
+            static_inputs[numpy.concatenate(referrer_pairs), :half_width],
+        )
+        antecedent_products = self._get_partial_products(
+            1,
+            self._get_squeezed_vectors(1, document_pair_infos),
+            static_inputs[
+                numpy.concatenate(antecedent_pairs), half_width : 2 * half_width
+            ],
+        )
+        # (pairs, ensemble_size * 639) -> (ensemble_size, pairs, 639)
+        hidden = self._matmul(static_inputs[:, 2 * half_width :], "compatibility_W1")
+        hidden += referrer_products[numpy.concatenate(pointers)]
+        hidden += antecedent_products[numpy.concatenate(candidates)]
+        hidden += self.dense_b1
+        hidden = self._relu(hidden)
+        hidden = hidden.reshape((number_of_pairs, ensemble_size, -1)).transpose(
+            (1, 0, 2)
+        )
+        hidden = self._relu(self._matmul(hidden, "dense_W2") + self.dense_b2)
+        # (ensemble_size, pairs, 1) -> (pairs, ensemble_size)
+        outputs = (self._matmul(hidden, "output_W") + self.output_b)[:, :, 0].T
+        # Softmax over the candidates of each referrer as in *apply_softmax_sequences()*
+        outputs = numpy.exp(numpy.clip(outputs, -20.0, 20.0))
+        lengths_array = numpy.concatenate(lengths)
+        starts = numpy.cumsum(lengths_array) - lengths_array
+        outputs /= numpy.repeat(
+            numpy.add.reduceat(outputs, starts, axis=0), lengths_array, axis=0
+        )
+        return numpy.split(outputs, numpy.cumsum(lengths_array)[:-1])
+
+
+def export_runtime(
+    path: str,
+    thinc_ensemble: Model,
+    feature_table: FeatureTable,
+    precision: str = "float32",
+    source_digest: str = "",
+) -> None:
+    """Writes the weights of *thinc_ensemble* in the form used by *FusedEnsemble*, together
+    with *feature_table*, to a NumPy *.npz* file at *path*. *precision* is one of
+    *PRECISIONS* and determines how the weights are stored. *source_digest* identifies
+    the installed model from which *thinc_ensemble* and *feature_table* were loaded and
+    is checked by *load_runtime()*. The file is written under a temporary name and then
+    renamed so that an interrupted export never leaves a truncated file at *path*."""
+    weights = FusedEnsemble.quantize_weights(
+        FusedEnsemble.from_thinc_model(thinc_ensemble).weights, precision
+    )
+    arrays = {
+        "format_version": numpy.array(RUNTIME_FORMAT_VERSION),
+        "source_digest": numpy.array(source_digest),
+        **{"weights." + name: array for name, array in weights.items()},
+        **{
+            "feature_table." + name: numpy.array(values, dtype=str)
+            for name, values in vars(feature_table).items()
+        },
+    }
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "wb") as runtime_file:
+            numpy.savez(runtime_file, **arrays)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def load_runtime(
+    path: str, source_digest: Optional[str] = None
+) -> Tuple[FeatureTable, FusedEnsemble]:
+    """Reads a file written by *export_runtime()*. If *source_digest* is specified, an
+    *OutdatedCorefereeModelError* is raised unless the file was exported from the model
+    it identifies."""
+    with numpy.load(path, allow_pickle=False) as arrays:
+        format_version = int(arrays["format_version"])
+        if format_version != RUNTIME_FORMAT_VERSION:
+            raise OutdatedCorefereeModelError(
+                "".join(
+                    (
+                        "Runtime file ",
+                        path,
+                        " has format version ",
+                        str(format_version),
+                        " but version ",
+                        str(RUNTIME_FORMAT_VERSION),
+                        " is required. Please export it again.",
+                    )
+                )
+            )
+        if source_digest is not None and str(arrays["source_digest"]) != source_digest:
+            raise OutdatedCorefereeModelError(
+                "".join(
+                    (
+                        "Runtime file ",
+                        path,
+                        " was not exported from the installed model. Please export it",
+                        " again.",
+                    )
+                )
+            )
+        feature_table = FeatureTable(
+            **{
+                name[len("feature_table.") :]: arrays[name].tolist()
+                for name in arrays.files
+                if name.startswith("feature_table.")
+            }
+        )
+        weights = {
+            name[len("weights.") :]: arrays[name]
+            for name in arrays.files
+            if name.startswith("weights.")
+        }
+    return feature_table, FusedEnsemble(weights)
+
+
 def apply_softmax_sequences() -> Model[
     Tuple[List["DocumentPairInfo"], Floats2d], Floats2d
 ]:
@@ -682,20 +1480,19 @@ def referrers_forward(
     def backprop(d_vectors: Floats2d) -> List["DocumentPairInfo"]:
         return []
 
-    vectors_to_return = []
-
-    for document_pair_info in document_pair_infos:
-
-        this_document_vector = model.ops.asarray2f(
+    return (
+        model.ops.xp.concatenate(
             [
-                document_pair_info.doc[referrer]._.coref_chains.temp_vector
-                for referrer in document_pair_info.referrers.tolist()
+                document_pair_info.vectors[
+                    document_pair_info.vector_rows[document_pair_info.referrers][
+                        document_pair_info.referrers2candidates_pointers
+                    ]
+                ]
+                for document_pair_info in document_pair_infos
             ]
-        )[model.ops.asarray1i(document_pair_info.referrers2candidates_pointers)]
-
-        vectors_to_return.append(this_document_vector)
-
-    return model.ops.xp.concatenate(vectors_to_return), backprop
+        ),
+        backprop,
+    )
 
 
 def get_referrer_heads() -> Model[List["DocumentPairInfo"], Floats2d]:
@@ -708,20 +1505,19 @@ def referrer_heads_forward(
     def backprop(d_vectors: Floats2d) -> List["DocumentPairInfo"]:
         return []
 
-    vectors_to_return = []
-
-    for document_pair_info in document_pair_infos:
-
-        this_document_vector = model.ops.asarray2f(
+    return (
+        model.ops.xp.concatenate(
             [
-                document_pair_info.doc[referrer]._.coref_chains.temp_head_vector
-                for referrer in document_pair_info.referrers.tolist()
+                document_pair_info.head_vectors[
+                    document_pair_info.vector_rows[document_pair_info.referrers][
+                        document_pair_info.referrers2candidates_pointers
+                    ]
+                ]
+                for document_pair_info in document_pair_infos
             ]
-        )[model.ops.asarray1i(document_pair_info.referrers2candidates_pointers)]
-
-        vectors_to_return.append(this_document_vector)
-
-    return model.ops.xp.concatenate(vectors_to_return), backprop
+        ),
+        backprop,
+    )
 
 
 def get_antecedents() -> Model[List["DocumentPairInfo"], List[Floats2d]]:
@@ -734,29 +1530,17 @@ def antecedents_forward(
     def backprop(d_vectors: Floats2d) -> List["DocumentPairInfo"]:
         return []
 
-    vectors_to_return = []
-
-    for document_pair_info in document_pair_infos:
-
-        this_document_vector = model.ops.asarray2f(
+    return (
+        model.ops.xp.concatenate(
             [
-                model.ops.asarray1f(
-                    [
-                        document_pair_info.doc[
-                            cast(int, index[0])
-                        ]._.coref_chains.temp_vector
-                        for index in document_pair_info.antecedents[i].dataXd.tolist()
-                    ]
-                ).mean(  # type: ignore
-                    axis=0
-                )
-                for i in range(len(document_pair_info.antecedents))
+                _get_antecedent_vectors(model.ops, document_pair_info)[
+                    document_pair_info.candidates.dataXd
+                ]
+                for document_pair_info in document_pair_infos
             ]
-        )[model.ops.asarray1i(cast(Ints1d, document_pair_info.candidates.dataXd))]
-
-        vectors_to_return.append(this_document_vector)
-
-    return model.ops.xp.concatenate(vectors_to_return), backprop
+        ),
+        backprop,
+    )
 
 
 def get_antecedent_heads() -> Model[List["DocumentPairInfo"], Floats2d]:
@@ -772,20 +1556,18 @@ def antecedent_heads_forward(
     vectors_to_return = []
 
     for document_pair_info in document_pair_infos:
-
-        this_document_vector = model.ops.asarray2f(
-            # We only examine the head of the first element within the coordinated phrase
-            # because other elements will not have the true semantic head as their
-            # syntactic head
-            [
-                document_pair_info.doc[
-                    cast(int, document_pair_info.antecedents[i].dataXd.tolist()[0][0])
-                ]._.coref_chains.temp_head_vector
-                for i in range(len(document_pair_info.antecedents))
-            ]
-        )[model.ops.asarray1i(cast(Ints1d, document_pair_info.candidates.dataXd))]
-
-        vectors_to_return.append(this_document_vector)
+        antecedents = document_pair_info.antecedents
+        # We only examine the head of the first element within the coordinated phrase
+        # because other elements will not have the true semantic head as their
+        # syntactic head
+        first_tokens = antecedents.dataXd[
+            model.ops.xp.cumsum(antecedents.lengths) - antecedents.lengths
+        ]
+        vectors_to_return.append(
+            document_pair_info.head_vectors[
+                document_pair_info.vector_rows[first_tokens]
+            ][document_pair_info.candidates.dataXd]
+        )
 
     return model.ops.xp.concatenate(vectors_to_return), backprop
 
@@ -815,27 +1597,56 @@ def _list2ragged(ops: Ops, items: List[List[int]]) -> Ragged:
     )
 
 
+def _get_antecedent_vectors(
+    ops: Ops,
+    document_pair_info: "DocumentPairInfo",
+    antecedent_indexes: Optional[Ints1d] = None,
+) -> Floats2d:
+    """Returns the vectors of the antecedents within *document_pair_info*, or of the
+    antecedents at *antecedent_indexes* if specified. Antecedents with several tokens are
+    represented by the mean of their vectors.
+    """
+    antecedents = document_pair_info.antecedents
+    token_indexes = antecedents.dataXd
+    lengths = antecedents.lengths
+    if antecedent_indexes is not None:
+        starts = ops.xp.cumsum(lengths) - lengths
+        lengths = lengths[antecedent_indexes]
+        # the positions within *token_indexes* of the tokens of the selected antecedents
+        positions = ops.xp.repeat(
+            starts[antecedent_indexes] - (ops.xp.cumsum(lengths) - lengths), lengths
+        ) + ops.xp.arange(int(lengths.sum()))
+        token_indexes = token_indexes[positions]
+    if len(lengths) == 0:
+        return ops.alloc2f(0, document_pair_info.vectors.shape[1])
+    return ops.reduce_mean(
+        document_pair_info.vectors[document_pair_info.vector_rows[token_indexes]],
+        ops.asarray1i(lengths),
+    )
+
+
 def _empty_Ragged(ops: Ops, dtype: str) -> Ragged:
     return Ragged(ops.xp.zeros((0,), dtype=dtype), ops.alloc1i(0))
 
 
-def _set_vectors(vectors_nlp: Language, ops: Ops, token: Token) -> None:
-    if hasattr(token._.coref_chains, "temp_vector"):
+def _set_vectors(
+    vectors_nlp: Language, ops: Ops, token: Token, context: DocContext
+) -> None:
+    if context.vectors[token.i] is not None:
         return
     if (not vectors_nlp.vocab[token.lemma_].has_vector) and len(token.vector) > 0:
-        token._.coref_chains.temp_vector = token.vector
+        vector = token.vector
     else:
-        token._.coref_chains.temp_vector = vectors_nlp.vocab[token.lemma_].vector
+        vector = vectors_nlp.vocab[token.lemma_].vector
+        # the vector only depends on the lemma, which allows it to be cached
+        context.vector_lemmas[token.i] = token.lemma_
+    context.vectors[token.i] = vector
     if token != token.head:
         if (not vectors_nlp.vocab[token.head.lemma_].has_vector) and len(
             token.head.vector
         ) > 0:
-            token._.coref_chains.temp_head_vector = token.head.vector
+            context.head_vectors[token.i] = token.head.vector
         else:
-            token._.coref_chains.temp_head_vector = vectors_nlp.vocab[
-                token.head.lemma_
-            ].vector
+            context.head_vectors[token.i] = vectors_nlp.vocab[token.head.lemma_].vector
     else:
-        token._.coref_chains.temp_head_vector = (
-            ops.alloc1f(len(token._.coref_chains.temp_vector)) + 0.0
-        )
+        context.head_vectors[token.i] = ops.alloc1f(len(vector)) + 0.0
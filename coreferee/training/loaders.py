@@ -1,4 +1,4 @@
-from typing import List, Dict, Set, cast
+from typing import List, Dict, Set, Tuple, cast
 from xml.sax import make_parser
 from xml.sax.handler import ContentHandler, feature_namespaces
 import os
@@ -7,7 +7,7 @@ import bisect
 from abc import ABC, abstractmethod
 from spacy.language import Language
 from spacy.tokens import Doc, Span, Token
-from ..data_model import Mention
+from ..data_model import DocContext, Mention
 from ..rules import RulesAnalyzer
 
 
@@ -15,11 +15,12 @@ class GenericLoader(ABC):
     @abstractmethod
     def load(
         self, directory_name: str, nlp: Language, rules_analyzer: RulesAnalyzer
-    ) -> List[Doc]:
+    ) -> List[Tuple[Doc, DocContext]]:
         """Loads training data from *directory_name* to produce a list of documents parsed using
-        the spacy model *nlp*. Each document goes through *RulesAnalyzer.initialize()*.
+        the spacy model *nlp*, each paired with the context that *RulesAnalyzer.initialize()*
+        returned for it.
         Wherever an anaphor points to a referred mention in the training data, the
-        mention within *token._.coref_chains.temp_potential_referreds* is annotated with
+        mention within the potential referreds of *token* is annotated with
         *true_in_training=True*."""
 
 
@@ -73,13 +74,13 @@ class ParCorLoader(GenericLoader):
         nlp: Language,
         rules_analyzer: RulesAnalyzer,
         parser,
-    ) -> Doc:
+    ) -> Tuple[Doc, DocContext]:
         parcor_handler = ParCorHandler()
         parser.setContentHandler(parcor_handler)
         parser.parse(words_filename)
         parser.parse(coref_level_filename)
         doc = nlp(" ".join(word for word in parcor_handler.words))
-        rules_analyzer.initialize(doc)
+        context = rules_analyzer.initialize(doc)
         lookup = []
         spacy_token_iterator = enumerate(doc)
         for parcor_token in parcor_handler.words:
@@ -110,19 +111,21 @@ class ParCorLoader(GenericLoader):
                 ]
                 if rules_analyzer.is_independent_noun(
                     holmes_span.root
-                ) or rules_analyzer.is_potential_anaphor(holmes_span.root):
+                ) or rules_analyzer.is_potential_anaphor(holmes_span.root, context):
                     thinned_parcor_spans.append(parcor_span)
             thinned_parcor_spans.sort(key=lambda span: span[0])
             for index, parcor_span in enumerate(thinned_parcor_spans):
                 holmes_span = doc[
                     lookup[parcor_span[0]][0] : lookup[parcor_span[1]][-1] + 1
                 ]
+                dependent_siblings = context.dependent_siblings[holmes_span.root.i]
                 include_dependent_siblings = (
-                    len(holmes_span.root._.coref_chains.temp_dependent_siblings) > 0
-                    and holmes_span.root._.coref_chains.temp_dependent_siblings[-1].i
-                    <= lookup[parcor_span[1]][-1]
+                    len(dependent_siblings) > 0
+                    and dependent_siblings[-1] <= lookup[parcor_span[1]][-1]
+                )
+                working_referent = Mention(
+                    holmes_span.root, include_dependent_siblings, context
                 )
-                working_referent = Mention(holmes_span.root, include_dependent_siblings)
                 marked = False
                 if index > 0:
                     previous_parcor_span = thinned_parcor_spans[index - 1]
@@ -132,15 +135,11 @@ class ParCorLoader(GenericLoader):
                         ][-1]
                         + 1
                     ]
-                    if hasattr(
-                        previous_holmes_span.root._.coref_chains,
-                        "temp_potential_referreds",
-                    ):
-                        for (
-                            mention
-                        ) in (
-                            previous_holmes_span.root._.coref_chains.temp_potential_referreds
-                        ):
+                    potential_referreds = context.potential_referreds[
+                        previous_holmes_span.root.i
+                    ]
+                    if potential_referreds is not None:
+                        for mention in potential_referreds:
                             if mention == working_referent:
                                 mention.true_in_training = True
                                 marked = True
@@ -151,22 +150,19 @@ class ParCorLoader(GenericLoader):
                         lookup[next_parcor_span[0]][0] : lookup[next_parcor_span[1]][-1]
                         + 1
                     ]
-                    if hasattr(
-                        next_holmes_span.root._.coref_chains, "temp_potential_referreds"
-                    ):
-                        for (
-                            mention
-                        ) in (
-                            next_holmes_span.root._.coref_chains.temp_potential_referreds
-                        ):
+                    potential_referreds = context.potential_referreds[
+                        next_holmes_span.root.i
+                    ]
+                    if potential_referreds is not None:
+                        for mention in potential_referreds:
                             if mention == working_referent:
                                 mention.true_in_training = True
                                 continue
-        return doc
+        return doc, context
 
     def load(
         self, directory_name: str, nlp: Language, rules_analyzer: RulesAnalyzer
-    ) -> List[Doc]:
+    ) -> List[Tuple[Doc, DocContext]]:
         parser = make_parser()
         parser.setFeature(feature_namespaces, 0)
         docs = []
@@ -200,8 +196,8 @@ class PolishCoreferenceCorpusANNLoader(GenericLoader):
     @staticmethod
     def load_file(
         doc: Doc, ann_file_lines: List[str], rules_analyzer: RulesAnalyzer
-    ) -> None:
-        rules_analyzer.initialize(doc)
+    ) -> DocContext:
+        context = rules_analyzer.initialize(doc)
         token_char_start_indexes = [token.idx for token in doc]
         mention_numbers_to_spans = {}
         mention_numbers_to_set_numbers: Dict[str, int] = {}
@@ -266,43 +262,41 @@ class PolishCoreferenceCorpusANNLoader(GenericLoader):
                 span_to_check = mention_numbers_to_spans[mention_number]
                 if rules_analyzer.is_independent_noun(
                     span_to_check.root
-                ) or rules_analyzer.is_potential_anaphor(span_to_check.root):
+                ) or rules_analyzer.is_potential_anaphor(span_to_check.root, context):
                     spans.append(span_to_check)
             for index, span in enumerate(spans):
+                dependent_siblings = context.dependent_siblings[span.root.i]
                 include_dependent_siblings = (
-                    len(span.root._.coref_chains.temp_dependent_siblings) > 0
-                    and span.root._.coref_chains.temp_dependent_siblings[-1].i
-                    < span.end
+                    len(dependent_siblings) > 0 and dependent_siblings[-1] < span.end
+                )
+                working_referent = Mention(
+                    span.root, include_dependent_siblings, context
                 )
-                working_referent = Mention(span.root, include_dependent_siblings)
                 marked = False
                 if index > 0:
                     previous_span = spans[index - 1]
-                    if hasattr(
-                        previous_span.root._.coref_chains, "temp_potential_referreds"
-                    ):
-                        for (
-                            mention
-                        ) in previous_span.root._.coref_chains.temp_potential_referreds:
+                    potential_referreds = context.potential_referreds[
+                        previous_span.root.i
+                    ]
+                    if potential_referreds is not None:
+                        for mention in potential_referreds:
                             if mention == working_referent:
                                 mention.true_in_training = True
                                 marked = True
                                 continue
                 if not marked and index < len(spans) - 1:
                     next_span = spans[index + 1]
-                    if hasattr(
-                        next_span.root._.coref_chains, "temp_potential_referreds"
-                    ):
-                        for (
-                            mention
-                        ) in next_span.root._.coref_chains.temp_potential_referreds:
+                    potential_referreds = context.potential_referreds[next_span.root.i]
+                    if potential_referreds is not None:
+                        for mention in potential_referreds:
                             if mention == working_referent:
                                 mention.true_in_training = True
                                 continue
+        return context
 
     def load(
         self, directory_name: str, nlp: Language, rules_analyzer: RulesAnalyzer
-    ) -> List[Doc]:
+    ) -> List[Tuple[Doc, DocContext]]:
         txt_file_contents = []
         ann_file_lines_list = []
         txt_filenames = [
@@ -320,8 +314,10 @@ class PolishCoreferenceCorpusANNLoader(GenericLoader):
         for index, doc in enumerate(docs):
             if index % 10 == 0:
                 print("Loaded", index, "documents")
-            self.load_file(doc, ann_file_lines_list[index], rules_analyzer)
-            docs_to_return.append(doc)
+            context = self.load_file(
+                doc, ann_file_lines_list[index], rules_analyzer
+            )
+            docs_to_return.append((doc, context))
         return docs_to_return
 
 
@@ -329,8 +325,8 @@ class LitBankANNLoader(GenericLoader):
     @staticmethod
     def load_file(
         doc: Doc, ann_file_lines: list, rules_analyzer: RulesAnalyzer
-    ) -> None:
-        rules_analyzer.initialize(doc)
+    ) -> DocContext:
+        context = rules_analyzer.initialize(doc)
         token_char_start_indexes = [token.idx for token in doc]
         mention_labels_to_span_sets: Dict[str, Set[Span]] = {}
         for index, ann_file_line in enumerate(ann_file_lines):
@@ -352,46 +348,44 @@ class LitBankANNLoader(GenericLoader):
             spans = list(
                 filter(
                     lambda span: rules_analyzer.is_independent_noun(span.root)
-                    or rules_analyzer.is_potential_anaphor(span.root),
+                    or rules_analyzer.is_potential_anaphor(span.root, context),
                     span_set,
                 )
             )
             spans.sort(key=lambda span: span.start)
             for index, span in enumerate(spans):
+                dependent_siblings = context.dependent_siblings[span.root.i]
                 include_dependent_siblings = (
-                    len(span.root._.coref_chains.temp_dependent_siblings) > 0
-                    and span.root._.coref_chains.temp_dependent_siblings[-1].i
-                    < span.end
+                    len(dependent_siblings) > 0 and dependent_siblings[-1] < span.end
+                )
+                working_referent = Mention(
+                    span.root, include_dependent_siblings, context
                 )
-                working_referent = Mention(span.root, include_dependent_siblings)
                 marked = False
                 if index > 0:
                     previous_span = spans[index - 1]
-                    if hasattr(
-                        previous_span.root._.coref_chains, "temp_potential_referreds"
-                    ):
-                        for (
-                            mention
-                        ) in previous_span.root._.coref_chains.temp_potential_referreds:
+                    potential_referreds = context.potential_referreds[
+                        previous_span.root.i
+                    ]
+                    if potential_referreds is not None:
+                        for mention in potential_referreds:
                             if mention == working_referent:
                                 mention.true_in_training = True
                                 marked = True
                                 continue
                 if not marked and index < len(spans) - 1:
                     next_span = spans[index + 1]
-                    if hasattr(
-                        next_span.root._.coref_chains, "temp_potential_referreds"
-                    ):
-                        for (
-                            mention
-                        ) in next_span.root._.coref_chains.temp_potential_referreds:
+                    potential_referreds = context.potential_referreds[next_span.root.i]
+                    if potential_referreds is not None:
+                        for mention in potential_referreds:
                             if mention == working_referent:
                                 mention.true_in_training = True
                                 continue
+        return context
 
     def load(
         self, directory_name: str, nlp: Language, rules_analyzer: RulesAnalyzer
-    ) -> List[Doc]:
+    ) -> List[Tuple[Doc, DocContext]]:
         txt_file_contents = []
         ann_file_lines_list = []
         txt_filenames = [
@@ -409,8 +403,10 @@ class LitBankANNLoader(GenericLoader):
         for index, doc in enumerate(docs):
             if index % 10 == 0:
                 print("Loaded", index, "documents")
-            self.load_file(doc, ann_file_lines_list[index], rules_analyzer)
-            docs_to_return.append(doc)
+            context = self.load_file(
+                doc, ann_file_lines_list[index], rules_analyzer
+            )
+            docs_to_return.append((doc, context))
         return docs_to_return
 
 
@@ -418,7 +414,7 @@ class ConllLoader(GenericLoader):
     @staticmethod
     def load_file(
         conll_filename: os.DirEntry, nlp: Language, rules_analyzer: RulesAnalyzer
-    ) -> List[Doc]:
+    ) -> List[Tuple[Doc, DocContext]]:
         with open(conll_filename, "r", encoding="UTF8") as conll_file:
             split_conll_lines = [
                 l.split() for l in conll_file.readlines() if len(l.split()) > 10
@@ -466,7 +462,7 @@ class ConllLoader(GenericLoader):
                 this_part_split_conll_lines = corrected_this_part_split_conll_lines
             conll_tokens = [l[3].lstrip("/") for l in this_part_split_conll_lines]
             doc = nlp(" ".join(conll_tokens))
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             conll_to_spacy_lookup = (
                 []
             )  # indexes correspond to conll token indexes, entries are lists of spaCy tokens
@@ -516,7 +512,9 @@ class ConllLoader(GenericLoader):
                         del working_spans[chain_index]
                         if rules_analyzer.is_independent_noun(
                             this_span.root
-                        ) or rules_analyzer.is_potential_anaphor(this_span.root):
+                        ) or rules_analyzer.is_potential_anaphor(
+                            this_span.root, context
+                        ):
                             if chain_index in chains:
                                 chains[chain_index].append(this_span)
                             else:
@@ -524,55 +522,52 @@ class ConllLoader(GenericLoader):
             for chain in (c for c in chains.values() if len(c) > 1):
                 chain.sort(key=lambda span: span[0])  # type: ignore[arg-type, return-value]
                 for span_index, span in enumerate(chain):
+                    dependent_siblings = context.dependent_siblings[span.root.i]
                     include_dependent_siblings = (
-                        len(span.root._.coref_chains.temp_dependent_siblings) > 0
-                        and span.root._.coref_chains.temp_dependent_siblings[-1] in span
+                        len(dependent_siblings) > 0
+                        and dependent_siblings[-1] < span.end
+                    )
+                    working_referent = Mention(
+                        span.root, include_dependent_siblings, context
                     )
-                    working_referent = Mention(span.root, include_dependent_siblings)
                     if span_index > 0:
                         previous_span = chain[span_index - 1]
+                        potential_referreds = context.potential_referreds[
+                            previous_span.root.i
+                        ]
                         if (
-                            hasattr(
-                                previous_span.root._.coref_chains,
-                                "temp_potential_referreds",
-                            )
+                            potential_referreds is not None
                             and Mention.number_of_training_mentions_marked_true(
-                                previous_span.root
+                                previous_span.root, context
                             )
                             == 0
                         ):
-                            for (
-                                mention
-                            ) in (
-                                previous_span.root._.coref_chains.temp_potential_referreds
-                            ):
+                            for mention in potential_referreds:
                                 if mention == working_referent:
                                     mention.true_in_training = True
                                     continue
                     if span_index < len(chain) - 1:
                         next_span = chain[span_index + 1]
+                        potential_referreds = context.potential_referreds[
+                            next_span.root.i
+                        ]
                         if (
-                            hasattr(
-                                next_span.root._.coref_chains,
-                                "temp_potential_referreds",
-                            )
+                            potential_referreds is not None
                             and Mention.number_of_training_mentions_marked_true(
-                                next_span.root
+                                next_span.root, context
                             )
                             == 0
                         ):
-                            for (
-                                mention
-                            ) in next_span.root._.coref_chains.temp_potential_referreds:
+                            for mention in potential_referreds:
                                 if mention == working_referent:
                                     mention.true_in_training = True
                                     continue
-            docs.append(doc)
+            docs.append((doc, context))
         return docs
 
     def load(
         self, directory_name: str, nlp: Language, rules_analyzer: RulesAnalyzer
-    ) -> List[Doc]:
+    ) -> List[Tuple[Doc, DocContext]]:
         filenames = [c for c in os.scandir(directory_name) if c.path.endswith("conll")]
         filenames.sort(key=lambda entry: entry.name)
         docs = []
@@ -586,8 +581,8 @@ class ConllLoader(GenericLoader):
 
 class RuCorefLoader(GenericLoader):    
     @staticmethod
-    def load_file(doc:Doc, ann_file_lines:list, rules_analyzer:RulesAnalyzer) -> None:
-        rules_analyzer.initialize(doc)
+    def load_file(doc:Doc, ann_file_lines:list, rules_analyzer:RulesAnalyzer) -> DocContext:
+        context = rules_analyzer.initialize(doc)
         token_char_start_indexes = [token.idx for token in doc]
         mention_numbers_to_spans = {}
         mention_numbers = {}
@@ -608,29 +603,35 @@ class RuCorefLoader(GenericLoader):
             for mention_number in sorted(set_number):
                 span_to_check = mention_numbers_to_spans[mention_number]
                 if rules_analyzer.is_independent_noun(span_to_check.root) or \
-                    rules_analyzer.is_potential_anaphor(span_to_check.root):
+                    rules_analyzer.is_potential_anaphor(span_to_check.root, context):
                     spans.append(span_to_check)
             for index, span in enumerate(spans):
+                dependent_siblings = context.dependent_siblings[span.root.i]
                 include_dependent_siblings = (
-                    len(span.root._.coref_chains.temp_dependent_siblings) > 0
-                    and span.root._.coref_chains.temp_dependent_siblings[-1].i < span.end)
-                working_referent = Mention(span.root, include_dependent_siblings)
+                    len(dependent_siblings) > 0 and dependent_siblings[-1] < span.end
+                )
+                working_referent = Mention(
+                    span.root, include_dependent_siblings, context
+                )
                 marked = False
                 if index > 0:
                     previous_span = spans[index - 1]
-                    if hasattr(previous_span.root._.coref_chains, "temp_potential_referreds"):
-                        for mention in previous_span.root._.coref_chains.temp_potential_referreds:
+                    potential_referreds = context.potential_referreds[previous_span.root.i]
+                    if potential_referreds is not None:
+                        for mention in potential_referreds:
                             if mention == working_referent:
                                 mention.true_in_training = True
                                 marked = True
                                 continue
                 if not marked and index < len(spans) - 1:
                     next_span = spans[index + 1]
-                    if hasattr(next_span.root._.coref_chains, "temp_potential_referreds"):
-                        for mention in next_span.root._.coref_chains.temp_potential_referreds:
+                    potential_referreds = context.potential_referreds[next_span.root.i]
+                    if potential_referreds is not None:
+                        for mention in potential_referreds:
                             if mention == working_referent:
                                 mention.true_in_training = True
                                 continue
+        return context
 
 
     def load(self, directory_name:str, nlp:Language, rules_analyzer:RulesAnalyzer) -> list:
@@ -650,7 +651,7 @@ class RuCorefLoader(GenericLoader):
         docs = nlp.pipe(txt_file_contents)
         docs_to_return = []
         for index, doc in enumerate(docs):
-            self.load_file(doc, ann_file_contents[index], rules_analyzer)
-            docs_to_return.append(doc)
+            context = self.load_file(doc, ann_file_contents[index], rules_analyzer)
+            docs_to_return.append((doc, context))
         return docs_to_return
 
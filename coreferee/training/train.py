@@ -20,14 +20,18 @@ from thinc.optimizers import Adam
 from thinc.types import Floats2d
 from .loaders import GenericLoader
 from ..annotation import Annotator
-from ..data_model import FeatureTable, Mention
+from ..data_model import DocContext, FeatureTable, Mention
 from ..manager import COMMON_MODELS_PACKAGE_NAMEPART, get_annotator
 from ..manager import FEATURE_TABLE_FILENAME, THINC_MODEL_FILENAME
 from ..rules import RulesAnalyzerFactory
 from ..tendencies import TendenciesAnalyzer, generate_feature_table, create_thinc_model
-from ..tendencies import DocumentPairInfo, ENSEMBLE_SIZE
+from ..tendencies import DocumentPairInfo, ENSEMBLE_SIZE, PRECISIONS
 from ..errors import LanguageNotSupportedError, ModelNotSupportedError
 
+QUANTIZED_PRECISIONS = tuple(
+    precision for precision in PRECISIONS if precision != "float32"
+)
+
 
 class TrainingManager:
     def __init__(
@@ -188,26 +192,27 @@ class TrainingManager:
         file.write("".join(("".join([str(arg) for arg in args]), "\n")))
 
     def log_incorrect_annotation(
-        self, temp_log_file, token, correct_referred_token, incorrect_referred_token
+        self,
+        temp_log_file,
+        token,
+        context,
+        correct_referred_token,
+        incorrect_referred_token,
     ):
         doc = token.doc
         self.writeln(temp_log_file, "Incorrect annotation:")
         start_token_index = min(correct_referred_token.i, incorrect_referred_token.i)
-        sentence_start_index = doc._.coref_chains.temp_sent_starts[
-            doc[start_token_index]._.coref_chains.temp_sent_index
+        sentence_start_index = context.sent_starts[
+            context.sent_indexes[start_token_index]
         ]
-        if token._.coref_chains.temp_sent_index + 1 == len(
-            doc._.coref_chains.temp_sent_starts
-        ):
+        if context.sent_indexes[token.i] + 1 == len(context.sent_starts):
             self.writeln(temp_log_file, doc[sentence_start_index:])
             self.writeln(
                 temp_log_file, "Tokens from ", sentence_start_index, " to the end:"
             )
             self.writeln(temp_log_file, doc[sentence_start_index:])
         else:
-            sentence_end_index = doc._.coref_chains.temp_sent_starts[
-                token._.coref_chains.temp_sent_index + 1
-            ]
+            sentence_end_index = context.sent_starts[context.sent_indexes[token.i] + 1]
             self.writeln(
                 temp_log_file,
                 "Tokens ",
@@ -218,7 +223,7 @@ class TrainingManager:
             )
             self.writeln(temp_log_file, doc[sentence_start_index:sentence_end_index])
         self.writeln(temp_log_file, "Referring pronoun: ", token, " at index ", token.i)
-        for potential_referred in token._.coref_chains.temp_potential_referreds:
+        for potential_referred in context.potential_referreds[token.i]:
             if hasattr(potential_referred, "true_in_training"):
                 self.writeln(
                     temp_log_file,
@@ -235,7 +240,7 @@ class TrainingManager:
     def train_thinc_model(
         self,
         document_pair_infos: List[DocumentPairInfo],
-        test_docs: List[Doc],
+        test_docs: List[Tuple[Doc, DocContext]],
         nlp: Language,
         vectors_nlp: Language,
         feature_table: FeatureTable,
@@ -272,24 +277,9 @@ class TrainingManager:
             )
             print()
             annotator = Annotator(nlp, vectors_nlp, feature_table, model)
-            correct_counter = incorrect_counter = 0
-            for test_doc in tqdm(test_docs):
-                for token in test_doc:
-                    token._.coref_chains.chains = []
-                annotator.annotate(test_doc, used_in_training=True)
-                for token in test_doc:
-                    if hasattr(token._.coref_chains, "temp_potential_referreds"):
-                        for (
-                            potential_referred
-                        ) in token._.coref_chains.temp_potential_referreds:
-                            if hasattr(potential_referred, "true_in_training"):
-                                for chain in token._.coref_chains:
-                                    if Mention(token, False) not in chain:
-                                        continue
-                                    if potential_referred in chain:
-                                        correct_counter += 1
-                                    else:
-                                        incorrect_counter += 1
+            correct_counter, incorrect_counter = self.analyse_test_docs(
+                annotator, test_docs, None, log_annotations=False
+            )
             accuracy = round(
                 100 * correct_counter / (correct_counter + incorrect_counter), 2
             )
@@ -310,6 +300,51 @@ class TrainingManager:
             docs.extend(loader.load(self.data_dir, nlp, rules_analyzer))
         return docs
 
+    def analyse_test_docs(
+        self,
+        annotator: Annotator,
+        test_docs: List[Tuple[Doc, DocContext]],
+        temp_log_file,
+        log_annotations: bool = True,
+    ) -> Tuple[int, int]:
+        """Annotates *test_docs*, each paired with its context, and returns the numbers of
+        correctly and incorrectly resolved anaphors. The chains and incorrect annotations are written to
+        *temp_log_file* if *log_annotations==True*."""
+        correct_counter = incorrect_counter = 0
+        for test_doc, context in tqdm(test_docs):
+            annotator.annotate(test_doc, used_in_training=True, context=context)
+            if log_annotations:
+                self.writeln(temp_log_file, "test_doc ", test_doc[:100], "... :")
+                self.writeln(temp_log_file)
+                self.writeln(temp_log_file, "Coref chains:")
+                self.writeln(temp_log_file)
+                for chain in test_doc._.coref_chains:
+                    self.writeln(temp_log_file, chain.pretty_representation)
+                self.writeln(temp_log_file)
+                self.writeln(temp_log_file, "Incorrect annotations:")
+                self.writeln(temp_log_file)
+            for token in test_doc:
+                potential_referreds = context.potential_referreds[token.i]
+                if potential_referreds is not None:
+                    for potential_referred in potential_referreds:
+                        if hasattr(potential_referred, "true_in_training"):
+                            for chain in token._.coref_chains:
+                                if Mention(token, False) not in chain:
+                                    continue
+                                if potential_referred in chain:
+                                    correct_counter += 1
+                                else:
+                                    incorrect_counter += 1
+                                    if log_annotations:
+                                        self.log_incorrect_annotation(
+                                            temp_log_file,
+                                            token,
+                                            context,
+                                            token.doc[potential_referred.root_index],
+                                            token.doc[chain.mentions[0].root_index],
+                                        )
+        return correct_counter, incorrect_counter
+
     def train_or_check(self, config_entry_name: str, config_entry, temp_log_file):
         self.writeln(temp_log_file, "Config entry name: ", config_entry_name)
         nlp_name = "_".join((self.lang, config_entry["model"]))
@@ -343,7 +378,7 @@ class TrainingManager:
         # Separate into training and test for first run
         total_words = 0
         docs_to_total_words_position = []
-        for doc in docs:
+        for doc, _ in docs:
             docs_to_total_words_position.append(total_words)
             total_words += len(doc)
         split_index = bisect.bisect_right(
@@ -363,7 +398,9 @@ class TrainingManager:
         )
 
         if self.train_not_check:
-            feature_table = generate_feature_table(docs, nlp)
+            feature_table = generate_feature_table(
+                [doc for doc, _ in docs], nlp, [context for _, context in docs]
+            )
             self.writeln(temp_log_file, "Feature table: ", feature_table.__dict__)
 
             print()
@@ -373,9 +410,13 @@ class TrainingManager:
             prefer_gpu()
             print("Creating Document Pair Infos ...")
             document_pair_infos = []
-            for training_doc in tqdm(training_docs):
+            for training_doc, training_context in tqdm(training_docs):
                 dpi = DocumentPairInfo.from_doc(
-                    training_doc, tendencies_analyzer, ENSEMBLE_SIZE, is_train=True
+                    training_doc,
+                    training_context,
+                    tendencies_analyzer,
+                    ENSEMBLE_SIZE,
+                    is_train=True,
                 )
                 if len(dpi.candidates.dataXd) > 0:
                     document_pair_infos.append(dpi)
@@ -389,44 +430,19 @@ class TrainingManager:
             )
             annotator = Annotator(nlp, vectors_nlp, feature_table, model)
         else:
+            # the reference accuracy is obtained with the unrounded weights of the
+            # Thinc model even if a runtime file with a lower precision is installed
             annotator = get_annotator(
-                nlp=nlp, vectors_nlp=vectors_nlp, config_entry_name=config_entry_name
+                nlp=nlp,
+                vectors_nlp=vectors_nlp,
+                config_entry_name=config_entry_name,
+                use_runtime_file=False,
             )
         self.writeln(temp_log_file)
-        correct_counter = incorrect_counter = 0
         print("Analysing test documents...")
-        for test_doc in tqdm(test_docs):
-            for token in test_doc:
-                token._.coref_chains.chains = []
-            annotator.annotate(test_doc, used_in_training=True)
-            self.writeln(temp_log_file, "test_doc ", test_doc[:100], "... :")
-            self.writeln(temp_log_file)
-            self.writeln(temp_log_file, "Coref chains:")
-            self.writeln(temp_log_file)
-            for chain in test_doc._.coref_chains:
-                self.writeln(temp_log_file, chain.pretty_representation)
-            self.writeln(temp_log_file)
-            self.writeln(temp_log_file, "Incorrect annotations:")
-            self.writeln(temp_log_file)
-            for token in test_doc:
-                if hasattr(token._.coref_chains, "temp_potential_referreds"):
-                    for (
-                        potential_referred
-                    ) in token._.coref_chains.temp_potential_referreds:
-                        if hasattr(potential_referred, "true_in_training"):
-                            for chain in token._.coref_chains:
-                                if Mention(token, False) not in chain:
-                                    continue
-                                if potential_referred in chain:
-                                    correct_counter += 1
-                                else:
-                                    incorrect_counter += 1
-                                    self.log_incorrect_annotation(
-                                        temp_log_file,
-                                        token,
-                                        token.doc[potential_referred.root_index],
-                                        token.doc[chain.mentions[0].root_index],
-                                    )
+        correct_counter, incorrect_counter = self.analyse_test_docs(
+            annotator, test_docs, temp_log_file
+        )
         if len(test_docs) > 0:
             accuracy = round(
                 100 * correct_counter / (correct_counter + incorrect_counter), 2
@@ -455,6 +471,44 @@ class TrainingManager:
                     )
                 )
             )
+        if not self.train_not_check and len(test_docs) > 0:
+            for precision in QUANTIZED_PRECISIONS:
+                quantized_annotator = get_annotator(
+                    nlp=nlp,
+                    vectors_nlp=vectors_nlp,
+                    config_entry_name=config_entry_name,
+                    precision=precision,
+                    use_runtime_file=False,
+                )
+                print("Analysing test documents with", precision, "weights...")
+                (
+                    quantized_correct_counter,
+                    quantized_incorrect_counter,
+                ) = self.analyse_test_docs(
+                    quantized_annotator, test_docs, temp_log_file, log_annotations=False
+                )
+                quantized_accuracy = round(
+                    100
+                    * quantized_correct_counter
+                    / (quantized_correct_counter + quantized_incorrect_counter),
+                    2,
+                )
+                report = "".join(
+                    (
+                        precision,
+                        ": Correct: ",
+                        str(quantized_correct_counter),
+                        "; Incorrect: ",
+                        str(quantized_incorrect_counter),
+                        " (",
+                        str(quantized_accuracy),
+                        "%; difference from float32: ",
+                        str(round(quantized_accuracy - accuracy, 2)),
+                        "%)",
+                    )
+                )
+                self.writeln(temp_log_file, report)
+                print(report)
         if self.train_not_check:
             this_model_dir = os.sep.join(
                 (
@@ -0,0 +1,172 @@
+import numpy
+import pytest
+import spacy
+from thinc.api import fix_random_seed
+from thinc.backends import get_current_ops
+from thinc.types import Ragged
+from coreferee.data_model import FeatureTable
+from coreferee.errors import OutdatedCorefereeModelError
+from coreferee.tendencies import (
+    COMPATIBILITY_MAP_WIDTH,
+    DocumentPairInfo,
+    FusedEnsemble,
+    create_thinc_model,
+    export_runtime,
+    load_runtime,
+)
+
+ops = get_current_ops()
+
+VECTOR_WIDTH = 12
+# The width of a feature map followed by a position map
+HALF_STATIC_WIDTH = 9
+
+
+def _create_ragged(lists):
+    return Ragged(
+        ops.asarray1i([item for sublist in lists for item in sublist]),
+        ops.asarray1i([len(sublist) for sublist in lists]),
+    )
+
+
+def _create_document_pair_info(seed, referrers, candidates_list, antecedents_list):
+    """Generates a *DocumentPairInfo* with random vectors and static inputs that does not
+    require a Spacy model. *candidates_list* holds the candidates of each referrer as
+    indexes into *antecedents_list*. The referrer and antecedent halves of the static
+    inputs are the same for every pair with the same referrer and antecedent, as they
+    are in documents."""
+    rng = numpy.random.default_rng(seed)
+    doc = spacy.blank("en")(" ".join(["word"] * 12))
+    vector_indexes = sorted(
+        set(referrers)
+        | {index for antecedent in antecedents_list for index in antecedent}
+    )
+    vector_rows = numpy.full(len(doc), -1, dtype="int32")
+    vector_rows[vector_indexes] = numpy.arange(len(vector_indexes))
+    token_halves = rng.random((len(doc), HALF_STATIC_WIDTH), dtype=numpy.float32)
+    static_infos = []
+    pointers = []
+    for referrer_index, (referrer, candidates) in enumerate(
+        zip(referrers, candidates_list)
+    ):
+        for candidate in candidates:
+            antecedent = antecedents_list[candidate]
+            if len(antecedent) > 1:
+                antecedent_half = numpy.mean(token_halves[antecedent], axis=0)
+            else:
+                antecedent_half = token_halves[antecedent[0]]
+            static_infos.append(
+                numpy.concatenate(
+                    (
+                        token_halves[referrer],
+                        antecedent_half,
+                        rng.random(COMPATIBILITY_MAP_WIDTH, dtype=numpy.float32),
+                    )
+                )
+            )
+            pointers.append(referrer_index)
+    return DocumentPairInfo(
+        doc=doc,
+        referrers=ops.asarray1i(referrers),
+        antecedents=_create_ragged(antecedents_list),
+        candidates=_create_ragged(candidates_list),
+        referrers2candidates_pointers=ops.asarray1i(pointers),
+        static_infos=ops.asarray2f(static_infos),
+        training_outputs=None,
+        vectors=ops.asarray2f(
+            rng.random((len(vector_indexes), VECTOR_WIDTH), dtype=numpy.float32)
+        ),
+        head_vectors=ops.asarray2f(
+            rng.random((len(vector_indexes), VECTOR_WIDTH), dtype=numpy.float32)
+        ),
+        vector_rows=ops.asarray1i(vector_rows),
+        vector_lemmas=["lemma%d" % index for index in vector_indexes],
+    )
+
+
+@pytest.fixture
+def synthetic_example():
+    document_pair_infos = [
+        _create_document_pair_info(
+            0, [6, 9], [[0, 1, 2], [1, 2, 3]], [[0], [2], [3, 4], [7]]
+        ),
+        _create_document_pair_info(1, [5], [[0, 1]], [[1], [3]]),
+    ]
+    fix_random_seed(0)
+    model = create_thinc_model()
+    model.initialize(X=document_pair_infos)
+    return model, document_pair_infos
+
+
+def _create_feature_table():
+    return FeatureTable(
+        tags=["NN"],
+        morphs=[],
+        ent_types=[""],
+        lefthand_deps_to_children=[],
+        righthand_deps_to_children=[],
+        lefthand_deps_to_parents=["nsubj"],
+        righthand_deps_to_parents=[],
+        parent_tags=[],
+        parent_morphs=[],
+        parent_lefthand_deps_to_children=[],
+        parent_righthand_deps_to_children=[],
+    )
+
+
+def test_fused_ensemble_matches_thinc_model(synthetic_example):
+    model, document_pair_infos = synthetic_example
+    fused_ensemble = FusedEnsemble.from_thinc_model(model)
+    for X in (document_pair_infos[:1], document_pair_infos, document_pair_infos):
+        thinc_outputs = model.predict(X)
+        fused_outputs = fused_ensemble.predict(X)
+        assert len(thinc_outputs) == len(fused_outputs)
+        for thinc_output, fused_output in zip(thinc_outputs, fused_outputs):
+            assert thinc_output.shape == fused_output.shape
+            assert ops.xp.allclose(thinc_output, fused_output, atol=1e-6)
+
+
+@pytest.mark.parametrize(
+    "precision,quantized_dtype,atol",
+    [("float16", numpy.float16, 1e-3), ("int8", numpy.int8, 2e-2)],
+)
+def test_quantized_weights_stay_quantized(
+    synthetic_example, precision, quantized_dtype, atol
+):
+    model, document_pair_infos = synthetic_example
+    fused_ensemble = FusedEnsemble.from_thinc_model(model)
+    quantized_ensemble = fused_ensemble.quantize(precision)
+    assert quantized_ensemble.weights["dense_W1_0"].dtype == quantized_dtype
+    assert quantized_ensemble.weights["squeezer_W1_0"].dtype == numpy.float16
+    assert quantized_ensemble.weights["dense_b1"].dtype == numpy.float32
+    assert sum(
+        weights.nbytes for weights in quantized_ensemble.weights.values()
+    ) < 0.6 * sum(weights.nbytes for weights in fused_ensemble.weights.values())
+    for thinc_output, quantized_output in zip(
+        model.predict(document_pair_infos),
+        quantized_ensemble.predict(document_pair_infos),
+    ):
+        assert ops.xp.allclose(thinc_output, quantized_output, atol=atol)
+    # widening the weights gives an ensemble with the same outputs
+    widened_ensemble = quantized_ensemble.quantize("float32")
+    assert widened_ensemble.weights["dense_W1_0"].dtype == numpy.float32
+    for quantized_output, widened_output in zip(
+        quantized_ensemble.predict(document_pair_infos),
+        widened_ensemble.predict(document_pair_infos),
+    ):
+        assert ops.xp.allclose(quantized_output, widened_output, atol=1e-6)
+
+
+def test_load_runtime_checks_source_digest(synthetic_example, tmp_path):
+    model, document_pair_infos = synthetic_example
+    runtime_filename = str(tmp_path / "runtime.npz")
+    feature_table = _create_feature_table()
+    export_runtime(runtime_filename, model, feature_table, source_digest="digest")
+    loaded_feature_table, fused_ensemble = load_runtime(runtime_filename, "digest")
+    assert loaded_feature_table.__dict__ == feature_table.__dict__
+    for thinc_output, fused_output in zip(
+        model.predict(document_pair_infos), fused_ensemble.predict(document_pair_infos)
+    ):
+        assert ops.xp.allclose(thinc_output, fused_output, atol=1e-6)
+    with pytest.raises(OutdatedCorefereeModelError):
+        load_runtime(runtime_filename, "other digest")
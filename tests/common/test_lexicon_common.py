@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+import unittest
+from coreferee.lexicon import load_lexicon
+
+
+class CommonLexiconTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open(
+            os.sep.join((self.directory, "names.dat")), "w", encoding="utf-8"
+        ) as file:
+            file.write("# comment\nPeter\n  Mary  \nX\n\nMacDonald\n")
+        with open(
+            os.sep.join((self.directory, "verbs.dat")), "w", encoding="utf-8"
+        ) as file:
+            file.write("rain\nsnow\n")
+        with open(
+            os.sep.join((self.directory, "readme.txt")), "w", encoding="utf-8"
+        ) as file:
+            file.write("not a word list\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_word_lists(self):
+        lexicon = load_lexicon(self.directory)
+        self.assertEqual(frozenset(("Peter", "Mary", "MacDonald")), lexicon["names"])
+        self.assertEqual(frozenset(("rain", "snow")), lexicon["verbs"])
+        self.assertTrue("names" in lexicon)
+        self.assertFalse("nouns" in lexicon)
+        self.assertFalse("readme" in lexicon)
+        self.assertTrue(lexicon.contains("names", "Mary"))
+        self.assertFalse(lexicon.contains("names", "mary"))
+        self.assertFalse(lexicon.contains("names", "X"))
+
+    def test_update(self):
+        lexicon = load_lexicon(self.directory)
+        other_directory = tempfile.mkdtemp()
+        try:
+            with open(
+                os.sep.join((other_directory, "nouns.dat")), "w", encoding="utf-8"
+            ) as file:
+                file.write("house\n")
+            lexicon.update(load_lexicon(other_directory))
+        finally:
+            shutil.rmtree(other_directory)
+        self.assertEqual(frozenset(("house",)), lexicon["nouns"])
+        self.assertEqual(frozenset(("rain", "snow")), lexicon["verbs"])
+
+    def test_no_files_written(self):
+        load_lexicon(self.directory)
+        self.assertEqual(
+            ["names.dat", "readme.txt", "verbs.dat"], sorted(os.listdir(self.directory))
+        )
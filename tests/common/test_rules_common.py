@@ -25,9 +25,9 @@ class CommonRulesTest(unittest.TestCase):
 
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory().get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             self.assertEqual(expected_sent_starts,
-                doc._.coref_chains.temp_sent_starts, nlp.meta['name'])
+                context.sent_starts, nlp.meta['name'])
 
         self.all_nlps(func)
 
@@ -41,9 +41,9 @@ class CommonRulesTest(unittest.TestCase):
 
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory().get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             self.assertEqual(expected_sent_indexes,
-                [token._.coref_chains.temp_sent_index for token in doc], nlp.meta['name'])
+                context.sent_indexes, nlp.meta['name'])
 
         self.all_nlps(func)
 
@@ -61,21 +61,21 @@ class CommonRulesTest(unittest.TestCase):
                 return            
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             self.assertEqual(expected_dependent_siblings, str(
-                doc[index]._.coref_chains.temp_dependent_siblings), nlp.meta['name'])
+                [doc[i] for i in context.dependent_siblings[index]]), nlp.meta['name'])
             for sibling in (sibling for sibling in
-                    doc[index]._.coref_chains.temp_dependent_siblings if sibling.i != index):
-                self.assertEqual(doc[index], sibling._.coref_chains.temp_governing_sibling,
+                    [doc[i] for i in context.dependent_siblings[index]] if sibling.i != index):
+                self.assertEqual(doc[index], rules_analyzer.get_governing_sibling(sibling, context),
                     nlp.meta['name'])
             if expected_governing_sibling is None:
-                self.assertEqual(None, doc[index]._.coref_chains.temp_governing_sibling,
+                self.assertEqual(None, rules_analyzer.get_governing_sibling(doc[index], context),
                     nlp.meta['name'])
             else:
                 self.assertEqual(doc[expected_governing_sibling],
-                    doc[index]._.coref_chains.temp_governing_sibling, nlp.meta['name'])
+                    rules_analyzer.get_governing_sibling(doc[index], context), nlp.meta['name'])
             self.assertEqual(expected_has_or_coordination,
-                doc[index]._.coref_chains.temp_has_or_coordination, nlp.meta['name'])
+                context.has_or_coordination[index], nlp.meta['name'])
 
         self.all_nlps(func)
 
@@ -129,8 +129,8 @@ class CommonRulesTest(unittest.TestCase):
 
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory().get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
-            self.assertEqual(expected_quote_array, doc[index]._.coref_chains.temp_quote_array,
+            context = rules_analyzer.initialize(doc)
+            self.assertEqual(expected_quote_array, context.quote_arrays[index],
                 nlp.meta['name'])
 
         self.all_nlps(func)
@@ -152,10 +152,10 @@ class CommonRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory().get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             self.assertEqual(expected_truth,
                 rules_analyzer.is_potential_coreferring_noun_pair(doc[referred_index],
-                doc[referring_index]), nlp.meta['name'])
+                doc[referring_index], context), nlp.meta['name'])
 
         self.all_nlps(func)
 
@@ -233,10 +233,10 @@ class CommonRulesTest(unittest.TestCase):
 
     def test_potentially_independent_nouns_stored_on_token(self):
         doc = self.sm_nlp('They went to look at the space suits')
-        self.sm_rules_analyzer.initialize(doc)
-        self.assertFalse(doc[3]._.coref_chains.temp_potentially_referring)
-        self.assertFalse(doc[6]._.coref_chains.temp_potentially_referring)
-        self.assertTrue(doc[7]._.coref_chains.temp_potentially_referring)
+        context = self.sm_rules_analyzer.initialize(doc)
+        self.assertFalse(context.potentially_referring[3])
+        self.assertFalse(context.potentially_referring[6])
+        self.assertTrue(context.potentially_referring[7])
 
 
     def compare_potential_pair(self, doc_text, referred_index, include_dependent_siblings,
@@ -248,18 +248,18 @@ class CommonRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             assert rules_analyzer.is_independent_noun(doc[referred_index]) or \
-                rules_analyzer.is_potential_anaphor(doc[referred_index])
-            assert rules_analyzer.is_potential_anaphor(doc[referring_index])
-            referred_mention = Mention(doc[referred_index], include_dependent_siblings)
+                rules_analyzer.is_potential_anaphor(doc[referred_index], context)
+            assert rules_analyzer.is_potential_anaphor(doc[referring_index], context)
+            referred_mention = Mention(doc[referred_index], include_dependent_siblings, context)
             if consider_syntax:
                 self.assertEqual(expected_truth,
                     rules_analyzer.language_independent_is_potential_anaphoric_pair(
-                    referred_mention, doc[referring_index]), nlp.meta['name'])
+                    referred_mention, doc[referring_index], context), nlp.meta['name'])
             else:
                 self.assertEqual(expected_truth, rules_analyzer.is_potential_anaphoric_pair(
-                    referred_mention, doc[referring_index], False), nlp.meta['name'])
+                    referred_mention, doc[referring_index], context, False), nlp.meta['name'])
         self.all_nlps(func)
 
 
@@ -383,9 +383,9 @@ class CommonRulesTest(unittest.TestCase):
 
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory().get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             non_or_truths = [token.i for token in doc
-                if rules_analyzer.is_involved_in_non_or_conjunction(token)]
+                if rules_analyzer.is_involved_in_non_or_conjunction(token, context)]
             self.assertEqual(expected_trues, non_or_truths, nlp.meta['name'])
 
         self.all_nlps(func)
@@ -411,9 +411,9 @@ class CommonRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             self.assertEqual(expected_truth,
-                rules_analyzer.is_potentially_introducing_noun(doc[index]),
+                rules_analyzer.is_potentially_introducing_noun(doc[index], context),
                 nlp.meta['name'])
 
         self.all_nlps(func)
@@ -471,9 +471,9 @@ class CommonRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             self.assertEqual(expected_truth,
-                rules_analyzer.is_potentially_referring_back_noun(doc[index]),
+                rules_analyzer.is_potentially_referring_back_noun(doc[index], context),
                 nlp.meta['name'])
 
         self.all_nlps(func)
@@ -521,3 +521,124 @@ class CommonRulesTest(unittest.TestCase):
     def test_potentially_referring_back_threeway_conjunction_third_member_no_article_control(self):
         self.compare_potentially_referring_back_noun('I spoke to some men, women and children',
             8, False)
+
+    def test_predicate_cache(self):
+
+        def func(nlp):
+
+            doc = nlp('Richard and Peter said they had seen Anna. She was happy.')
+            rules_analyzer = RulesAnalyzerFactory().get_rules_analyzer(nlp)
+            context = rules_analyzer.initialize(doc)
+            cache = rules_analyzer.predicate_caches[doc]
+            first_results = [(rules_analyzer.is_independent_noun(token),
+                rules_analyzer.is_potential_anaphor(token, context)) for token in doc]
+            self.assertEqual(len(doc), len(cache.results['is_independent_noun']))
+            hits_before = cache.hits['is_independent_noun']
+            second_results = [(rules_analyzer.is_independent_noun(token),
+                rules_analyzer.is_potential_anaphor(token, context)) for token in doc]
+            self.assertEqual(first_results, second_results)
+            self.assertEqual(hits_before + len(doc), cache.hits['is_independent_noun'])
+            rules_analyzer.release_predicate_cache(doc)
+            self.assertNotIn(doc, rules_analyzer.predicate_caches)
+            hit_rates = rules_analyzer.get_predicate_cache_hit_rates()
+            self.assertTrue(0.0 < hit_rates['is_independent_noun'] <= 1.0)
+            self.assertEqual(first_results, [(rules_analyzer.is_independent_noun(token),
+                rules_analyzer.is_potential_anaphor(token, context)) for token in doc])
+
+        self.all_nlps(func)
+
+    def test_predicate_cache_released_after_annotation(self):
+        doc = self.sm_nlp('Richard said he was happy.')
+        self.assertNotIn(doc, self.sm_rules_analyzer.predicate_caches)
+
+    def test_exclusively_male_and_female_names(self):
+        rules_analyzer = self.sm_rules_analyzer
+        self.assertEqual(rules_analyzer.male_names - rules_analyzer.female_names,
+            rules_analyzer.exclusively_male_names)
+        self.assertEqual(rules_analyzer.female_names - rules_analyzer.male_names,
+            rules_analyzer.exclusively_female_names)
+        self.assertIs(rules_analyzer.exclusively_male_names,
+            rules_analyzer.lexicon['exclusively_male_names'])
+        self.assertIn('Peter', rules_analyzer.exclusively_male_names)
+        self.assertNotIn('Peter', rules_analyzer.exclusively_female_names)
+
+    def test_blacklisted_phrase_flags(self):
+        doc = self.sm_nlp('The issue, for example, was a problem, by the way. No wonder.')
+        rules_analyzer = self.sm_rules_analyzer
+        expected_flags = [rules_analyzer.is_token_in_one_of_phrases(token,
+            rules_analyzer.blacklisted_phrases) for token in doc]
+        self.assertEqual(expected_flags,
+            rules_analyzer.blacklisted_phrase_trie.get_covered_flags(doc))
+        self.assertEqual([3, 4, 10, 11, 12, 14, 15],
+            [index for index, flag in enumerate(expected_flags) if flag])
+        rules_analyzer.initialize(doc)
+        self.assertEqual(expected_flags,
+            [rules_analyzer.is_token_in_blacklisted_phrase(token) for token in doc])
+        rules_analyzer.release_predicate_cache(doc)
+
+    def test_tree_index(self):
+
+        def func(nlp):
+
+            doc = nlp('Richard and Peter said they had seen Anna, who was happy. She left.')
+            rules_analyzer = RulesAnalyzerFactory().get_rules_analyzer(nlp)
+            rules_analyzer.initialize(doc)
+            tree_index = rules_analyzer.get_tree_index(doc)
+            for token in doc:
+                self.assertEqual([t.i for t in token.subtree],
+                    tree_index.get_subtree(token.i), nlp.meta['name'])
+                self.assertEqual([t.i for t in token.ancestors],
+                    tree_index.get_ancestors(token.i), nlp.meta['name'])
+                self.assertEqual(len(list(token.ancestors)), tree_index.depths[token.i],
+                    nlp.meta['name'])
+                for other_token in doc:
+                    self.assertEqual(other_token in token.ancestors,
+                        rules_analyzer.is_ancestor(other_token, token), nlp.meta['name'])
+                    self.assertEqual(other_token in token.subtree,
+                        tree_index.is_in_subtree(other_token.i, token.i), nlp.meta['name'])
+            rules_analyzer.release_predicate_cache(doc)
+            self.assertNotIn(doc, rules_analyzer.tree_indexes)
+
+        self.all_nlps(func)
+
+    def test_coreferring_noun_index_matches_subtree_scan(self):
+
+        def func(nlp):
+
+            doc = nlp('Richard Hudson, the man from the company, said that Hudson had seen the company and that the man from BMW was happy.')
+            rules_analyzer = RulesAnalyzerFactory().get_rules_analyzer(nlp)
+            context = rules_analyzer.initialize(doc)
+            self.assertIsNotNone(rules_analyzer.get_coreferring_noun_index(doc))
+            for referred_token in (t for t in doc if t.pos_ in rules_analyzer.noun_pos):
+                for root in doc:
+                    rules_analyzer.index_coreferring_nouns = False
+                    try:
+                        expected = rules_analyzer.has_potential_coreferring_noun_in_subtree(
+                            [referred_token], root, context)
+                    finally:
+                        rules_analyzer.index_coreferring_nouns = True
+                    self.assertEqual(expected,
+                        rules_analyzer.has_potential_coreferring_noun_in_subtree(
+                            [referred_token], root, context), nlp.meta['name'])
+            rules_analyzer.release_predicate_cache(doc)
+            self.assertNotIn(doc, rules_analyzer.coreferring_noun_indexes)
+
+        self.all_nlps(func)
+
+    def test_propn_texts_and_suffixes(self):
+        doc = self.sm_nlp('Richard Paul Hudson came in. Hudson said Paul was here.')
+        rules_analyzer = self.sm_rules_analyzer
+        rules_analyzer.initialize(doc)
+        self.assertEqual(('Richard Paul Hudson', 'richard paul hudson'),
+            rules_analyzer.get_propn_texts(doc[2]))
+        self.assertIsNone(rules_analyzer.get_propn_texts(doc[3]))
+        self.assertEqual('Hudson', rules_analyzer.get_propn_end('Richard Paul Hudson'))
+        self.assertEqual('ohnsonsmythe',
+            rules_analyzer.get_propn_end('Richard Johnsonsmythe'))
+        self.assertIn('Hudson', rules_analyzer.get_propn_end_suffixes(doc[2])[0])
+        self.assertIn('udson', rules_analyzer.get_propn_end_suffixes(doc[2])[0])
+        self.assertNotIn('Paul Hudson', rules_analyzer.get_propn_end_suffixes(doc[2])[0])
+        self.assertTrue(rules_analyzer.ends_with_propn_subtree(doc[2], doc[6]))
+        self.assertFalse(rules_analyzer.ends_with_propn_subtree(doc[2], doc[8]))
+        self.assertFalse(rules_analyzer.ends_with_propn_subtree(doc[6], doc[2]))
+        rules_analyzer.release_predicate_cache(doc)
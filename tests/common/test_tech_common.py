@@ -6,6 +6,8 @@ from threading import Thread
 import spacy
 from spacy.tokens import Doc
 from thinc.util import prefer_gpu, require_cpu
+from coreferee.annotation import MentionSets
+from coreferee.data_model import Mention
 from coreferee.test_utils import get_nlps
 
 NUMBER_OF_THREADS = 50
@@ -130,6 +132,145 @@ class CommonUtilsTest(unittest.TestCase):
         self.assertEqual('[]', str(docs[1][1]._.coref_chains))
         self.assertEqual('[0: [0], [2]]', str(docs[1][2]._.coref_chains))
 
+    def test_processing_in_pipe_batches(self):
+        doc_texts = ['Peter told Paul he was dissatisfied.', 'Peter said he was dissatisfied',
+            'Richard came in. He said he had finished', 'There was nobody there.'] * 3
+        docs = list(self.sm_nlp.pipe(doc_texts, batch_size=5))
+        self.assertEqual(len(doc_texts), len(docs))
+        for doc_text, doc in zip(doc_texts, docs):
+            self.assertEqual(str(self.sm_nlp(doc_text)._.coref_chains), str(doc._.coref_chains))
+            for token in doc:
+                self.assertEqual(
+                    str(self.sm_nlp(doc_text)[token.i]._.coref_chains), str(token._.coref_chains))
+
+    def test_processing_in_pipe_batches_with_error(self):
+        doc_texts = ['Peter told Paul he was dissatisfied.', 'Peter said he was dissatisfied',
+            'Richard came in. He said he had finished'] * 2
+        tendencies_analyzer = self.sm_nlp.get_pipe('coreferee').annotator.tendencies_analyzer
+        score_batch = tendencies_analyzer.score_batch
+
+        def score_batch_unless_richard(docs, contexts, thinc_ensemble):
+            if any(doc[0].text == 'Richard' for doc in docs):
+                raise RuntimeError('Scoring failed')
+            score_batch(docs, contexts, thinc_ensemble)
+
+        tendencies_analyzer.score_batch = score_batch_unless_richard
+        try:
+            docs = list(self.sm_nlp.pipe(doc_texts, batch_size=3))
+        finally:
+            del tendencies_analyzer.score_batch
+        self.assertEqual(len(doc_texts), len(docs))
+        for doc_text, doc in zip(doc_texts, docs):
+            if doc_text.startswith('Richard'):
+                self.assertEqual('[]', str(doc._.coref_chains))
+                for token in doc:
+                    self.assertEqual('[]', str(token._.coref_chains))
+            else:
+                self.assertEqual(str(self.sm_nlp(doc_text)._.coref_chains),
+                    str(doc._.coref_chains))
+                for token in doc:
+                    self.assertEqual(str(self.sm_nlp(doc_text)[token.i]._.coref_chains),
+                        str(token._.coref_chains))
+
+    def test_coreferring_noun_search_with_and_without_index(self):
+        text = ('Richard Hudson came in. The man said Hudson had seen a dog. The dog '
+            'was big. Richard saw the man and the dog. The dogs and the man left.')
+        rules_analyzer = self.sm_nlp.get_pipe('coreferee').annotator.rules_analyzer
+        try:
+            rules_analyzer.index_coreferring_nouns = False
+            doc = self.sm_nlp(text)
+            expected = [str(doc._.coref_chains)] + [str(token._.coref_chains) for token in doc]
+        finally:
+            rules_analyzer.index_coreferring_nouns = True
+        doc = self.sm_nlp(text)
+        self.assertEqual(
+            expected, [str(doc._.coref_chains)] + [str(token._.coref_chains) for token in doc])
+
+    def test_no_intermediate_state_left_after_annotation(self):
+        doc = self.sm_nlp('Peter told Paul he was dissatisfied. The man said he had finished.')
+        chains = list(doc._.coref_chains)
+        mentions = [mention for chain in chains for mention in chain]
+        self.assertGreater(len(mentions), 0)
+        for annotation_object in [doc._.coref_chains] + [
+                token._.coref_chains for token in doc] + chains + mentions:
+            self.assertEqual([], [name for name in vars(annotation_object) if
+                name.startswith('temp_')])
+        rules_analyzer = self.sm_nlp.get_pipe('coreferee').annotator.rules_analyzer
+        self.assertNotIn(doc, rules_analyzer.predicate_caches)
+
+    def test_empty_chain_holders_after_failed_annotation(self):
+
+        def fail(doc):
+            raise RuntimeError('Annotation failed')
+
+        annotator = self.sm_nlp.get_pipe('coreferee').annotator
+        annotator.annotate = fail
+        try:
+            doc = self.sm_nlp('Peter told Paul he was dissatisfied.')
+        finally:
+            del annotator.annotate
+        self.assertEqual('[]', str(doc._.coref_chains))
+        for token in doc:
+            self.assertEqual('[]', str(token._.coref_chains))
+
+    def test_mention_sets_record_and_delete_for_rewind(self):
+
+        def get_chains(mention_sets):
+            return sorted(sorted(mention.root_index for mention in mention_list) for
+                mention_list in mention_sets.get_chains())
+
+        doc = self.sm_nlp('Peter told Paul he was dissatisfied. The man said he had finished.')
+        mention_sets = MentionSets()
+        mention_sets.record_mention(Mention(doc[0], False), doc[3])
+        mention_sets.record_mention(Mention(doc[2], False), doc[8])
+        self.assertEqual([[0, 3], [2, 8]], get_chains(mention_sets))
+        mention_sets.record_mention(Mention(doc[8], False), doc[10])
+        self.assertEqual([[0, 3], [2, 8, 10]], get_chains(mention_sets))
+        mention_sets.delete_for_rewind(doc[10], doc[10])
+        self.assertEqual([[0, 3], [2, 8]], get_chains(mention_sets))
+        mention_sets.delete_for_rewind(doc[8], doc[10])
+        self.assertEqual([[0, 3]], get_chains(mention_sets))
+        mention_sets.delete_for_rewind(doc[3], doc[10])
+        self.assertEqual([], get_chains(mention_sets))
+
+    def test_mention_sets_merge_smaller_into_larger(self):
+        doc = self.sm_nlp('Peter told Paul he was dissatisfied. The man said he had finished.')
+        mention_sets = MentionSets()
+        mention_sets.record_mention(Mention(doc[0], False), doc[3])
+        mention_sets.record_mention(Mention(doc[3], False), doc[10])
+        mention_sets.record_mention(Mention(doc[3], False), doc[12])
+        mention_sets.record_mention(Mention(doc[2], False), doc[8])
+        larger_mention_set = mention_sets.get_mention_set(
+            mention_sets.without_coordination, 0)
+        mention_sets.record_mention(Mention(doc[8], False), doc[10])
+        self.assertEqual([0, 2, 3, 8, 10, 12], sorted(mention.root_index for mention in
+            larger_mention_set))
+        for token_index in (0, 2, 3, 8, 10, 12):
+            self.assertIs(larger_mention_set, mention_sets.get_mention_set(
+                mention_sets.without_coordination, token_index))
+        self.assertEqual([larger_mention_set], mention_sets.get_chains())
+
+    def test_mention_sets_merge_with_coordination(self):
+        doc = self.sm_nlp('Peter and Mary were there. They said he knew he thought he had finished.')
+        coordinated_mention = Mention()
+        coordinated_mention.root_index = 0
+        coordinated_mention.token_indexes = [0, 2]
+        mention_sets = MentionSets()
+        mention_sets.record_mention(Mention(doc[0], False), doc[8])
+        mention_sets.record_mention(Mention(doc[0], False), doc[10])
+        mention_sets.record_mention(Mention(doc[0], False), doc[12])
+        mention_sets.record_mention(coordinated_mention, doc[6])
+        coordinated_mention_set = mention_sets.get_mention_set(
+            mention_sets.with_coordination, 2)
+        # the set with the mention with coordination absorbs the larger set
+        mention_sets.record_mention(coordinated_mention, doc[12])
+        self.assertEqual([[0], [0, 2], [6], [8], [10], [12]], sorted(mention.token_indexes
+            for mention in coordinated_mention_set))
+        for token_index in (0, 6, 8, 10, 12):
+            self.assertIs(coordinated_mention_set, mention_sets.get_mention_set(
+                mention_sets.without_coordination, token_index))
+        self.assertEqual([coordinated_mention_set], mention_sets.get_chains())
+
     def test_use_in_multithreading_context(self):
 
         def parse(text, queue):
@@ -40,223 +40,303 @@ class CommonTendenciesTest(unittest.TestCase):
     def test_get_feature_map_simple_mention(self):
 
         doc = self.sm_nlp('Richard said he was entering the big house')
-        self.sm_rules_analyzer.initialize(doc)
+        context = self.sm_rules_analyzer.initialize(doc)
         mention = Mention(doc[0], False)
-        feature_map = self.sm_tendencies_analyzer.get_feature_map(mention, doc)
+        feature_map = self.sm_tendencies_analyzer.get_feature_map(mention, doc, context)
         self.assertEqual(len(self.sm_feature_table), len(feature_map))
-        self.assertEqual(mention.temp_feature_map, feature_map)
         if nlp.meta['version'] == '3.2.0':            
             self.assertEqual(
                 [0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 1, 0],
-                feature_map)
+                feature_map.tolist())
         elif nlp.meta['version'] == '3.3.0':
             self.assertEqual(
                 [0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 1, 0],
-                feature_map)
+                feature_map.tolist())
         else:
             self.fail("Unsupported version.")
 
-        feature_map = self.sm_tendencies_analyzer.get_feature_map(Mention(doc[2], False), doc)
+        feature_map = self.sm_tendencies_analyzer.get_feature_map(Mention(doc[2], False), doc, context)
         self.assertEqual(len(self.sm_feature_table), len(feature_map))
         if nlp.meta['version'] == '3.2.0':            
             self.assertEqual(
                 [0, 0, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 1, 0, 0, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1],
-                feature_map)
+                feature_map.tolist())
         elif nlp.meta['version'] == '3.3.0':
             self.assertEqual(
                 [0, 0, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 1, 0, 0, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1],
-                feature_map)
+                feature_map.tolist())
 
     @unittest.skipIf(train_version_mismatch, train_version_mismatch_message)
     def test_get_feature_map_simple_token(self):
 
         doc = self.sm_nlp('Richard said he was entering the big house')
-        self.sm_rules_analyzer.initialize(doc)
-        feature_map = self.sm_tendencies_analyzer.get_feature_map(doc[0], doc)
+        context = self.sm_rules_analyzer.initialize(doc)
+        feature_map = self.sm_tendencies_analyzer.get_feature_map(doc[0], doc, context)
         self.assertEqual(len(self.sm_feature_table), len(feature_map))
-        self.assertEqual(doc[0]._.coref_chains.temp_feature_map, feature_map)
         if nlp.meta['version'] == '3.2.0':            
             self.assertEqual(
                 [0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 1, 0],
-                feature_map)
+                feature_map.tolist())
         elif nlp.meta['version'] == '3.3.0':
             self.assertEqual(
                 [0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 1, 0],
-                feature_map)
+                feature_map.tolist())
         else:
             self.fail("Unsupported version.")
 
-        feature_map = self.sm_tendencies_analyzer.get_feature_map(doc[2], doc)
+        feature_map = self.sm_tendencies_analyzer.get_feature_map(doc[2], doc, context)
         self.assertEqual(len(self.sm_feature_table), len(feature_map))
         if nlp.meta['version'] == '3.2.0':            
             self.assertEqual(
                 [0, 0, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 1, 0, 0, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1],
-                feature_map)
+                feature_map.tolist())
         elif nlp.meta['version'] == '3.3.0':
             self.assertEqual(
                 [0, 0, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 1, 0, 0, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1],
-                feature_map)
+                feature_map.tolist())
 
     @unittest.skipIf(train_version_mismatch, train_version_mismatch_message)
     def test_get_feature_map_conjunction(self):
 
         doc = self.sm_nlp('Richard and the man said they were entering the big house')
-        self.sm_rules_analyzer.initialize(doc)
-        feature_map = self.sm_tendencies_analyzer.get_feature_map(Mention(doc[0], False), doc)
+        context = self.sm_rules_analyzer.initialize(doc)
+        feature_map = self.sm_tendencies_analyzer.get_feature_map(Mention(doc[0], False), doc, context)
         self.assertEqual(len(self.sm_feature_table), len(feature_map))
         if nlp.meta['version'] == '3.2.0':            
             self.assertEqual(
                 [0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 1, 0],
-                feature_map)
+                feature_map.tolist())
         elif nlp.meta['version'] == '3.3.0':            
             self.assertEqual(
                 [0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 1, 0],
-                feature_map)
+                feature_map.tolist())
         else:
             self.fail("Unsupported version")
 
 
-        feature_map = self.sm_tendencies_analyzer.get_feature_map(Mention(doc[0], True), doc)
+        feature_map = self.sm_tendencies_analyzer.get_feature_map(Mention(doc[0], True, context), doc, context)
         self.assertEqual(len(self.sm_feature_table), len(feature_map))
         if nlp.meta['version'] == '3.2.0':            
             self.assertEqual(
                 [0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 1, 0],
-                feature_map)
+                feature_map.tolist())
         elif nlp.meta['version'] == '3.3.0':            
             self.assertEqual(
                 [0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 1, 0],
-                feature_map)
+                feature_map.tolist())
 
-        feature_map = self.sm_tendencies_analyzer.get_feature_map(Mention(doc[5], False), doc)
+        feature_map = self.sm_tendencies_analyzer.get_feature_map(Mention(doc[5], False), doc, context)
         self.assertEqual(len(self.sm_feature_table), len(feature_map))
         if nlp.meta['version'] == '3.2.0':            
             self.assertEqual(
                 [0, 0, 1, 1, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 0, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1],
-                feature_map)
+                feature_map.tolist())
         elif nlp.meta['version'] == '3.3.0':            
             self.assertEqual(
                 [0, 0, 1, 1, 0, 0, 1, 1, 1, 0, 0, 0, 0, 1, 0, 0, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1],
-                feature_map)
+                feature_map.tolist())
 
-    def test_get_position_map_first_sentence_token(self):
+    def test_feature_map_encoder_writes_into_row(self):
+
+        doc = self.sm_nlp('Richard and the man said they were entering the big house')
+        context = self.sm_rules_analyzer.initialize(doc)
+        encoder = self.sm_tendencies_analyzer.feature_map_encoder
+        self.assertEqual(len(self.sm_feature_table), encoder.width)
+        rows = np.zeros((2, encoder.width), dtype=np.uint8)
+        returned_row = encoder.encode(doc[0], [doc[3]], out=rows[1])
+        self.assertIs(rows, returned_row.base)
+        self.assertEqual([0] * encoder.width, rows[0].tolist())
+        self.assertEqual(
+            self.sm_tendencies_analyzer.get_feature_map(Mention(doc[0], True, context), doc, context).tolist(),
+            rows[1].tolist())
+
+    def test_feature_map_encoder_token_own_head_without_root_dep(self):
 
         doc = self.sm_nlp('Richard said he was entering the big house')
+        # 'dobj' is in the table as a righthand dependency to a parent because of 'house'
+        doc[1].dep_ = 'dobj'
+        self.assertEqual(doc[1], doc[1].head)
         self.sm_rules_analyzer.initialize(doc)
-        position_map = self.sm_tendencies_analyzer.get_position_map(doc[0], doc)
-        self.assertEqual(doc[0]._.coref_chains.temp_position_map, position_map)
-        self.assertEqual([0, 1, 1, 0, 0, 0, 0], position_map)
+        encoder = self.sm_tendencies_analyzer.feature_map_encoder
+        self.assertIn(doc[1].dep, encoder.righthand_deps_to_parents)
+        feature_map = encoder.encode(doc[1])
+        deps_to_parents_columns = list(encoder.lefthand_deps_to_parents.values()) + list(
+            encoder.righthand_deps_to_parents.values())
+        self.assertEqual([0] * len(deps_to_parents_columns),
+            feature_map[deps_to_parents_columns].tolist())
+        # the parent blocks describe the token itself
+        self.assertEqual(1, feature_map[encoder.parent_tags[doc[1].tag]])
+
+    def test_compute_document_maps(self):
+
+        doc = self.sm_nlp('Richard and the man said they were entering the big house')
+        context = self.sm_rules_analyzer.initialize(doc)
+        mentions = [Mention(doc[0], False), Mention(doc[0], True, context), Mention(doc[3], False)]
+        expected_maps = [
+            (self.sm_tendencies_analyzer.get_feature_map(mention, doc, context).tolist(),
+            self.sm_tendencies_analyzer.get_position_map(mention, doc, context).tolist())
+            for mention in mentions]
+        self.sm_tendencies_analyzer.compute_document_maps(doc, context)
+        self.assertEqual([0, 3, 5],
+            np.flatnonzero(context.map_rows >= 0).tolist())
+        self.assertEqual(expected_maps, [
+            (self.sm_tendencies_analyzer.get_feature_map(mention, doc, context).tolist(),
+            self.sm_tendencies_analyzer.get_position_map(mention, doc, context).tolist())
+            for mention in mentions])
+
+    def _get_expected_tree_statistics(self, token):
+        depth = len(list(token.ancestors))
+        return [
+            depth,
+            len([ancestor for ancestor in token.ancestors if ancestor.pos_ == 'VERB']),
+            len([1 for other in token.sent if other.i < token.i and
+                len(list(other.ancestors)) == depth]),
+            sorted(child.i for child in token.head.children).index(token.i)
+                if token.head.i != token.i and token.dep_ != 'ROOT' else -1
+            ]
+
+    def test_get_tree_statistics(self):
 
-        position_map = self.sm_tendencies_analyzer.get_position_map(doc[2], doc)
-        self.assertEqual([2, 2, 2, 0, 0, 0, 0], position_map)
+        doc = self.sm_nlp(
+            'Richard and the man said they were entering the big house. They saw it. '
+            'The house that Richard said he had built was standing on the hill.')
+        context = self.sm_rules_analyzer.initialize(doc)
+        tree_statistics = self.sm_tendencies_analyzer.get_tree_statistics(doc, context)
+        self.assertIs(context.tree_statistics, tree_statistics)
+        for token in doc:
+            self.assertEqual(self._get_expected_tree_statistics(token),
+                tree_statistics[token.i].tolist())
+
+    def test_get_tree_statistics_token_own_head_without_root_dep(self):
+
+        doc = self.sm_nlp('Richard said he was entering the big house. They saw it.')
+        doc[1].dep_ = 'dep'
+        self.assertEqual(doc[1], doc[1].head)
+        context = self.sm_rules_analyzer.initialize(doc)
+        tree_statistics = self.sm_tendencies_analyzer.get_tree_statistics(doc, context)
+        self.assertIs(context.tree_statistics, tree_statistics)
+        self.assertEqual([0, 0, 0, -1], tree_statistics[1].tolist())
+        for token in doc:
+            self.assertEqual(self._get_expected_tree_statistics(token),
+                tree_statistics[token.i].tolist())
+
+    def test_get_position_map_first_sentence_token(self):
+
+        doc = self.sm_nlp('Richard said he was entering the big house')
+        context = self.sm_rules_analyzer.initialize(doc)
+        position_map = self.sm_tendencies_analyzer.get_position_map(doc[0], doc, context)
+        self.assertEqual([0, 1, 1, 0, 0, 0, 0], position_map.tolist())
+
+        position_map = self.sm_tendencies_analyzer.get_position_map(doc[2], doc, context)
+        self.assertEqual([2, 2, 2, 0, 0, 0, 0], position_map.tolist())
 
-        position_map = self.sm_tendencies_analyzer.get_position_map(doc[6], doc)
-        self.assertEqual([6, 3, 2, 1, 1, 0, 0], position_map)
+        position_map = self.sm_tendencies_analyzer.get_position_map(doc[6], doc, context)
+        self.assertEqual([6, 3, 2, 1, 1, 0, 0], position_map.tolist())
 
     def test_get_position_map_first_sentence_mention(self):
 
         doc = self.sm_nlp('Richard said he was entering the big house')
-        self.sm_rules_analyzer.initialize(doc)
+        context = self.sm_rules_analyzer.initialize(doc)
         mention = Mention(doc[0], False)
-        position_map = self.sm_tendencies_analyzer.get_position_map(mention, doc)
-        self.assertEqual(mention.temp_position_map, position_map)
-        self.assertEqual([0, 1, 1, 0, 0, 0, 0], position_map)
+        position_map = self.sm_tendencies_analyzer.get_position_map(mention, doc, context)
+        self.assertEqual([0, 1, 1, 0, 0, 0, 0], position_map.tolist())
 
-        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[2], False), doc)
-        self.assertEqual([2, 2, 2, 0, 0, 0, 0], position_map)
+        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[2], False), doc, context)
+        self.assertEqual([2, 2, 2, 0, 0, 0, 0], position_map.tolist())
 
-        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[6], False), doc)
-        self.assertEqual([6, 3, 2, 1, 1, 0, 0], position_map)
+        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[6], False), doc, context)
+        self.assertEqual([6, 3, 2, 1, 1, 0, 0], position_map.tolist())
 
     def test_get_position_map_second_sentence_token(self):
 
         doc = self.sm_nlp(
             'This is a preceding sentence. Richard said he was entering the big house')
-        self.sm_rules_analyzer.initialize(doc)
-        position_map = self.sm_tendencies_analyzer.get_position_map(doc[6], doc)
-        self.assertEqual([0, 1, 1, 0, 0, 0, 0], position_map)
+        context = self.sm_rules_analyzer.initialize(doc)
+        position_map = self.sm_tendencies_analyzer.get_position_map(doc[6], doc, context)
+        self.assertEqual([0, 1, 1, 0, 0, 0, 0], position_map.tolist())
 
-        position_map = self.sm_tendencies_analyzer.get_position_map(doc[8], doc)
-        self.assertEqual([2, 2, 2, 0, 0, 0, 0], position_map)
+        position_map = self.sm_tendencies_analyzer.get_position_map(doc[8], doc, context)
+        self.assertEqual([2, 2, 2, 0, 0, 0, 0], position_map.tolist())
 
     def test_get_position_map_second_sentence_mention(self):
 
         doc = self.sm_nlp(
             'This is a preceding sentence. Richard said he was entering the big house')
-        self.sm_rules_analyzer.initialize(doc)
-        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[6], False), doc)
-        self.assertEqual([0, 1, 1, 0, 0, 0, 0], position_map)
+        context = self.sm_rules_analyzer.initialize(doc)
+        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[6], False), doc, context)
+        self.assertEqual([0, 1, 1, 0, 0, 0, 0], position_map.tolist())
 
-        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[8], False), doc)
-        self.assertEqual([2, 2, 2, 0, 0, 0, 0], position_map)
+        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[8], False), doc, context)
+        self.assertEqual([2, 2, 2, 0, 0, 0, 0], position_map.tolist())
 
     def test_get_position_map_root_token(self):
 
         doc = self.sm_nlp('Richard said he was entering the big house')
-        self.sm_rules_analyzer.initialize(doc)
-        position_map = self.sm_tendencies_analyzer.get_position_map(doc[1], doc)
-        self.assertEqual([1, 0, 0, 0, -1, 0, 0], position_map)
+        context = self.sm_rules_analyzer.initialize(doc)
+        position_map = self.sm_tendencies_analyzer.get_position_map(doc[1], doc, context)
+        self.assertEqual([1, 0, 0, 0, -1, 0, 0], position_map.tolist())
 
     def test_get_position_map_root_mention(self):
 
         doc = self.sm_nlp('Richard said he was entering the big house')
-        self.sm_rules_analyzer.initialize(doc)
-        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[1], False), doc)
-        self.assertEqual([1, 0, 0, 0, -1, 0, 0], position_map)
+        context = self.sm_rules_analyzer.initialize(doc)
+        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[1], False), doc, context)
+        self.assertEqual([1, 0, 0, 0, -1, 0, 0], position_map.tolist())
 
     def test_get_position_map_conjunction_first_sentence_tokens(self):
 
         doc = self.sm_nlp('Peter and Jane spoke to him and her.')
-        self.sm_rules_analyzer.initialize(doc)
-        position_map = self.sm_tendencies_analyzer.get_position_map(doc[0], doc)
-        self.assertEqual([0, 1, 1, 0, 0, -1, 0], position_map)
-        position_map = self.sm_tendencies_analyzer.get_position_map(doc[2], doc)
-        self.assertEqual([2, 2, 1, 1, 1, -1, 1], position_map)
-        position_map = self.sm_tendencies_analyzer.get_position_map(doc[5], doc)
-        self.assertEqual([5, 2, 1, 2, 0, -1, 0], position_map)
-        position_map = self.sm_tendencies_analyzer.get_position_map(doc[7], doc)
-        self.assertEqual([7, 3, 1, 1, 1, -1, 1], position_map)
+        context = self.sm_rules_analyzer.initialize(doc)
+        position_map = self.sm_tendencies_analyzer.get_position_map(doc[0], doc, context)
+        self.assertEqual([0, 1, 1, 0, 0, -1, 0], position_map.tolist())
+        position_map = self.sm_tendencies_analyzer.get_position_map(doc[2], doc, context)
+        self.assertEqual([2, 2, 1, 1, 1, -1, 1], position_map.tolist())
+        position_map = self.sm_tendencies_analyzer.get_position_map(doc[5], doc, context)
+        self.assertEqual([5, 2, 1, 2, 0, -1, 0], position_map.tolist())
+        position_map = self.sm_tendencies_analyzer.get_position_map(doc[7], doc, context)
+        self.assertEqual([7, 3, 1, 1, 1, -1, 1], position_map.tolist())
 
     def test_get_position_map_conjunction_first_sentence_mentions_false(self):
 
         doc = self.sm_nlp('Peter and Jane spoke to him and her.')
-        self.sm_rules_analyzer.initialize(doc)
-        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[0], False), doc)
-        self.assertEqual([0, 1, 1, 0, 0, -1, 0], position_map)
-        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[2], False), doc)
-        self.assertEqual([2, 2, 1, 1, 1, -1, 1], position_map)
-        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[5], False), doc)
-        self.assertEqual([5, 2, 1, 2, 0, -1, 0], position_map)
-        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[7], False), doc)
-        self.assertEqual([7, 3, 1, 1, 1, -1, 1], position_map)
+        context = self.sm_rules_analyzer.initialize(doc)
+        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[0], False), doc, context)
+        self.assertEqual([0, 1, 1, 0, 0, -1, 0], position_map.tolist())
+        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[2], False), doc, context)
+        self.assertEqual([2, 2, 1, 1, 1, -1, 1], position_map.tolist())
+        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[5], False), doc, context)
+        self.assertEqual([5, 2, 1, 2, 0, -1, 0], position_map.tolist())
+        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[7], False), doc, context)
+        self.assertEqual([7, 3, 1, 1, 1, -1, 1], position_map.tolist())
 
     def test_get_position_map_conjunction_second_sentence_mentions_false(self):
         doc = self.sm_nlp('A preceding sentence. Peter and Jane spoke to him and her.')
-        self.sm_rules_analyzer.initialize(doc)
-        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[4], False), doc)
-        self.assertEqual([0, 1, 1, 0, 0, -1, 0], position_map)
-        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[6], False), doc)
-        self.assertEqual([2, 2, 1, 1, 1, -1, 1], position_map)
-        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[9], False), doc)
-        self.assertEqual([5, 2, 1, 2, 0, -1, 0], position_map)
-        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[11], False), doc)
-        self.assertEqual([7, 3, 1, 1, 1, -1, 1], position_map)
+        context = self.sm_rules_analyzer.initialize(doc)
+        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[4], False), doc, context)
+        self.assertEqual([0, 1, 1, 0, 0, -1, 0], position_map.tolist())
+        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[6], False), doc, context)
+        self.assertEqual([2, 2, 1, 1, 1, -1, 1], position_map.tolist())
+        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[9], False), doc, context)
+        self.assertEqual([5, 2, 1, 2, 0, -1, 0], position_map.tolist())
+        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[11], False), doc, context)
+        self.assertEqual([7, 3, 1, 1, 1, -1, 1], position_map.tolist())
 
     def test_get_position_map_conjunction_first_sentence_mentions_true(self):
 
         doc = self.sm_nlp('Peter and Jane spoke to him and her.')
-        self.sm_rules_analyzer.initialize(doc)
-        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[0], True), doc)
-        self.assertEqual([0, 1, 1, 0, 0, 1, 0], position_map)
-        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[5], True), doc)
-        self.assertEqual([5, 2, 1, 2, 0, 1, 0], position_map)
+        context = self.sm_rules_analyzer.initialize(doc)
+        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[0], True, context), doc, context)
+        self.assertEqual([0, 1, 1, 0, 0, 1, 0], position_map.tolist())
+        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[5], True, context), doc, context)
+        self.assertEqual([5, 2, 1, 2, 0, 1, 0], position_map.tolist())
 
     def test_get_position_map_conjunction_second_sentence_mentions_true(self):
         doc = self.sm_nlp('A preceding sentence. Peter and Jane spoke to him and her.')
-        self.sm_rules_analyzer.initialize(doc)
-        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[4], True), doc)
-        self.assertEqual([0, 1, 1, 0, 0, 1, 0], position_map)
-        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[9], True), doc)
-        self.assertEqual([5, 2, 1, 2, 0, 1, 0], position_map)
+        context = self.sm_rules_analyzer.initialize(doc)
+        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[4], True, context), doc, context)
+        self.assertEqual([0, 1, 1, 0, 0, 1, 0], position_map.tolist())
+        position_map = self.sm_tendencies_analyzer.get_position_map(Mention(doc[9], True, context), doc, context)
+        self.assertEqual([5, 2, 1, 2, 0, 1, 0], position_map.tolist())
 
     def compare_compatibility_map(self, expected_compatibility_map, returned_compatibility_map):
         self.assertEqual(expected_compatibility_map[0], returned_compatibility_map[0])
@@ -269,13 +349,13 @@ class CommonTendenciesTest(unittest.TestCase):
     def test_get_compatibility_map_simple(self):
 
         doc = self.sm_nlp('Richard said he was entering the big house')
-        self.sm_rules_analyzer.initialize(doc)
+        context = self.sm_rules_analyzer.initialize(doc)
         if nlp.meta['version'] == '3.2.0':            
             self.compare_compatibility_map([2, 0, 1, 0.29702997, 3],
-                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[2]))
+                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[2], context))
         elif nlp.meta['version'] == '3.3.0':            
             self.compare_compatibility_map([2, 0, 1, 0.34484535, 3],
-                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[2]))
+                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[2], context))
         else:
             self.fail("Unsupported version")
 
@@ -284,13 +364,13 @@ class CommonTendenciesTest(unittest.TestCase):
     def test_get_compatibility_map_coordination(self):
 
         doc = self.sm_nlp('Richard and Jane said he was entering the big house')
-        self.sm_rules_analyzer.initialize(doc)
+        context = self.sm_rules_analyzer.initialize(doc)
         if nlp.meta['version'] == '3.2.0':            
             self.compare_compatibility_map([4, 0, 1, 0.28721756, 3],
-                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], True), doc[4]))
+                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], True, context), doc[4], context))
         elif nlp.meta['version'] == '3.3.0':            
             self.compare_compatibility_map([4, 0, 1, 0.37224450, 3],
-                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], True), doc[4]))
+                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], True, context), doc[4], context))
         else:
             self.fail("Unsupported version")
 
@@ -298,13 +378,13 @@ class CommonTendenciesTest(unittest.TestCase):
     def test_get_compatibility_map_different_sentences(self):
 
         doc = self.sm_nlp('Richard called. He said he was entering the big house')
-        self.sm_rules_analyzer.initialize(doc)
+        context = self.sm_rules_analyzer.initialize(doc)
         if nlp.meta['version'] == '3.2.0':            
             self.compare_compatibility_map([3, 1, 0, 0.47986302, 6],
-                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[3]))
+                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[3], context))
         elif nlp.meta['version'] == '3.3.0':            
             self.compare_compatibility_map([3, 1, 0, 0.42599782, 6],
-                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[3]))
+                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[3], context))
         else:
             self.fail("Unsupported version")
 
@@ -312,14 +392,14 @@ class CommonTendenciesTest(unittest.TestCase):
     def test_get_compatibility_map_same_sentence_no_governance(self):
 
         doc = self.sm_nlp('After Richard arrived, he said he was entering the big house')
-        self.sm_rules_analyzer.initialize(doc)
+        context = self.sm_rules_analyzer.initialize(doc)
         
         if nlp.meta['version'] == '3.2.0':            
             self.compare_compatibility_map([4, 0, 0, -0.02203778, 5],
-                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[4]))
+                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[4], context))
         elif nlp.meta['version'] == '3.3.0':            
             self.compare_compatibility_map([4, 0, 0, -0.00317071, 5],
-                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[4]))
+                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[4], context))
         else:
             self.fail("Unsupported version")
 
@@ -328,13 +408,13 @@ class CommonTendenciesTest(unittest.TestCase):
     def test_get_compatibility_map_same_sentence_lefthand_sibling_governance(self):
 
         doc = self.lg_nlp('Richard said Peter and he were entering the big house')
-        self.lg_rules_analyzer.initialize(doc)
+        context = self.lg_rules_analyzer.initialize(doc)
         if self.lg_nlp.meta['version'] == '3.2.0':            
             self.compare_compatibility_map([4, 0, 1, 0.15999001, 3],
-                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[4]))
+                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[4], context))
         elif self.lg_nlp.meta['version'] == '3.3.0':            
             self.compare_compatibility_map([4, 1, 0, 0.15999001, 4],
-                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[4]))
+                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[4], context))
         else:
             self.fail("Unsupported version.")
 
@@ -342,13 +422,13 @@ class CommonTendenciesTest(unittest.TestCase):
     def test_get_compatibility_map_same_sentence_lefthand_sibling_no_governance(self):
 
         doc = self.sm_nlp('After Richard arrived, Peter and he said he was entering the big house')
-        self.sm_rules_analyzer.initialize(doc)
+        context = self.sm_rules_analyzer.initialize(doc)
         if self.sm_nlp.meta['version'] == '3.2.0':            
             self.compare_compatibility_map([5, 0, 0, 0.29553932, 6],
-                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[1], False), doc[6]))
+                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[1], False), doc[6], context))
         elif self.sm_nlp.meta['version'] == '3.3.0':            
             self.compare_compatibility_map([5, 0, 0, 0.40949851, 6],
-                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[1], False), doc[6]))
+                self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[1], False), doc[6], context))
         else:
             self.fail("Unsupported version.")
 
@@ -356,57 +436,79 @@ class CommonTendenciesTest(unittest.TestCase):
     def test_get_cosine_similarity_lg(self):
 
         doc = self.lg_nlp('After Richard arrived, he said he was entering the big house')
-        self.lg_rules_analyzer.initialize(doc)
+        context = self.lg_rules_analyzer.initialize(doc)
         self.compare_compatibility_map([4, 0, 0, 0.3336621, 5],
-            self.lg_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[4]))
+            self.lg_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[4], context))
 
     @unittest.skipIf(train_version_mismatch, train_version_mismatch_message)
     def test_get_cosine_similarity_lg_no_vector_1(self):
 
         doc = self.lg_nlp('After Richard arfewfewfrived, he said he was entering the big house')
-        self.lg_rules_analyzer.initialize(doc)
+        context = self.lg_rules_analyzer.initialize(doc)
 
         self.compare_compatibility_map([4, 0, 0, 0.59521705, 5],
-            self.lg_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[4]))
+            self.lg_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[4], context))
 
     @unittest.skipIf(train_version_mismatch, train_version_mismatch_message)
     def test_get_cosine_similarity_lg_no_vector_2(self):
 
         doc = self.lg_nlp('After Richard arrived, he saifefefwefefd he was entering the big house')
-        self.lg_rules_analyzer.initialize(doc)
+        context = self.lg_rules_analyzer.initialize(doc)
         self.compare_compatibility_map([4, 0, 0, 0.59521705, 5],
-            self.lg_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[4]))
+            self.lg_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[4], context))
+
+    def compare_head_similarities(self, nlp, rules_analyzer, tendencies_analyzer):
+        doc = nlp('After Richard arrived, he said he was entering the big house. Richard. He.')
+        context = rules_analyzer.initialize(doc)
+        pairs = [(mention, token) for token in doc for mention in
+            context.potential_referreds[token.i] or []]
+        self.assertGreater(len(pairs), 0)
+        expected_similarities = [tendencies_analyzer.get_compatibility_map(
+            Mention(doc[mention.root_index], False), token, context)[3] for mention, token in pairs]
+        similarities = tendencies_analyzer.compute_head_similarities(doc,
+            [mention for mention, _ in pairs], [token.i for _, token in pairs])
+        self.assertEqual(len(pairs), len(similarities))
+        for similarity, expected_similarity in zip(similarities, expected_similarities):
+            self.assertAlmostEqual(expected_similarity, similarity, places=5)
+
+    def test_compute_head_similarities_sm(self):
+        self.compare_head_similarities(self.sm_nlp, self.sm_rules_analyzer,
+            self.sm_tendencies_analyzer)
+
+    def test_compute_head_similarities_lg(self):
+        self.compare_head_similarities(self.lg_nlp, self.lg_rules_analyzer,
+            self.lg_tendencies_analyzer)
 
     @unittest.skipIf(train_version_mismatch, train_version_mismatch_message)
     def test_get_cosine_similarity_sm_root_1(self):
 
         doc = self.sm_nlp('Richard. He said he was entering the big house')
-        self.sm_rules_analyzer.initialize(doc)
+        context = self.sm_rules_analyzer.initialize(doc)
 
         self.compare_compatibility_map([2, 1, 0, -1, 1],
-            self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[2]))
+            self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[2], context))
 
     @unittest.skipIf(train_version_mismatch, train_version_mismatch_message)
     def test_get_cosine_similarity_sm_root_2(self):
 
         doc = self.sm_nlp('Richard arrived. He.')
-        self.sm_rules_analyzer.initialize(doc)
+        context = self.sm_rules_analyzer.initialize(doc)
         self.compare_compatibility_map([3, 1, 0, -1, 1],
-            self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[3]))
+            self.sm_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[3], context))
 
     @unittest.skipIf(train_version_mismatch, train_version_mismatch_message)
     def test_get_cosine_similarity_lg_root_1(self):
 
         doc = self.lg_nlp('Richard. He said he was entering the big house')
-        self.lg_rules_analyzer.initialize(doc)
+        context = self.lg_rules_analyzer.initialize(doc)
 
         self.compare_compatibility_map([2, 1, 0, -1, 1],
-            self.lg_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[2]))
+            self.lg_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[2], context))
 
     @unittest.skipIf(train_version_mismatch, train_version_mismatch_message)
     def test_get_cosine_similarity_lg_root_2(self):
 
         doc = self.lg_nlp('Richard arrived. He.')
-        self.lg_rules_analyzer.initialize(doc)
+        context = self.lg_rules_analyzer.initialize(doc)
         self.compare_compatibility_map([3, 1, 0, -1, 1],
-            self.lg_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[3]))
+            self.lg_tendencies_analyzer.get_compatibility_map(Mention(doc[0], False), doc[3], context))
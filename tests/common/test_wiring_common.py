@@ -1,9 +1,13 @@
 from logging import debug
 from xml.dom.minidom import Document
+import numpy
 import pytest
 import spacy
+from coreferee.annotation import Annotator
+from coreferee.errors import OutdatedCorefereeModelError
 from coreferee.rules import RulesAnalyzerFactory
 from coreferee.tendencies import *
+from coreferee.training.train import TrainingManager
 from coreferee.test_utils import get_nlps
 from thinc.backends import get_current_ops
 
@@ -21,10 +25,15 @@ def setup_simple_example():
     nlp = spacy.load("en_core_web_sm")
     rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
     doc = nlp("Sarah's sister flew to Silicon Valley via Berlin. She loved it.")
-    rules_analyzer.initialize(doc)
-    feature_table = generate_feature_table([doc], nlp)
+    context = rules_analyzer.initialize(doc)
+    feature_table = generate_feature_table([doc], nlp, [context])
     tendencies_analyzer = TendenciesAnalyzer(rules_analyzer, nlp, feature_table)
-    return DocumentPairInfo.from_doc(doc, tendencies_analyzer, 5), nlp
+    return (
+        DocumentPairInfo.from_doc(doc, context, tendencies_analyzer, 5),
+        nlp,
+        tendencies_analyzer,
+        context,
+    )
 
 
 @pytest.fixture(params=["en_core_web_sm", "en_core_web_md"])
@@ -32,10 +41,10 @@ def setup_three_sentences_with_conjunction(request):
     nlp = spacy.load(request.param)
     rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
     doc = nlp("People. Richard and the man said they were entering the big house. He.")
-    rules_analyzer.initialize(doc)
-    feature_table = generate_feature_table([doc], nlp)
+    context = rules_analyzer.initialize(doc)
+    feature_table = generate_feature_table([doc], nlp, [context])
     tendencies_analyzer = TendenciesAnalyzer(rules_analyzer, nlp, feature_table)
-    return (DocumentPairInfo.from_doc(doc, tendencies_analyzer, 5), nlp)
+    return (DocumentPairInfo.from_doc(doc, context, tendencies_analyzer, 5), nlp)
 
 
 @pytest.fixture
@@ -43,13 +52,15 @@ def setup_training_doc():
     nlp = spacy.load("en_core_web_sm")
     doc = nlp("Sarah's sister flew to Silicon Valley via Berlin. She loved it.")
     rules_analyzer = RulesAnalyzerFactory().get_rules_analyzer(nlp)
-    rules_analyzer.initialize(doc)
-    feature_table = generate_feature_table([doc], nlp)
+    context = rules_analyzer.initialize(doc)
+    feature_table = generate_feature_table([doc], nlp, [context])
     tendencies_analyzer = TendenciesAnalyzer(rules_analyzer, nlp, feature_table)
     # linguistically nonsensical labels that only serve to test wiring
-    doc[10]._.coref_chains.temp_potential_referreds[2].true_in_training = True
-    doc[12]._.coref_chains.temp_potential_referreds[0].true_in_training = True
-    return DocumentPairInfo.from_doc(doc, tendencies_analyzer, 5, is_train=True)
+    context.potential_referreds[10][2].true_in_training = True
+    context.potential_referreds[12][0].true_in_training = True
+    return DocumentPairInfo.from_doc(
+        doc, context, tendencies_analyzer, 5, is_train=True
+    )
 
 
 @pytest.fixture
@@ -57,17 +68,20 @@ def setup_training_doc_with_spanned():
     nlp = spacy.load("en_core_web_sm")
     doc = nlp("Sarah's sister flew to Silicon Valley via Berlin. She loved it.")
     rules_analyzer = RulesAnalyzerFactory().get_rules_analyzer(nlp)
-    rules_analyzer.initialize(doc)
-    feature_table = generate_feature_table([doc], nlp)
+    context = rules_analyzer.initialize(doc)
+    feature_table = generate_feature_table([doc], nlp, [context])
     tendencies_analyzer = TendenciesAnalyzer(rules_analyzer, nlp, feature_table)
     # linguistically nonsensical labels that only serve to test wiring
-    doc[10]._.coref_chains.temp_potential_referreds[1].spanned_in_training = True
-    doc[10]._.coref_chains.temp_potential_referreds[2].true_in_training = True
-    return DocumentPairInfo.from_doc(doc, tendencies_analyzer, 5, is_train=True)
+    context.potential_referreds[10][1].spanned_in_training = True
+    context.potential_referreds[10][2].true_in_training = True
+    return DocumentPairInfo.from_doc(
+        doc, context, tendencies_analyzer, 5, is_train=True
+    )
 
 @pytest.mark.skipif(train_version_mismatch, reason=train_version_mismatch_message)
 def test_dpi_normal(setup_simple_example):
-    document_pair_info, _ = setup_simple_example
+    document_pair_info, _, tendencies_analyzer, context = setup_simple_example
+    doc = document_pair_info.doc
     assert list(document_pair_info.referrers) == [10, 12]
     assert list(document_pair_info.antecedents.dataXd) == [0, 2, 6, 8]
     assert list(document_pair_info.antecedents.lengths) == [1, 1, 1, 1]
@@ -78,36 +92,54 @@ def test_dpi_normal(setup_simple_example):
     for index in range(6):
         pointed_to_referrer = document_pair_info.referrers2candidates_pointers[index]
         referrer = document_pair_info.referrers[pointed_to_referrer]
-        referrer_feature_map = document_pair_info.doc[
-            referrer
-        ]._.coref_chains.temp_feature_map
+        referrer_feature_map = tendencies_analyzer.get_feature_map(doc[referrer], doc, context)
         assert list(document_pair_info.static_infos[index][:33]) == list(
             referrer_feature_map
         )
-        referrer_position_map = document_pair_info.doc[
-            referrer
-        ]._.coref_chains.temp_position_map
+        referrer_position_map = tendencies_analyzer.get_position_map(doc[referrer], doc, context)
         assert list(document_pair_info.static_infos[index][33:40]) == list(
             referrer_position_map
         )
         working_antecedent_index = index if index < 4 else index - 4
-        working_mention = document_pair_info.doc[
-            referrer
-        ]._.coref_chains.temp_potential_referreds[working_antecedent_index]
-        antecedent_feature_map = working_mention.temp_feature_map
+        working_mention = context.potential_referreds[referrer][
+            working_antecedent_index
+        ]
+        antecedent_feature_map = tendencies_analyzer.get_feature_map(working_mention, doc, context)
         assert list(document_pair_info.static_infos[index][40:73]) == list(
             antecedent_feature_map
         )
-        antecedent_position_map = working_mention.temp_position_map
+        antecedent_position_map = tendencies_analyzer.get_position_map(working_mention, doc, context)
         assert list(document_pair_info.static_infos[index][73:80]) == list(
             antecedent_position_map
         )
-        compatibility_map = working_mention.temp_compatibility_map
+        head_similarity = tendencies_analyzer.compute_head_similarities(
+            doc, [working_mention], [referrer]
+        )[0]
+        compatibility_map = tendencies_analyzer.get_compatibility_map(
+            working_mention, doc[referrer], context, head_similarity
+        )
         assert list(document_pair_info.static_infos[index][80:]) == list(
             compatibility_map
         )
 
 
+def test_dpi_vectors(setup_simple_example):
+    document_pair_info, _, _, context = setup_simple_example
+    vector_token_indexes = [0, 2, 6, 8, 10, 12]
+    assert list(ops.xp.flatnonzero(document_pair_info.vector_rows >= 0)) == (
+        vector_token_indexes
+    )
+    for row, token_index in enumerate(vector_token_indexes):
+        assert document_pair_info.vector_rows[token_index] == row
+        assert list(document_pair_info.vectors[row]) == list(
+            context.vectors[token_index]
+        )
+        assert list(document_pair_info.head_vectors[row]) == list(
+            context.head_vectors[token_index]
+        )
+    assert len(document_pair_info.vector_lemmas) == len(vector_token_indexes)
+
+
 def test_dpi_training(setup_training_doc):
     document_pair_info = setup_training_doc
 
@@ -215,7 +247,7 @@ def test_referrer_head_vectors(setup_three_sentences_with_conjunction):
 
 
 def test_softmax_sequences(setup_simple_example):
-    document_pair_info, _ = setup_simple_example
+    document_pair_info, _, _, _ = setup_simple_example
 
     grouped_outputs, _ = apply_softmax_sequences_forward(
         apply_softmax_sequences(),
@@ -243,10 +275,158 @@ def test_softmax_sequences(setup_simple_example):
     assert ops.xp.sum(first_candidate_grouped_outputs[:, 0]) == 1.0
 
 
+def _create_initialized_model(document_pair_info):
+    model = create_thinc_model()
+    model.initialize(X=[document_pair_info])
+    return model
+
+
+def _check_fused_ensemble_parity(document_pair_info):
+    model = _create_initialized_model(document_pair_info)
+    fused_ensemble = FusedEnsemble.from_thinc_model(model)
+    for X in ([document_pair_info], [document_pair_info, document_pair_info]):
+        thinc_outputs = model.predict(X)
+        fused_outputs = fused_ensemble.predict(X)
+        assert len(thinc_outputs) == len(fused_outputs)
+        for thinc_output, fused_output in zip(thinc_outputs, fused_outputs):
+            assert thinc_output.shape == fused_output.shape
+            assert ops.xp.allclose(thinc_output, fused_output, atol=1e-6)
+            assert ops.xp.allclose(
+                ops.xp.mean(thinc_output, axis=1),
+                ops.xp.mean(fused_output, axis=1),
+                atol=1e-6,
+            )
+
+
+def test_fused_ensemble_parity(setup_simple_example):
+    document_pair_info, _, _, _ = setup_simple_example
+    _check_fused_ensemble_parity(document_pair_info)
+
+
+def test_fused_ensemble_parity_with_coordination(setup_three_sentences_with_conjunction):
+    document_pair_info, _ = setup_three_sentences_with_conjunction
+    _check_fused_ensemble_parity(document_pair_info)
+
+
+def test_fused_ensemble_squeezed_vector_cache(setup_three_sentences_with_conjunction):
+    document_pair_info, nlp = setup_three_sentences_with_conjunction
+    model = _create_initialized_model(document_pair_info)
+    thinc_outputs = model.predict([document_pair_info])
+    for squeezer_cache_size in (10000, 1):
+        fused_ensemble = FusedEnsemble.from_thinc_model(
+            model, squeezer_cache_size=squeezer_cache_size
+        )
+        for _ in range(2):
+            fused_outputs = fused_ensemble.predict([document_pair_info])
+            for thinc_output, fused_output in zip(thinc_outputs, fused_outputs):
+                assert ops.xp.allclose(thinc_output, fused_output, atol=1e-6)
+        for cache in fused_ensemble.squeezed_vector_caches:
+            if nlp.meta["name"].endswith("sm"):
+                # the vectors come from the tensors, which depend on the context
+                assert len(cache) == 0
+            else:
+                assert 0 < len(cache) <= squeezer_cache_size
+
+
+def test_export_and_load_runtime(setup_simple_example, tmp_path):
+    document_pair_info, nlp, tendencies_analyzer, _ = setup_simple_example
+    model = _create_initialized_model(document_pair_info)
+    feature_table = generate_feature_table([document_pair_info.doc], nlp)
+    runtime_filename = str(tmp_path / "runtime.npz")
+    export_runtime(runtime_filename, model, feature_table)
+    loaded_feature_table, fused_ensemble = load_runtime(runtime_filename)
+    assert loaded_feature_table.__dict__ == feature_table.__dict__
+    thinc_outputs = model.predict([document_pair_info])
+    fused_outputs = fused_ensemble.predict([document_pair_info])
+    assert len(thinc_outputs) == len(fused_outputs)
+    for thinc_output, fused_output in zip(thinc_outputs, fused_outputs):
+        assert ops.xp.allclose(thinc_output, fused_output, atol=1e-6)
+
+
+@pytest.mark.parametrize(
+    "precision,quantized_dtype,atol",
+    [("float16", numpy.float16, 1e-3), ("int8", numpy.int8, 2e-2)],
+)
+def test_quantized_fused_ensemble(
+    setup_simple_example, precision, quantized_dtype, atol
+):
+    document_pair_info, _, _, _ = setup_simple_example
+    model = _create_initialized_model(document_pair_info)
+    fused_ensemble = FusedEnsemble.from_thinc_model(model)
+    quantized_weights = FusedEnsemble.quantize_weights(fused_ensemble.weights, precision)
+    assert quantized_weights["dense_W1_0"].dtype == quantized_dtype
+    assert quantized_weights["dense_b1"].dtype == numpy.float32
+    assert sum(weights.nbytes for weights in quantized_weights.values()) < sum(
+        weights.nbytes for weights in fused_ensemble.weights.values()
+    )
+    quantized_ensemble = fused_ensemble.quantize(precision)
+    assert quantized_ensemble.precision == precision
+    # the weights are held with the lower precision and only widened for each
+    # multiplication
+    assert quantized_ensemble.weights["dense_W1_0"].dtype == quantized_dtype
+    thinc_outputs = model.predict([document_pair_info])
+    quantized_outputs = quantized_ensemble.predict([document_pair_info])
+    for thinc_output, quantized_output in zip(thinc_outputs, quantized_outputs):
+        assert ops.xp.allclose(thinc_output, quantized_output, atol=atol)
+    assert quantized_ensemble.quantize("float32").precision == "float32"
+
+
+def test_export_and_load_quantized_runtime(setup_simple_example, tmp_path):
+    document_pair_info, nlp, _, _ = setup_simple_example
+    model = _create_initialized_model(document_pair_info)
+    runtime_filename = str(tmp_path / "runtime.npz")
+    export_runtime(
+        runtime_filename,
+        model,
+        generate_feature_table([document_pair_info.doc], nlp),
+        "int8",
+    )
+    _, fused_ensemble = load_runtime(runtime_filename)
+    assert fused_ensemble.precision == "int8"
+    quantized_ensemble = FusedEnsemble.from_thinc_model(model).quantize("int8")
+    expected_outputs = quantized_ensemble.predict([document_pair_info])
+    for expected_output, output in zip(
+        expected_outputs, fused_ensemble.predict([document_pair_info])
+    ):
+        assert ops.xp.allclose(expected_output, output)
+    with pytest.raises(ValueError):
+        fused_ensemble.quantize("int4")
+
+
+def test_load_runtime_with_wrong_format_version(setup_simple_example, tmp_path):
+    document_pair_info, nlp, _, _ = setup_simple_example
+    model = _create_initialized_model(document_pair_info)
+    runtime_filename = str(tmp_path / "runtime.npz")
+    export_runtime(
+        runtime_filename, model, generate_feature_table([document_pair_info.doc], nlp)
+    )
+    with numpy.load(runtime_filename) as arrays:
+        contents = dict(arrays)
+    contents["format_version"] = numpy.array(RUNTIME_FORMAT_VERSION + 1)
+    numpy.savez(runtime_filename, **contents)
+    with pytest.raises(OutdatedCorefereeModelError):
+        load_runtime(runtime_filename)
+
+
+def test_load_runtime_with_wrong_source_digest(setup_simple_example, tmp_path):
+    document_pair_info, nlp, _, _ = setup_simple_example
+    model = _create_initialized_model(document_pair_info)
+    runtime_filename = str(tmp_path / "runtime.npz")
+    export_runtime(
+        runtime_filename,
+        model,
+        generate_feature_table([document_pair_info.doc], nlp),
+        source_digest="digest",
+    )
+    load_runtime(runtime_filename, "digest")
+    with pytest.raises(OutdatedCorefereeModelError):
+        load_runtime(runtime_filename, "other digest")
+
+
 @pytest.mark.skipif(train_version_mismatch, reason=train_version_mismatch_message)
 def test_generate_feature_table(setup_simple_example):
 
-    document_pair_info, nlp = setup_simple_example
+    document_pair_info, nlp, _, _ = setup_simple_example
     feature_table = generate_feature_table([document_pair_info.doc], nlp)
     assert feature_table.__dict__ == {
         "tags": ["NN", "NNP", "PRP"],
@@ -271,3 +451,22 @@ def test_generate_feature_table(setup_simple_example):
     }
 
     assert len(feature_table) == 33
+
+
+def test_analyse_initialized_test_doc(setup_simple_example, tmp_path):
+    document_pair_info, nlp, tendencies_analyzer, context = setup_simple_example
+    doc = document_pair_info.doc
+    # linguistically nonsensical label that only serves to test wiring
+    context.potential_referreds[10][2].true_in_training = True
+    model = _create_initialized_model(document_pair_info)
+    annotator = Annotator(nlp, nlp, tendencies_analyzer.feature_table, model)
+    # the analysis of test documents does not depend on the training configuration
+    training_manager = TrainingManager.__new__(TrainingManager)
+    with open(tmp_path / "log.txt", "w") as temp_log_file:
+        correct_counter, incorrect_counter = training_manager.analyse_test_docs(
+            annotator, [(doc, context)], temp_log_file
+        )
+    assert correct_counter + incorrect_counter <= 1
+    assert doc._.coref_chains is not None
+    for token in doc:
+        assert token._.coref_chains is not None
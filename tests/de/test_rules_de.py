@@ -34,37 +34,37 @@ class GermanRulesTest(unittest.TestCase):
 
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             self.assertEqual(
                 expected_dependent_siblings,
-                str(doc[index]._.coref_chains.temp_dependent_siblings),
+                str([doc[i] for i in context.dependent_siblings[index]]),
                 nlp.meta["name"],
             )
             for sibling in (
                 sibling
-                for sibling in doc[index]._.coref_chains.temp_dependent_siblings
+                for sibling in [doc[i] for i in context.dependent_siblings[index]]
                 if sibling.i != index
             ):
                 self.assertEqual(
                     doc[index],
-                    sibling._.coref_chains.temp_governing_sibling,
+                    rules_analyzer.get_governing_sibling(sibling, context),
                     nlp.meta["name"],
                 )
             if expected_governing_sibling is None:
                 self.assertEqual(
                     None,
-                    doc[index]._.coref_chains.temp_governing_sibling,
+                    rules_analyzer.get_governing_sibling(doc[index], context),
                     nlp.meta["name"],
                 )
             else:
                 self.assertEqual(
                     doc[expected_governing_sibling],
-                    doc[index]._.coref_chains.temp_governing_sibling,
+                    rules_analyzer.get_governing_sibling(doc[index], context),
                     nlp.meta["name"],
                 )
             self.assertEqual(
                 expected_has_or_coordination,
-                doc[index]._.coref_chains.temp_has_or_coordination,
+                context.has_or_coordination[index],
                 nlp.meta["name"],
             )
 
@@ -235,9 +235,9 @@ class GermanRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             per_indexes = [
-                token.i for token in doc if rules_analyzer.is_potential_anaphor(token)
+                token.i for token in doc if rules_analyzer.is_potential_anaphor(token, context)
             ]
             self.assertEqual(expected_per_indexes, per_indexes, nlp.meta["name"])
 
@@ -471,16 +471,16 @@ class GermanRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             assert rules_analyzer.is_independent_noun(
                 doc[referred_index]
-            ) or rules_analyzer.is_potential_anaphor(doc[referred_index])
-            assert rules_analyzer.is_potential_anaphor(doc[referring_index])
-            referred_mention = Mention(doc[referred_index], include_dependent_siblings)
+            ) or rules_analyzer.is_potential_anaphor(doc[referred_index], context)
+            assert rules_analyzer.is_potential_anaphor(doc[referring_index], context)
+            referred_mention = Mention(doc[referred_index], include_dependent_siblings, context)
             self.assertEqual(
                 expected_truth,
                 rules_analyzer.is_potential_anaphoric_pair(
-                    referred_mention, doc[referring_index], directly
+                    referred_mention, doc[referring_index], context, directly
                 ),
                 nlp.meta["name"],
             )
@@ -1021,23 +1021,23 @@ class GermanRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             assert rules_analyzer.is_independent_noun(
                 doc[referred_index]
-            ) or rules_analyzer.is_potential_anaphor(doc[referred_index])
-            assert rules_analyzer.is_potential_anaphor(doc[referring_index])
-            referred_mention = Mention(doc[referred_index], include_dependent_siblings)
+            ) or rules_analyzer.is_potential_anaphor(doc[referred_index], context)
+            assert rules_analyzer.is_potential_anaphor(doc[referring_index], context)
+            referred_mention = Mention(doc[referred_index], include_dependent_siblings, context)
             self.assertEqual(
                 expected_truth,
                 rules_analyzer.is_potential_anaphoric_pair(
-                    referred_mention, doc[referring_index], True
+                    referred_mention, doc[referring_index], context, True
                 ),
                 nlp.meta["name"],
             )
             self.assertEqual(
                 expected_reflexive_truth,
                 rules_analyzer.is_potential_reflexive_pair(
-                    referred_mention, doc[referring_index]
+                    referred_mention, doc[referring_index], context
                 ),
                 nlp.meta["name"],
             )
@@ -1308,11 +1308,11 @@ class GermanRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory().get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             self.assertEqual(
                 expected_truth,
                 rules_analyzer.is_potential_coreferring_noun_pair(
-                    doc[referred_index], doc[referring_index]
+                    doc[referred_index], doc[referring_index], context
                 ),
                 nlp.meta["name"],
             )
@@ -1323,3 +1323,49 @@ class GermanRulesTest(unittest.TestCase):
         self.compare_potential_noun_pair(
             "von Bach über Beethoven, Brahms, Brückner.", 5, 7, False
         )
+
+    def test_gender_number_info_cached_per_token(self):
+        def func(nlp):
+            doc = nlp("Die Frau und der Mann kamen herein. Sie sahen ihn.")
+            rules_analyzer = RulesAnalyzerFactory().get_rules_analyzer(nlp)
+            context = rules_analyzer.initialize(doc)
+            cache = rules_analyzer.predicate_caches[doc]
+            results = cache.results["get_gender_number_info"]
+            self.assertTrue(len(results) > 0, nlp.meta["name"])
+            self.assertTrue(
+                cache.hits["get_gender_number_info"] > 0, nlp.meta["name"]
+            )
+            for (token_index, args), info in results.items():
+                self.assertEqual(
+                    info,
+                    rules_analyzer.__class__.get_gender_number_info.__wrapped__(
+                        rules_analyzer, doc[token_index], context, *args
+                    ),
+                    nlp.meta["name"],
+                )
+            rules_analyzer.release_predicate_cache(doc)
+
+        self.all_nlps(func)
+
+    def test_gender_number_info_cache_key_independent_of_call_style(self):
+        def func(nlp):
+            doc = nlp("Die Frau und der Mann kamen herein. Sie sahen ihn.")
+            rules_analyzer = RulesAnalyzerFactory().get_rules_analyzer(nlp)
+            context = rules_analyzer.initialize(doc)
+            cache = rules_analyzer.predicate_caches[doc]
+            positional_info = rules_analyzer.get_gender_number_info(doc[1], context, False)
+            misses = cache.misses["get_gender_number_info"]
+            hits = cache.hits["get_gender_number_info"]
+            keyword_info = rules_analyzer.get_gender_number_info(
+                doc[1], context, directly=False
+            )
+            self.assertEqual(positional_info, keyword_info, nlp.meta["name"])
+            self.assertEqual(
+                misses, cache.misses["get_gender_number_info"], nlp.meta["name"]
+            )
+            self.assertEqual(
+                hits + 1, cache.hits["get_gender_number_info"], nlp.meta["name"]
+            )
+            rules_analyzer.release_predicate_cache(doc)
+
+        self.all_nlps(func)
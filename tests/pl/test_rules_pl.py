@@ -41,37 +41,37 @@ class PolishRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             self.assertEqual(
                 expected_dependent_siblings,
-                str(doc[index]._.coref_chains.temp_dependent_siblings),
+                str([doc[i] for i in context.dependent_siblings[index]]),
                 nlp.meta["name"],
             )
             for sibling in (
                 sibling
-                for sibling in doc[index]._.coref_chains.temp_dependent_siblings
+                for sibling in [doc[i] for i in context.dependent_siblings[index]]
                 if sibling.i != index
             ):
                 self.assertEqual(
                     doc[index],
-                    sibling._.coref_chains.temp_governing_sibling,
+                    rules_analyzer.get_governing_sibling(sibling, context),
                     nlp.meta["name"],
                 )
             if expected_governing_sibling is None:
                 self.assertEqual(
                     None,
-                    doc[index]._.coref_chains.temp_governing_sibling,
+                    rules_analyzer.get_governing_sibling(doc[index], context),
                     nlp.meta["name"],
                 )
             else:
                 self.assertEqual(
                     doc[expected_governing_sibling],
-                    doc[index]._.coref_chains.temp_governing_sibling,
+                    rules_analyzer.get_governing_sibling(doc[index], context),
                     nlp.meta["name"],
                 )
             self.assertEqual(
                 expected_has_or_coordination,
-                doc[index]._.coref_chains.temp_has_or_coordination,
+                context.has_or_coordination[index],
                 nlp.meta["name"],
             )
 
@@ -304,9 +304,9 @@ class PolishRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             per_indexes = [
-                token.i for token in doc if rules_analyzer.is_potential_anaphor(token)
+                token.i for token in doc if rules_analyzer.is_potential_anaphor(token, context)
             ]
             self.assertEqual(expected_per_indexes, per_indexes, nlp.meta["name"])
 
@@ -421,16 +421,16 @@ class PolishRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             assert rules_analyzer.is_independent_noun(
                 doc[referred_index]
-            ) or rules_analyzer.is_potential_anaphor(doc[referred_index])
-            assert rules_analyzer.is_potential_anaphor(doc[referring_index])
-            referred_mention = Mention(doc[referred_index], include_dependent_siblings)
+            ) or rules_analyzer.is_potential_anaphor(doc[referred_index], context)
+            assert rules_analyzer.is_potential_anaphor(doc[referring_index], context)
+            referred_mention = Mention(doc[referred_index], include_dependent_siblings, context)
             self.assertEqual(
                 expected_truth,
                 rules_analyzer.is_potential_anaphoric_pair(
-                    referred_mention, doc[referring_index], directly
+                    referred_mention, doc[referring_index], context, directly
                 ),
                 nlp.meta["name"],
             )
@@ -1173,23 +1173,23 @@ class PolishRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             assert rules_analyzer.is_independent_noun(
                 doc[referred_index]
-            ) or rules_analyzer.is_potential_anaphor(doc[referred_index])
-            assert rules_analyzer.is_potential_anaphor(doc[referring_index])
-            referred_mention = Mention(doc[referred_index], include_dependent_siblings)
+            ) or rules_analyzer.is_potential_anaphor(doc[referred_index], context)
+            assert rules_analyzer.is_potential_anaphor(doc[referring_index], context)
+            referred_mention = Mention(doc[referred_index], include_dependent_siblings, context)
             self.assertEqual(
                 expected_truth,
                 rules_analyzer.is_potential_anaphoric_pair(
-                    referred_mention, doc[referring_index], True
+                    referred_mention, doc[referring_index], context, True
                 ),
                 nlp.meta["name"],
             )
             self.assertEqual(
                 expected_reflexive_truth,
                 rules_analyzer.is_potential_reflexive_pair(
-                    referred_mention, doc[referring_index]
+                    referred_mention, doc[referring_index], context
                 ),
                 nlp.meta["name"],
             )
@@ -1453,10 +1453,10 @@ class PolishRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             self.assertEqual(
                 expected_truth,
-                rules_analyzer.is_potentially_introducing_noun(doc[index]),
+                rules_analyzer.is_potentially_introducing_noun(doc[index], context),
                 nlp.meta["name"],
             )
 
@@ -1486,10 +1486,10 @@ class PolishRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             self.assertEqual(
                 expected_truth,
-                rules_analyzer.is_potentially_referring_back_noun(doc[index]),
+                rules_analyzer.is_potentially_referring_back_noun(doc[index], context),
                 nlp.meta["name"],
             )
 
@@ -47,22 +47,22 @@ class RussianRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             self.assertEqual(expected_dependent_siblings, str(
-                doc[index]._.coref_chains.temp_dependent_siblings), nlp.meta['name'])
+                [doc[i] for i in context.dependent_siblings[index]]), nlp.meta['name'])
             for sibling in (sibling for sibling in
-                            doc[index]._.coref_chains.temp_dependent_siblings if
+                            [doc[i] for i in context.dependent_siblings[index]] if
                             sibling.i != index):
-                self.assertEqual(doc[index], sibling._.coref_chains.temp_governing_sibling,
+                self.assertEqual(doc[index], rules_analyzer.get_governing_sibling(sibling, context),
                                  nlp.meta['name'])
             if expected_governing_sibling is None:
-                self.assertEqual(None, doc[index]._.coref_chains.temp_governing_sibling,
+                self.assertEqual(None, rules_analyzer.get_governing_sibling(doc[index], context),
                                  nlp.meta['name'])
             else:
                 self.assertEqual(doc[expected_governing_sibling],
-                                 doc[index]._.coref_chains.temp_governing_sibling, nlp.meta['name'])
+                                 rules_analyzer.get_governing_sibling(doc[index], context), nlp.meta['name'])
             self.assertEqual(expected_has_or_coordination,
-                             doc[index]._.coref_chains.temp_has_or_coordination, nlp.meta['name'])
+                             context.has_or_coordination[index], nlp.meta['name'])
 
         self.all_nlps(func)
 
@@ -230,9 +230,9 @@ class RussianRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             per_indexes = [token.i for token in doc if
-                           rules_analyzer.is_potential_anaphor(token)]
+                           rules_analyzer.is_potential_anaphor(token, context)]
             self.assertEqual(expected_per_indexes, per_indexes, nlp.meta['name'])
 
         self.all_nlps(func)
@@ -272,13 +272,13 @@ class RussianRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             assert rules_analyzer.is_independent_noun(doc[referred_index]) or \
-                   rules_analyzer.is_potential_anaphor(doc[referred_index])
-            assert rules_analyzer.is_potential_anaphor(doc[referring_index])
-            referred_mention = Mention(doc[referred_index], include_dependent_siblings)
+                   rules_analyzer.is_potential_anaphor(doc[referred_index], context)
+            assert rules_analyzer.is_potential_anaphor(doc[referring_index], context)
+            referred_mention = Mention(doc[referred_index], include_dependent_siblings, context)
             self.assertEqual(expected_truth, rules_analyzer.is_potential_anaphoric_pair(
-                referred_mention, doc[referring_index], directly), nlp.meta['name'])
+                referred_mention, doc[referring_index], context, directly), nlp.meta['name'])
 
         self.all_nlps(func)
 
@@ -720,15 +720,15 @@ class RussianRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             assert rules_analyzer.is_independent_noun(doc[referred_index]) or \
-                   rules_analyzer.is_potential_anaphor(doc[referred_index])
-            assert rules_analyzer.is_potential_anaphor(doc[referring_index])
-            referred_mention = Mention(doc[referred_index], include_dependent_siblings)
+                   rules_analyzer.is_potential_anaphor(doc[referred_index], context)
+            assert rules_analyzer.is_potential_anaphor(doc[referring_index], context)
+            referred_mention = Mention(doc[referred_index], include_dependent_siblings, context)
             self.assertEqual(expected_truth, rules_analyzer.is_potential_anaphoric_pair(
-                referred_mention, doc[referring_index], True), nlp.meta['name'])
+                referred_mention, doc[referring_index], context, True), nlp.meta['name'])
             self.assertEqual(expected_reflexive_truth, rules_analyzer.is_potential_reflexive_pair(
-                referred_mention, doc[referring_index]), nlp.meta['name'])
+                referred_mention, doc[referring_index], context), nlp.meta['name'])
             self.assertEqual(is_reflexive_anaphor_truth, rules_analyzer.is_reflexive_anaphor(
                 doc[referring_index]), nlp.meta['name'])
 
@@ -742,9 +742,9 @@ class RussianRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             self.assertEqual(expected_truth,
-                             rules_analyzer.is_potentially_introducing_noun(doc[index]),
+                             rules_analyzer.is_potentially_introducing_noun(doc[index], context),
                              nlp.meta['name'])
 
         self.all_nlps(func)
@@ -766,9 +766,9 @@ class RussianRulesTest(unittest.TestCase):
                 return
             doc = nlp(doc_text)
             rules_analyzer = RulesAnalyzerFactory.get_rules_analyzer(nlp)
-            rules_analyzer.initialize(doc)
+            context = rules_analyzer.initialize(doc)
             self.assertEqual(expected_truth,
-                             rules_analyzer.is_potentially_referring_back_noun(doc[index]),
+                             rules_analyzer.is_potentially_referring_back_noun(doc[index], context),
                              nlp.meta['name'])
 
         self.all_nlps(func)